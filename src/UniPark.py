@@ -1,59 +1,344 @@
 # Modulo UniPark: Gestione logica del sistema di parcheggio.
 # Questo file contiene solo il Modello e il Controller, senza interfaccia grafica.
+# pylint: disable=too-many-lines
 
+import heapq
+import itertools
 import random
+import sys
+import time
+from array import array
+from collections import deque
+from contextlib import ExitStack
 from threading import Lock
 
+# ==================== GENERATORI CASUALI ====================
+
+
+class RandomStream(random.Random):
+    # Flusso casuale indipendente e riproducibile: un random.Random dedicato, così random()
+    # resta la chiamata C del generatore senza passaggi Python in più sul percorso caldo
+
+    def randint(self, low, high):  # pylint: disable=arguments-renamed
+        # Intero in [low, high] estremi inclusi
+        return low + int(self.random() * (high - low + 1))
+
+
+class RandomStreams:  # pylint: disable=too-few-public-methods
+    # Famiglia di flussi indipendenti derivati da un unico seed: lo stesso seed e la stessa
+    # chiave danno sempre la stessa sequenza, senza stato globale condiviso tra thread
+    def __init__(self, seed=None):
+        # Senza seed se ne estrae uno, conservato in self.seed per poter ripetere l'esecuzione
+        self.seed = random.SystemRandom().getrandbits(64) if seed is None else seed
+
+    def stream(self, key):
+        return RandomStream(f"{self.seed}:{key}")
+
+
 # ==================== MODELLO DATI (MODEL) ====================
 
 
-class ParkingZone:
+class VehicleRecord:  # pylint: disable=too-few-public-methods
+    # Record di un veicolo uscito dalla coda (creato solo al momento dell'estrazione)
+    __slots__ = ("vehicle_id", "enqueued_at")
+
+    def __init__(self, vehicle_id, enqueued_at):
+        self.vehicle_id = vehicle_id
+        self.enqueued_at = enqueued_at
+
+    def __repr__(self):
+        return f"VehicleRecord({self.vehicle_id}, {self.enqueued_at})"
+
+
+class VehicleQueue:
+    # Coda FIFO compatta di veicoli: ring buffer su due colonne array (id intero + istante
+    # di accodamento), 16 byte per veicolo. Cresce raddoppiando quando è piena.
+    __slots__ = ("_ids", "_times", "_head", "_size")
+
+    def __init__(self, initial_capacity=64):
+        self._ids = array("q", bytes(8 * initial_capacity))
+        self._times = array("d", bytes(8 * initial_capacity))
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        # Riordina il ring buffer partendo dalla testa e raddoppia lo spazio
+        cap = len(self._ids)
+        order = list(range(self._head, cap)) + list(range(0, self._head))
+        self._ids = array("q", (self._ids[i] for i in order)) + array(
+            "q", bytes(8 * cap)
+        )
+        self._times = array("d", (self._times[i] for i in order)) + array(
+            "d", bytes(8 * cap)
+        )
+        self._head = 0
+
+    def push(self, vehicle_id, enqueued_at):
+        # Accoda un veicolo in fondo alla fila
+        if self._size == len(self._ids):
+            self._grow()
+        tail = (self._head + self._size) % len(self._ids)
+        self._ids[tail] = vehicle_id
+        self._times[tail] = enqueued_at
+        self._size += 1
+
+    def pop(self):
+        # Estrae il veicolo in testa (quello che attende da più tempo)
+        if not self._size:
+            raise IndexError("pop da una coda vuota")
+        head = self._head
+        record = VehicleRecord(self._ids[head], self._times[head])
+        self._head = (head + 1) % len(self._ids)
+        self._size -= 1
+        return record
+
+    def pop_last(self):
+        # Estrae il veicolo in fondo alla fila (l'ultimo arrivato)
+        if not self._size:
+            raise IndexError("pop da una coda vuota")
+        self._size -= 1
+        tail = (self._head + self._size) % len(self._ids)
+        return VehicleRecord(self._ids[tail], self._times[tail])
+
+    def peek(self):
+        # Restituisce il veicolo in testa senza estrarlo
+        if not self._size:
+            return None
+        return VehicleRecord(self._ids[self._head], self._times[self._head])
+
+    def nbytes(self):
+        # Memoria occupata dai buffer della coda
+        return (len(self._ids) + len(self._times)) * 8
+
+
+class ParkingZone:  # pylint: disable=too-many-instance-attributes
     # Modello che gestisce i dati del singolo parcheggio in modo Thread-Safe
 
-    def __init__(self, name, capacity, free_slots):
+    WAIT_SAMPLES = 4096  # Numero di tempi di attesa recenti usati per i percentili
+
+    def __init__(
+        self, name, capacity, free_slots, track_queue=False, clock=time.monotonic
+    ):
         # Implementa un meccanismo di locking per garantire l'accesso thread-safe agli attributi condivisi (free_slots, waiting)
         self.name = name
         self.capacity = capacity
         self.free_slots = max(0, min(free_slots, capacity))
         self.waiting = 0
+        # Posti liberi trattenuti per prenotazioni attive non ancora arrivate (vedi
+        # UniParkReservations): park() non li assegna alle auto senza prenotazione
+        self.reserved_slots = 0
+        # Registro delle prenotazioni della zona (ReservationBook), se presente: park() gli
+        # chiede di attivare le prenotazioni già iniziate prima di assegnare un posto
+        self.reservations = None
         self.lock = Lock()
+        self.zone_id = None  # Assegnato dal registro di UniParkSystem
+        # Incrementato a ogni variazione di stato (rilevamento modifiche)
+        self.version = 0
+        self._observers = []
+
+        # Coda FIFO opzionale con identità dei veicoli e tempi di attesa
+        self.queue = VehicleQueue() if track_queue else None
+        self.clock = clock
+        self.wait_times = deque(maxlen=self.WAIT_SAMPLES) if track_queue else None
+        self._next_vehicle_id = 0
+
+    def add_observer(self, callback):
+        # Registra una callback(zone, delta_free, delta_waiting) invocata a ogni variazione di stato.
+        # La callback viene eseguita con il lock della zona acquisito: deve essere breve
+        # e non deve acquisire lock di altre zone
+        self._observers.append(callback)
+
+    def remove_observer(self, callback):
+        # Rimuove una callback registrata in precedenza
+        self._observers.remove(callback)
+
+    def _notify(self, delta_free, delta_waiting):
+        # Registra una variazione di stato: incrementa la versione e notifica gli osservatori
+        self.version += 1
+        for callback in self._observers:
+            callback(self, delta_free, delta_waiting)
 
     @property  # Calcolo dinamico per garantire la coerenza dei dati senza ridondanza di stato
     def occupied_slots(self):
         # Calcola i posti occupati
         return self.capacity - self.free_slots
 
+    @property  # Posti assegnabili a un'auto senza prenotazione
+    def available_slots(self):
+        return max(0, self.free_slots - self.reserved_slots)
+
     @property  # Percentuale di saturazione rispetto alla capacità totale
     def occupancy_rate(self):
         # Calcola la percentuale di occupazione
         return (self.occupied_slots / self.capacity) * 100
 
-    def park(self):
+    def _enqueue(self, vehicle_id):
+        # Inserisce un veicolo nella coda FIFO (id progressivo se non specificato)
+        if vehicle_id is None:
+            vehicle_id = self._next_vehicle_id
+            self._next_vehicle_id += 1
+        self.queue.push(vehicle_id, self.clock())
+
+    def _dequeue(self):
+        # Estrae la testa della coda FIFO e registra il suo tempo di attesa
+        if not self.queue:
+            return None
+        record = self.queue.pop()
+        self.wait_times.append(self.clock() - record.enqueued_at)
+        return record
+
+    def park(self, vehicle_id=None):
         # Tenta l'ingresso: se pieno, incrementa la coda di attesa
+        if self.reservations is not None:
+            self.reservations.advance_if_due()
         with self.lock:
-            if self.free_slots > 0:
+            if self.free_slots > self.reserved_slots:
                 self.free_slots -= 1
+                self._notify(-1, 0)
                 return True
+            if self.queue is not None:
+                # Prima l'accodamento: un id non intero solleva TypeError senza aver
+                # modificato lo stato della zona
+                self._enqueue(vehicle_id)
             self.waiting += 1
+            self._notify(0, 1)
             return False
 
     def unpark(self):
-        # Gestisce l'uscita: se c'è attesa, libera un utente in coda, altrimenti libera un posto
+        # Gestisce l'uscita: se c'è attesa, libera un utente in coda, altrimenti libera un posto.
+        # Se i posti liberi non bastano a coprire le prenotazioni attive, il posto va a queste
         with self.lock:
-            if self.waiting > 0:
+            if self.waiting > 0 and self.free_slots >= self.reserved_slots:
                 self.waiting -= 1
+                if self.queue is not None:
+                    self._dequeue()
+                self._notify(0, -1)
                 return True
             if self.free_slots < self.capacity:
                 self.free_slots += 1
+                self._notify(1, 0)
                 return True
             return False
 
+    def withdraw(self, n):
+        # Ritira fino a n auto dalla coda partendo dagli ultimi arrivati (es. per dirottarle
+        # su un'altra zona). Restituisce gli id dei veicoli ritirati (None se non tracciati)
+        with self.lock:
+            count = min(n, self.waiting)
+            if not count:
+                return []
+            self.waiting -= count
+            if self.queue is not None:
+                ids = [self.queue.pop_last().vehicle_id for _ in range(count)]
+            else:
+                ids = [None] * count
+            self._notify(0, -count)
+            return ids
+
+    def park_many(self, n):
+        # Applica n arrivi con una sola acquisizione del lock (costo O(1) rispetto a n).
+        # Restituisce (ammessi, accodati)
+        if n < 0:
+            raise ValueError(f"Numero di arrivi negativo: {n}")
+        if self.reservations is not None:
+            self.reservations.advance_if_due()
+        with self.lock:
+            return self._park_many_unlocked(n)
+
+    def unpark_many(self, n):
+        # Applica n uscite con una sola acquisizione del lock (costo O(1) rispetto a n).
+        # Restituisce (ammessi_dalla_coda, posti_liberati)
+        if n < 0:
+            raise ValueError(f"Numero di uscite negativo: {n}")
+        with self.lock:
+            return self._unpark_many_unlocked(n)
+
+    def _park_many_unlocked(self, n):
+        # Equivalente a n chiamate di park(): prima si riempiono i posti liberi, il resto va in coda
+        admitted = min(n, self.available_slots)
+        queued = n - admitted
+        self.free_slots -= admitted
+        self.waiting += queued
+        if self.queue is not None:
+            # Con la coda tracciata ogni veicolo ha il suo record: costo O(accodati)
+            for _ in range(queued):
+                self._enqueue(None)
+        if n:
+            self._notify(-admitted, queued)
+        return admitted, queued
+
+    def _unpark_many_unlocked(self, n):
+        # Equivalente a n chiamate di unpark(): ogni uscita fa entrare prima un'auto in coda,
+        # poi libera posti finché la zona non è vuota (le uscite in eccesso vengono ignorate).
+        # Le prime uscite coprono gli eventuali posti mancanti alle prenotazioni attive
+        to_holds = min(
+            n,
+            max(0, self.reserved_slots - self.free_slots),
+            self.capacity - self.free_slots,
+        )
+        from_queue = min(n - to_holds, self.waiting)
+        released = to_holds + min(
+            n - to_holds - from_queue, self.capacity - self.free_slots - to_holds
+        )
+        self.waiting -= from_queue
+        self.free_slots += released
+        if self.queue is not None:
+            for _ in range(from_queue):
+                self._dequeue()
+        if from_queue or released:
+            self._notify(released, -from_queue)
+        return from_queue, released
+
+    def _apply_delta_unlocked(self, delta):
+        # delta > 0: arrivi, delta < 0: uscite (il chiamante deve possedere il lock)
+        if delta >= 0:
+            return self._park_many_unlocked(delta)
+        return self._unpark_many_unlocked(-delta)
+
+    def adjust_reserved(self, delta):
+        # Aggiunge (delta > 0) o rilascia (delta < 0) posti trattenuti per prenotazioni
+        with self.lock:
+            self.reserved_slots = max(0, self.reserved_slots + delta)
+            self._notify(0, 0)
+
+    def check_in(self, vehicle_id=None):
+        # Ingresso di un'auto prenotata: consuma una prenotazione attiva e occupa il posto
+        # trattenuto; se il posto è ancora occupato da altri, l'auto va in coda
+        with self.lock:
+            if self.free_slots > 0:
+                self.reserved_slots = max(0, self.reserved_slots - 1)
+                self.free_slots -= 1
+                self._notify(-1, 0)
+                return True
+            if self.queue is not None:
+                # Prima l'accodamento: un id non intero solleva TypeError senza aver
+                # modificato lo stato della zona
+                self._enqueue(vehicle_id)
+            self.reserved_slots = max(0, self.reserved_slots - 1)
+            self.waiting += 1
+            self._notify(0, 1)
+            return False
+
+    def restore_state(self, free_slots, waiting):
+        # Imposta lo stato (es. ripristino da persistenza) notificando la variazione come delta,
+        # così gli osservatori (totali di sistema, GUI) restano coerenti
+        with self.lock:
+            delta_free = free_slots - self.free_slots
+            delta_waiting = waiting - self.waiting
+            self.free_slots = free_slots
+            self.waiting = waiting
+            if delta_free or delta_waiting:
+                self._notify(delta_free, delta_waiting)
+
     def get_status_dict(self):
         # Restituisce un dizionario con lo stato attuale
         # Necessario per i test unitari
 
         with self.lock:
-            return {
+            status = {
                 "name": self.name,
                 "capacity": self.capacity,
                 "free_slots": self.free_slots,
@@ -61,34 +346,688 @@ class ParkingZone:
                 "waiting": self.waiting,
                 "rate": self.occupancy_rate,
             }
+            if self.queue is not None:
+                status.update(self._wait_stats())
+            return status
+
+    def _wait_stats(self):
+        # Percentili dei tempi di attesa recenti e attesa corrente del primo della fila
+        head = self.queue.peek()
+        stats = {
+            "longest_wait": self.clock() - head.enqueued_at if head else 0.0,
+            "wait_p50": 0.0,
+            "wait_p90": 0.0,
+            "wait_p99": 0.0,
+        }
+        if self.wait_times:
+            # Percentile "nearest-rank" sugli ultimi WAIT_SAMPLES tempi di attesa
+            ordered = sorted(self.wait_times)
+            for key, pct in (("wait_p50", 50), ("wait_p90", 90), ("wait_p99", 99)):
+                stats[key] = ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+        return stats
+
+
+# ==================== SNAPSHOT DI SISTEMA ====================
+
+
+def _zone_row(zone):
+    # Valori di una zona nell'ordine di SystemSnapshot.COLUMNS
+    return (
+        zone.capacity,
+        zone.free_slots,
+        zone.waiting,
+        zone.reserved_slots,
+        zone.version,
+    )
+
+
+class SystemSnapshot:  # pylint: disable=too-many-instance-attributes
+    # Stato di tutte le zone in un istante: colonne array di sola lettura (una per campo)
+    # e disposizione condivisa tra snapshot; nessun dizionario per zona
+    __slots__ = (
+        "seq",
+        "ids",
+        "names",
+        "_index",
+        "capacity",
+        "free_slots",
+        "waiting",
+        "reserved",
+        "version",
+    )
+
+    COLUMNS = ("capacity", "free_slots", "waiting", "reserved", "version")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, seq, ids, names, index, columns
+    ):
+        # Colonne esposte come memoryview di sola lettura: lo snapshot non può essere alterato
+        self.seq = seq
+        self.ids = ids
+        self.names = names
+        self._index = index
+        (
+            self.capacity,
+            self.free_slots,
+            self.waiting,
+            self.reserved,
+            self.version,
+        ) = (memoryview(column).toreadonly() for column in columns)
+
+    @classmethod
+    def from_zones(cls, zones, seq=0):
+        # Snapshot costruito leggendo direttamente una sequenza di zone (senza registro)
+        zones = list(zones)
+        ids = tuple(zone.zone_id for zone in zones)
+        names = tuple(zone.name for zone in zones)
+        index = {key: i for i, pair in enumerate(zip(ids, names)) for key in pair}
+        rows = [_zone_row(zone) for zone in zones]
+        columns = [array("q", column) for column in zip(*rows)] or [
+            array("q") for _ in cls.COLUMNS
+        ]
+        return cls(seq, ids, names, index, columns)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, zone):
+        # Indice di una zona (id breve o nome) nello snapshot, None se assente
+        return self._index.get(zone)
+
+    def occupied(self, i):
+        return self.capacity[i] - self.free_slots[i]
+
+    def rate(self, i):
+        return self.occupied(i) / self.capacity[i] * 100
+
+    def totals(self):
+        # Totali calcolati sulle colonne dello snapshot (coerenti tra loro)
+        capacity, free = sum(self.capacity), sum(self.free_slots)
+        return {
+            "capacity": capacity,
+            "free_slots": free,
+            "occupied": capacity - free,
+            "waiting": sum(self.waiting),
+        }
+
+    def status(self, i):
+        # Stato della zona i nello stesso formato di ParkingZone.get_status_dict
+        return {
+            "name": self.names[i],
+            "capacity": self.capacity[i],
+            "free_slots": self.free_slots[i],
+            "occupied": self.occupied(i),
+            "waiting": self.waiting[i],
+            "rate": self.rate(i),
+        }
 
 
 # ==================== SISTEMA CENTRALE (CONTROLLER) ====================
 
 
-class UniParkSystem:
+class UniParkSystem:  # pylint: disable=too-many-instance-attributes
     # Controller del sistema e gestisce l'inizializzazione delle zone
     # Questa classe è fondamentale per i test e per inizializzare la GUI
 
-    def __init__(self):
-        # Inizializzazione dei dati simulati (random) per le zone di parcheggio
-        self.zones = [
-            ParkingZone("Zona A (Viale A. Doria)", 60, random.randint(20, 60)),
-            ParkingZone("Zona B (DMI)", 45, random.randint(15, 45)),
-            ParkingZone("Zona C (Via S. Sofia)", 80, random.randint(30, 80)),
-        ]
-
+    def __init__(self, zones=None, seed=None):
+        # Registro delle zone: lista ordinata (per la GUI) + indici hash per id e per nome.
+        # I totali di sistema sono mantenuti in modo incrementale tramite gli osservatori delle zone
+        self.zones = []
         # Mapping rapido per l'accesso tramite identificativo testuale
-        self.zone_map = {"a": self.zones[0], "b": self.zones[1], "c": self.zones[2]}
+        self.zone_map = {}
+        self._zones_by_name = {}
+        self._zone_counter = itertools.count()  # Indice del prossimo id automatico
+        # Un solo lock per totali, indice di instradamento e copia per gli snapshot: ogni
+        # notifica di una zona lo acquisisce una volta sola
+        self._totals_lock = Lock()
+        self._total_capacity = 0
+        self._total_free = 0
+        self._total_waiting = 0
+
+        # Indice di instradamento: heap (-posti assegnabili, coda, seq, versione, zona). Gli
+        # osservatori segnano solo la zona come modificata; le voci aggiornate si inseriscono
+        # alla ricerca successiva e quelle superate (versione diversa da quella attuale della
+        # zona) vengono scartate in modo pigro
+        self._route_heap = []
+        self._route_dirty = set()
+        self._route_seq = itertools.count()
+        self.distances = {}  # id_origine -> {id_destinazione: distanza}
+        self._neighbors = (
+            {}
+        )  # id_origine -> [(distanza, id_destinazione)] in ordine crescente
+        # Costo di ogni auto in coda, nelle unità della distanza
+        self.wait_penalty = 1.0
+
+        # Copia speculare dello stato delle zone in colonne array, aggiornata dagli osservatori
+        # sotto un contatore di sequenza (seqlock): snapshot() la copia senza acquisire lock.
+        # La disposizione (id, nomi, indice) è una tupla sostituita in blocco quando cambia
+        # il registro (copy-on-write), mai modificata sul posto
+        self._snap_seq = 0
+        self._snap_batches = 0  # Batch in corso: la sezione di scrittura resta aperta
+        self._snap_columns = tuple(array("q") for _ in SystemSnapshot.COLUMNS)
+        self._snap_layout = ((), (), {})
+
+        if zones is None:
+            # Inizializzazione dei dati simulati (random, riproducibili con seed)
+            rng = RandomStreams(seed).stream("init")
+            zones = {
+                "a": ParkingZone("Zona A (Viale A. Doria)", 60, rng.randint(20, 60)),
+                "b": ParkingZone("Zona B (DMI)", 45, rng.randint(15, 45)),
+                "c": ParkingZone("Zona C (Via S. Sofia)", 80, rng.randint(30, 80)),
+            }
+        if isinstance(zones, dict):
+            for zone_id, zone in zones.items():
+                self.add_zone(zone, zone_id)
+        else:
+            for zone in zones:
+                self.add_zone(zone)
+
         self.running = True
 
+    @classmethod
+    def attach_shared(cls, name):
+        # Si collega a un blocco di memoria condivisa esistente (vedi UniParkShared):
+        # i contatori delle zone sono letti direttamente dal blocco, senza copie
+        # pylint: disable-next=import-error, import-outside-toplevel
+        from UniParkShared import attach_system  # type: ignore # isort: skip
+
+        return attach_system(name)
+
+    def _next_zone_id(self):
+        # Genera un identificativo libero: "a".."z", poi "z26", "z27", ... Il contatore è
+        # monotono: l'id di una zona rimossa non viene riassegnato a una zona nuova
+        while True:
+            index = next(self._zone_counter)
+            zone_id = chr(ord("a") + index) if index < 26 else f"z{index}"
+            if zone_id not in self.zone_map:
+                return zone_id
+
+    def add_zone(self, zone, zone_id=None):
+        # Registra una nuova zona a runtime e la collega ai totali incrementali
+        if zone_id is None:
+            zone_id = zone.zone_id if zone.zone_id is not None else self._next_zone_id()
+        if zone_id in self.zone_map:
+            raise ValueError(f"Identificativo di zona già presente: {zone_id}")
+        if zone.name in self._zones_by_name:
+            raise ValueError(f"Nome di zona già presente: {zone.name}")
+
+        with zone.lock:
+            zone.zone_id = zone_id
+            zone.add_observer(self._on_zone_change)
+            with self._totals_lock:
+                self._total_capacity += zone.capacity
+                self._total_free += zone.free_slots
+                self._total_waiting += zone.waiting
+                self._snap_seq += 1
+                ids, names, index = self._snap_layout
+                position = len(ids)
+                index = {**index, zone_id: position, zone.name: position}
+                self._snap_layout = (ids + (zone_id,), names + (zone.name,), index)
+                for column, value in zip(self._snap_columns, _zone_row(zone)):
+                    column.append(value)
+                self._snap_seq += 1
+                self._route_dirty.add(zone)
+
+        self.zones.append(zone)
+        self.zone_map[zone_id] = zone
+        self._zones_by_name[zone.name] = zone
+        return zone
+
+    def remove_zone(self, zone):
+        # Rimuove una zona (oggetto, id o nome) dal registro e dai totali
+        zone = self._resolve_zone(zone)
+        with zone.lock:
+            zone.remove_observer(self._on_zone_change)
+            with self._totals_lock:
+                self._total_capacity -= zone.capacity
+                self._total_free -= zone.free_slots
+                self._total_waiting -= zone.waiting
+                self._snap_seq += 1
+                ids, names, index = self._snap_layout
+                position = index[zone.zone_id]
+                ids = ids[:position] + ids[position + 1 :]
+                names = names[:position] + names[position + 1 :]
+                index = {
+                    key: i for i, pair in enumerate(zip(ids, names)) for key in pair
+                }
+                self._snap_layout = (ids, names, index)
+                for column in self._snap_columns:
+                    del column[position]
+                self._snap_seq += 1
+
+        self.zones.remove(zone)
+        del self.zone_map[zone.zone_id]
+        del self._zones_by_name[zone.name]
+        return zone
+
+    def _on_zone_change(self, zone, delta_free, delta_waiting):
+        # Osservatore: aggiorna in O(1) i totali e la copia per gli snapshot (la capacità non
+        # cambia dopo la registrazione) e segna la zona per l'indice di instradamento
+        with self._totals_lock:
+            self._total_free += delta_free
+            self._total_waiting += delta_waiting
+            self._route_dirty.add(zone)
+            position = self._snap_layout[2][zone.zone_id]
+            columns = self._snap_columns
+            batch = self._snap_batches
+            if not batch:
+                self._snap_seq += 1
+            if delta_free:
+                columns[1][position] = zone.free_slots
+            if delta_waiting:
+                columns[2][position] = zone.waiting
+            columns[3][position] = zone.reserved_slots
+            columns[4][position] = zone.version
+            if not batch:
+                self._snap_seq += 1
+
+    def _snap_batch(self, step):
+        # Apre (+1) o chiude (-1) la sezione di scrittura di un batch: il contatore di
+        # sequenza resta dispari finché c'è almeno un batch in corso
+        with self._totals_lock:
+            before = self._snap_batches
+            self._snap_batches += step
+            if not before or not self._snap_batches:
+                self._snap_seq += 1
+
+    def snapshot(self):
+        # Vista immutabile e coerente di tutte le zone in un istante, in O(zone) e senza lock:
+        # si copiano le colonne e si riprova se nel frattempo uno scrittore le ha modificate
+        while True:
+            seq = self._snap_seq
+            if seq % 2 == 0:
+                layout = self._snap_layout
+                columns = [column[:] for column in self._snap_columns]
+                if self._snap_seq == seq:
+                    return SystemSnapshot(seq, *layout, columns)
+            time.sleep(0)
+
+    # --------------------- Instradamento tra zone ---------------------
+
+    def _refresh_routes(self):
+        # Inserisce nell'heap lo stato attuale delle zone modificate dall'ultima ricerca
+        # (chiamato con self._totals_lock acquisito)
+        heap = self._route_heap
+        for zone in self._route_dirty:
+            entry = (
+                -zone.available_slots,
+                zone.waiting,
+                next(self._route_seq),
+                zone.version,
+                zone,
+            )
+            heapq.heappush(heap, entry)
+        self._route_dirty.clear()
+        if len(heap) > 2 * len(self.zones) + 64:
+            # Compattazione ammortizzata: restano solo le voci ancora valide
+            self._route_heap = [e for e in heap if self._route_valid(e)]
+            heapq.heapify(self._route_heap)
+
+    def _route_valid(self, entry):
+        zone = entry[4]
+        return entry[3] == zone.version and self.zone_map.get(zone.zone_id) is zone
+
+    def _route_candidates(self, count):
+        # Le "count" zone più disponibili (più posti liberi, poi coda più corta):
+        # O(count * log zone), scartando lungo il percorso le voci superate
+        chosen = []
+        with self._totals_lock:
+            self._refresh_routes()
+            heap = self._route_heap
+            while heap and len(chosen) < count:
+                entry = heapq.heappop(heap)
+                if self._route_valid(entry) and all(
+                    e[4] is not entry[4] for e in chosen
+                ):
+                    chosen.append(entry)
+            for entry in chosen:
+                heapq.heappush(heap, entry)
+        return [entry[4] for entry in chosen]
+
+    def set_distances(self, distances):
+        # Matrice delle distanze tra zone: {(origine, destinazione): distanza} con zone
+        # indicate per oggetto, id o nome. Le coppie mancanti valgono 0
+        touched = set()
+        for (origin, target), distance in distances.items():
+            origin_id = self._resolve_zone(origin).zone_id
+            target_id = self._resolve_zone(target).zone_id
+            self.distances.setdefault(origin_id, {})[target_id] = distance
+            touched.add(origin_id)
+        # Vicini di ogni origine ordinati per distanza: best_zone li scorre solo finché la
+        # distanza da sola non supera il costo migliore già trovato
+        for origin_id in touched:
+            self._neighbors[origin_id] = sorted(
+                (distance, target_id)
+                for target_id, distance in self.distances[origin_id].items()
+            )
+
+    def _route_cost(self, origin, zone):
+        # Costo stimato per un'auto proveniente da "origin": distanza + attesa prevista in coda
+        distance = 0.0
+        if origin is not None:
+            distance = self.distances.get(origin.zone_id, {}).get(zone.zone_id, 0.0)
+        if zone.available_slots > 0:
+            return distance
+        return distance + self.wait_penalty * (zone.waiting + 1)
+
+    def best_zone(self, origin=None, candidates=3, exclude=None):
+        # Sceglie la zona con costo minore rispetto all'origine tra le più disponibili e
+        # quelle a distanza nota dall'origine (matrice sparsa): una zona vicina con meno
+        # posti liberi resta candidata anche se non è tra le più disponibili. I vicini sono
+        # visitati in ordine di distanza fino a quando la sola distanza supera il costo migliore
+        origin = self._resolve_zone(origin) if origin is not None else None
+        best, best_cost = None, float("inf")
+        pool = [z for z in self._route_candidates(candidates + 1) if z is not exclude]
+        for zone in pool[:candidates]:
+            cost = self._route_cost(origin, zone)
+            if cost < best_cost:
+                best, best_cost = zone, cost
+        if origin is not None:
+            for distance, zone_id in self._neighbors.get(origin.zone_id, ()):
+                if distance >= best_cost:
+                    break
+                zone = self.zone_map.get(zone_id)
+                if zone is None or zone is exclude:
+                    continue
+                cost = self._route_cost(origin, zone)
+                if cost < best_cost:
+                    best, best_cost = zone, cost
+        return best
+
+    def park_best(self, preferred=None, vehicle_id=None, candidates=3):
+        # Ingresso a livello di sistema: la zona preferita se ha posti liberi, altrimenti
+        # la zona migliore per disponibilità, coda e distanza dalla preferita.
+        # Restituisce (zona, ammesso)
+        zone = self._resolve_zone(preferred) if preferred is not None else None
+        if zone is None or zone.available_slots <= 0:
+            zone = self.best_zone(zone, candidates) or zone
+        if zone is None:
+            raise KeyError("Nessuna zona registrata")
+        return zone, zone.park(vehicle_id)
+
+    def rebalance_queues(self, candidates=3):
+        # Sposta le auto in coda verso zone con posti liberi (le più vicine tra le più
+        # disponibili). Restituisce il numero di auto dirottate
+        moved = 0
+        for source in [zone for zone in self.zones if zone.waiting > 0]:
+            while source.waiting > 0:
+                target = self.best_zone(source, candidates, exclude=source)
+                if target is None or target.available_slots <= 0:
+                    break
+                count = min(source.waiting, target.available_slots)
+                for vehicle_id in source.withdraw(count):
+                    target.park(vehicle_id)
+                    moved += 1
+        return moved
+
     def get_total_capacity(self):
-        # Restituisce la capacità totale di tutto il sistema
-        return sum(z.capacity for z in self.zones)
+        # Restituisce la capacità totale di tutto il sistema (O(1))
+        return self._total_capacity
+
+    def get_totals(self):
+        # Restituisce i totali di sistema aggiornati in modo incrementale (O(1))
+        with self._totals_lock:
+            return {
+                "capacity": self._total_capacity,
+                "free_slots": self._total_free,
+                "occupied": self._total_capacity - self._total_free,
+                "waiting": self._total_waiting,
+            }
+
+    def get_zone(self, zone_id):
+        # Recupera una zona tramite il suo identificativo breve (es. "a")
+        return self.zone_map.get(zone_id)
+
+    def _resolve_zone(self, zone):
+        # Accetta un oggetto ParkingZone, un identificativo breve ("a") o il nome completo
+        if isinstance(zone, str):
+            zone = self.zone_map.get(zone) or self.get_zone_by_name(zone)
+        if zone is None:
+            raise KeyError("Zona inesistente")
+        return zone
+
+    def apply_batch(self, operations):
+        # Applica atomicamente una lista di (zona, delta): delta > 0 arrivi, delta < 0 uscite.
+        # I lock delle zone coinvolte vengono acquisiti tutti insieme in un ordine globale
+        # consistente (id dell'oggetto) per evitare deadlock tra batch concorrenti.
+        resolved = [(self._resolve_zone(zone), delta) for zone, delta in operations]
+        unique = {id(zone): zone for zone, _ in resolved}
+
+        with ExitStack() as stack:
+            for key in sorted(unique):
+                stack.enter_context(unique[key].lock)
+            # Una sola sezione di scrittura del seqlock per tutto il batch: uno snapshot
+            # non vede mai un batch applicato a metà
+            self._snap_batch(1)
+            stack.callback(self._snap_batch, -1)
+            # pylint: disable-next=protected-access
+            return [zone._apply_delta_unlocked(delta) for zone, delta in resolved]
 
     def get_zone_by_name(self, name):
-        # Recupera una zona specifica tramite il suo nome identificativo
-        for zone in self.zones:
-            if zone.name == name:
-                return zone
-        return None
+        # Recupera una zona specifica tramite il suo nome identificativo (indice hash, O(1))
+        return self._zones_by_name.get(name)
+
+
+# ==================== SIMULAZIONE A EVENTI DISCRETI ====================
+
+
+class SimulationEngine:  # pylint: disable=too-many-instance-attributes
+    # Motore di simulazione headless (senza GUI) a eventi discreti.
+    # Il calendario degli eventi è una coda di priorità (heap) ordinata per tempo virtuale:
+    # il tempo avanza da un evento al successivo, senza sleep e senza un thread per zona.
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        zones,
+        *,
+        park_prob=0.4,
+        unpark_prob=0.4,
+        delay_range=(2.0, 5.0),
+        seed=None,
+        on_event=None,
+        demand=None,
+    ):
+        # Stessi parametri del vecchio worker della GUI: 40% park, 40% unpark, attesa 2-5 secondi
+        self.zones = list(zones)
+        self.park_prob = park_prob
+        self.unpark_prob = unpark_prob
+        self.delay_range = delay_range
+        self.on_event = on_event
+        # demand(zone) -> fattore che scala park_prob (es. risposta della domanda al prezzo)
+        self.demand = demand
+        # Un flusso casuale per zona: la traccia di una zona dipende solo dal seed e dal
+        # nome della zona, non dall'ordine in cui vengono processati gli eventi delle altre
+        self.streams = RandomStreams(seed)
+        self.seed = self.streams.seed
+        self._rngs = [self.streams.stream(f"zone:{zone.name}") for zone in self.zones]
+        self.now = 0.0
+        self.events_processed = 0
+        self.calendar = []  # Heap di tuple (tempo, sequenza, indice_zona)
+        self._seq = 0
+
+        for index in range(len(self.zones)):
+            self._schedule(index)
+
+    def _schedule(self, index):
+        # Inserisce nel calendario il prossimo evento della zona indicata
+        low, high = self.delay_range
+        when = self.now + self._rngs[index].uniform(low, high)
+        heapq.heappush(self.calendar, (when, self._seq, index))
+        self._seq += 1
+
+    def step(self):
+        # Esegue il prossimo evento del calendario e restituisce (tempo, zona, tipo)
+        if not self.calendar:
+            return None
+        when, _, index = heapq.heappop(self.calendar)
+        self.now = when
+        zone = self.zones[index]
+
+        park_prob = self.park_prob
+        if self.demand is not None:
+            park_prob = min(park_prob * self.demand(zone), 1.0 - self.unpark_prob)
+        draw = self._rngs[index].random()
+        if draw < park_prob:
+            kind = "park" if zone.park() else "queue"
+        elif draw < park_prob + self.unpark_prob:
+            kind = "unpark" if zone.unpark() else "idle"
+        else:
+            kind = "idle"
+
+        self.events_processed += 1
+        self._schedule(index)
+
+        if self.on_event is not None and kind != "idle":
+            self.on_event(when, zone, kind)
+        return when, zone, kind
+
+    def run_until(self, end_time):
+        # Avanza il tempo virtuale fino a end_time alla massima velocità consentita dalla CPU
+        calendar = self.calendar
+        processed = 0
+        while calendar and calendar[0][0] <= end_time:
+            self.step()
+            processed += 1
+        self.now = max(self.now, end_time)
+        return processed
+
+    def run(self, duration):
+        # Avanza la simulazione di 'duration' secondi virtuali
+        return self.run_until(self.now + duration)
+
+    def advance_realtime(self, elapsed, time_scale=1.0):
+        # Modalità "tempo reale scalato": la GUI passa i secondi reali trascorsi
+        # e il motore avanza di elapsed * time_scale secondi virtuali
+        return self.run(elapsed * time_scale)
+
+
+# ==================== SWEEP DI SCENARI (MULTI-PROCESSO) ====================
+
+
+def build_scenario_grid(
+    capacities, free_slots, park_probs=(0.4,), unpark_probs=(0.4,), horizons=(3600,)
+):
+    # Prodotto cartesiano dei parametri: ogni voce di capacities/free_slots è una tupla per zona
+    return [
+        {
+            "capacities": tuple(cap),
+            "free_slots": tuple(free),
+            "park_prob": park,
+            "unpark_prob": unpark,
+            "horizon": horizon,
+        }
+        for cap, free, park, unpark, horizon in itertools.product(
+            capacities, free_slots, park_probs, unpark_probs, horizons
+        )
+    ]
+
+
+def run_scenario(scenario, seed, sample_every=60.0):
+    # Esegue una singola simulazione indipendente (funzione di modulo: serializzabile per i processi)
+    zones = [
+        ParkingZone(f"Zona {i}", cap, free)
+        for i, (cap, free) in enumerate(
+            zip(scenario["capacities"], scenario["free_slots"])
+        )
+    ]
+    engine = SimulationEngine(
+        zones,
+        park_prob=scenario["park_prob"],
+        unpark_prob=scenario["unpark_prob"],
+        seed=seed,
+    )
+
+    samples = 0
+    occupancy_sum = [0.0] * len(zones)
+    max_waiting = [0] * len(zones)
+    full_samples = [0] * len(zones)
+    while engine.now < scenario["horizon"]:
+        engine.run_until(min(engine.now + sample_every, scenario["horizon"]))
+        samples += 1
+        for i, zone in enumerate(zones):
+            occupancy_sum[i] += zone.occupancy_rate
+            max_waiting[i] = max(max_waiting[i], zone.waiting)
+            full_samples[i] += zone.free_slots == 0
+
+    samples = max(samples, 1)
+    return {
+        "events": engine.events_processed,
+        "mean_rate": [total / samples for total in occupancy_sum],
+        "max_waiting": max_waiting,
+        "p_full": [count / samples for count in full_samples],
+        "final_free_slots": [zone.free_slots for zone in zones],
+        "final_waiting": [zone.waiting for zone in zones],
+    }
+
+
+def _task_seed(seed, index, replica):
+    # Seed deterministico per task: non dipende dall'ordine di esecuzione dei processi
+    return f"{seed}:{index}:{replica}"
+
+
+def iter_scenario_sweep(scenarios, replicas=1, seed=0, workers=None):
+    # Distribuisce le simulazioni su un pool di processi e restituisce i risultati man mano
+    # che sono pronti: (indice_scenario, indice_replica, risultato).
+    # Con workers=0 le simulazioni vengono eseguite nel processo corrente (utile per debug e test)
+    tasks = [(i, r) for i in range(len(scenarios)) for r in range(replicas)]
+
+    if workers == 0:
+        for i, r in tasks:
+            yield i, r, run_scenario(scenarios[i], _task_seed(seed, i, r))
+        return
+
+    # Import differito: concurrent.futures.process pesa sull'avvio degli usi headless
+    # pylint: disable-next=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_scenario, scenarios[i], _task_seed(seed, i, r)): (i, r)
+            for i, r in tasks
+        }
+        for future in as_completed(futures):
+            i, r = futures[future]
+            yield i, r, future.result()
+
+
+def run_scenario_sweep(scenarios, replicas=1, seed=0, workers=None):
+    # Aggrega i risultati delle repliche: media per scenario delle metriche per zona
+    aggregated = [
+        {
+            "scenario": scenario,
+            "replicas": 0,
+            "events": 0,
+            "mean_rate": None,
+            "max_waiting": None,
+        }
+        for scenario in scenarios
+    ]
+    for i, _, result in iter_scenario_sweep(scenarios, replicas, seed, workers):
+        entry = aggregated[i]
+        entry["replicas"] += 1
+        entry["events"] += result["events"]
+        if entry["mean_rate"] is None:
+            entry["mean_rate"] = list(result["mean_rate"])
+            entry["max_waiting"] = list(result["max_waiting"])
+        else:
+            entry["mean_rate"] = [
+                a + b for a, b in zip(entry["mean_rate"], result["mean_rate"])
+            ]
+            entry["max_waiting"] = [
+                max(a, b) for a, b in zip(entry["max_waiting"], result["max_waiting"])
+            ]
+
+    for entry in aggregated:
+        if entry["replicas"]:
+            entry["mean_rate"] = [
+                total / entry["replicas"] for total in entry["mean_rate"]
+            ]
+    return aggregated
+
+
+if __name__ == "__main__":
+    # python -m UniPark: interfaccia a riga di comando (vedi UniParkCLI)
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniParkCLI import main  # type: ignore # isort: skip
+
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# Modulo UniParkBatch: Simulatore vettoriale (NumPy) per la pianificazione della capacità.
+# Mantiene lo stato di N zone x M repliche indipendenti in array NumPy e applica
+# un intero tick di eventi park/unpark per passo, con la stessa semantica di ParkingZone.
+
+import numpy as np
+
+
+class BatchSimulator:  # pylint: disable=too-many-instance-attributes
+    # Simulatore Monte Carlo: ogni riga è una zona, ogni colonna una replica indipendente
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        capacities,
+        free_slots,
+        replicas,
+        *,
+        park_prob=0.4,
+        unpark_prob=0.4,
+        seed=None,
+    ):
+        # capacities e free_slots hanno una voce per zona; park_prob/unpark_prob
+        # possono essere scalari o array con una probabilità per zona
+        self.capacity = np.asarray(capacities, dtype=np.int64)
+        initial = np.minimum(
+            np.maximum(np.asarray(free_slots, dtype=np.int64), 0), self.capacity
+        )
+        self.n_zones = self.capacity.shape[0]
+        self.replicas = int(replicas)
+
+        self.free_slots = np.repeat(initial[:, None], self.replicas, axis=1)
+        self.waiting = np.zeros((self.n_zones, self.replicas), dtype=np.int64)
+        self._cap_column = self.capacity[:, None]
+
+        # Soglie cumulative per estrarre l'evento con un solo numero casuale per cella
+        park = np.broadcast_to(np.asarray(park_prob, dtype=np.float64), (self.n_zones,))
+        unpark = np.broadcast_to(
+            np.asarray(unpark_prob, dtype=np.float64), (self.n_zones,)
+        )
+        self._park_threshold = park[:, None]
+        self._unpark_threshold = (park + unpark)[:, None]
+
+        self.rng = np.random.default_rng(seed)
+        self.ticks = 0
+
+        # Istogrammi cumulativi: occupazione (0..capacità max) e coda (cresce al bisogno)
+        self._occ_bins = int(self.capacity.max()) + 1 if self.n_zones else 1
+        self.occupancy_hist = np.zeros((self.n_zones, self._occ_bins), dtype=np.int64)
+        self.queue_hist = np.zeros((self.n_zones, 1), dtype=np.int64)
+        self._zone_offsets = np.arange(self.n_zones, dtype=np.int64)[:, None]
+
+    def step(self, draws=None):
+        # Applica un tick: per ogni cella (zona, replica) al più un evento park o unpark.
+        # park:   se ci sono posti liberi ne occupa uno, altrimenti la coda cresce
+        # unpark: se c'è coda entra un'auto in attesa, altrimenti si libera un posto (se occupato)
+        if draws is None:
+            draws = self.rng.random((self.n_zones, self.replicas))
+
+        parks = draws < self._park_threshold
+        unparks = (draws >= self._park_threshold) & (draws < self._unpark_threshold)
+
+        has_free = self.free_slots > 0
+        has_queue = self.waiting > 0
+
+        self.free_slots -= parks & has_free
+        self.waiting += parks & ~has_free
+
+        self.waiting -= unparks & has_queue
+        self.free_slots += unparks & ~has_queue & (self.free_slots < self._cap_column)
+
+        self.ticks += 1
+
+    def _record(self):
+        # Aggiorna gli istogrammi con lo stato corrente di tutte le celle
+        occupied = self._cap_column - self.free_slots
+        flat = (self._zone_offsets * self._occ_bins + occupied).ravel()
+        self.occupancy_hist += np.bincount(
+            flat, minlength=self.occupancy_hist.size
+        ).reshape(self.occupancy_hist.shape)
+
+        max_wait = int(self.waiting.max()) + 1
+        if max_wait > self.queue_hist.shape[1]:
+            grown = np.zeros((self.n_zones, max_wait), dtype=np.int64)
+            grown[:, : self.queue_hist.shape[1]] = self.queue_hist
+            self.queue_hist = grown
+        bins = self.queue_hist.shape[1]
+        flat = (self._zone_offsets * bins + self.waiting).ravel()
+        self.queue_hist += np.bincount(flat, minlength=self.queue_hist.size).reshape(
+            self.queue_hist.shape
+        )
+
+    def run(self, ticks, block=256, record_every=1):
+        # Esegue 'ticks' passi estraendo i numeri casuali a blocchi per ridurre l'overhead
+        done = 0
+        while done < ticks:
+            size = min(block, ticks - done)
+            draws = self.rng.random((size, self.n_zones, self.replicas))
+            for i in range(size):
+                self.step(draws[i])
+                if record_every and (done + i + 1) % record_every == 0:
+                    self._record()
+            done += size
+        return self.results()
+
+    def results(self):
+        # Restituisce le distribuzioni di occupazione e coda per zona
+        occ_total = self.occupancy_hist.sum(axis=1, keepdims=True)
+        queue_total = self.queue_hist.sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            occ_dist = np.where(occ_total > 0, self.occupancy_hist / occ_total, 0.0)
+            queue_dist = np.where(queue_total > 0, self.queue_hist / queue_total, 0.0)
+
+        occupied = self._cap_column - self.free_slots
+        return {
+            "ticks": self.ticks,
+            "replicas": self.replicas,
+            "occupancy_distribution": occ_dist,
+            "queue_distribution": queue_dist,
+            "mean_occupancy": occupied.mean(axis=1),
+            "mean_waiting": self.waiting.mean(axis=1),
+            "p_full": (self.free_slots == 0).mean(axis=1),
+        }
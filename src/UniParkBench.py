@@ -0,0 +1,234 @@
+# Modulo UniParkBench: Suite di benchmark per il modello e per il refresh della GUI.
+# Produce risultati JSON leggibili da macchina e, dato un baseline salvato, segnala le regressioni.
+#
+# Uso:
+#   python UniParkBench.py --output bench.json
+#   python UniParkBench.py --baseline bench.json --tolerance 0.15
+#
+# Il benchmark della GUI richiede un display (anche virtuale, es. xvfb-run): senza display
+# viene riportato come saltato. Ogni risultato della GUI indica la modalità misurata nel
+# campo "dashboard": con 10 zone le schede, con 100 zone (oltre CARD_LIMIT) la heatmap.
+
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+
+from UniPark import ParkingZone, SimulationEngine, UniParkSystem  # type: ignore # pylint: disable=import-error # isort: skip
+
+THREAD_COUNTS = (1, 2, 4, 8, 16, 32, 64)
+ZONE_COUNTS = (10, 100, 1000)
+
+
+def _metric(value, unit, better="higher"):
+    # Voce di risultato: valore, unità e direzione "migliore" (per il confronto col baseline)
+    return {"value": value, "unit": unit, "better": better}
+
+
+def _best(rounds, better, bench, *args, **kwargs):
+    # Ripete la misura e tiene il risultato migliore, per ridurre il rumore tra esecuzioni
+    values = [bench(*args, **kwargs) for _ in range(rounds)]
+    return max(values) if better == "higher" else min(values)
+
+
+def bench_park_unpark(threads, ops_per_thread, shared=True):
+    # Throughput di park/unpark: tutti i thread sulla stessa zona (contesa) o una zona per thread
+    zones = (
+        [ParkingZone("Bench", 1000, 500)] * threads
+        if shared
+        else [ParkingZone(f"Bench {i}", 1000, 500) for i in range(threads)]
+    )
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(zone):
+        barrier.wait()
+        for _ in range(ops_per_thread // 2):
+            zone.park()
+            zone.unpark()
+
+    workers = [threading.Thread(target=worker, args=(zone,)) for zone in zones]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return threads * (ops_per_thread // 2) * 2 / elapsed
+
+
+def bench_status(zone_count, repeats):
+    # Costo di get_status_dict su tutte le zone e di get_total_capacity al crescere delle zone
+    system = UniParkSystem(
+        zones=[ParkingZone(f"Z{i}", 100, 50) for i in range(zone_count)]
+    )
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for zone in system.zones:
+            zone.get_status_dict()
+    status_cost = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        system.get_total_capacity()
+    capacity_cost = (time.perf_counter() - start) / repeats
+    return status_cost, capacity_cost
+
+
+def bench_simulation(zone_count, horizon):
+    # Eventi al secondo del motore headless a eventi discreti
+    zones = [ParkingZone(f"Z{i}", 100, 50) for i in range(zone_count)]
+    engine = SimulationEngine(zones, seed=0)
+    start = time.perf_counter()
+    events = engine.run(horizon)
+    return events / (time.perf_counter() - start)
+
+
+def bench_gui_frame(zone_count, frames):
+    # Costo per frame di update_widgets_once (ridisegno completo) e modalità della dashboard
+    # misurata ("cards" o "heatmap"); None se tkinter o il display non sono disponibili
+    try:
+        # pylint: disable-next=import-outside-toplevel
+        import tkinter
+    except ImportError:
+        return None
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniparkGUI import UniParkApp  # type: ignore # isort: skip
+
+    system = UniParkSystem(
+        zones=[ParkingZone(f"Zona {i}", 100, 50) for i in range(zone_count)]
+    )
+    try:
+        app = UniParkApp(system)
+    except tkinter.TclError:
+        return None  # Nessun display disponibile
+
+    try:
+        # Senza mainloop i timer (simulazione, ridisegni pianificati) non vengono eseguiti:
+        # si misura solo il ridisegno completo dei widget
+        app.running = False
+        app.update_idletasks()
+        start = time.perf_counter()
+        for frame in range(frames):
+            for zone in system.zones:
+                if frame % 2:
+                    zone.unpark()
+                else:
+                    zone.park()
+            app.update_widgets_once()
+            app.update_idletasks()
+        return (time.perf_counter() - start) / frames, app.dashboard_mode
+    finally:
+        app.destroy()
+
+
+def run_suite(quick=False, rounds=3):
+    # Esegue tutti i benchmark e restituisce un dizionario serializzabile in JSON
+    scale = 0.05 if quick else 1.0
+    thread_counts = THREAD_COUNTS[:3] if quick else THREAD_COUNTS
+    zone_counts = ZONE_COUNTS[:2] if quick else ZONE_COUNTS
+    results = {}
+
+    for threads in thread_counts:
+        ops = max(100, int(200_000 * scale / threads))
+        results[f"park_unpark.contended.threads_{threads}"] = _metric(
+            _best(rounds, "higher", bench_park_unpark, threads, ops, shared=True),
+            "ops/s",
+        )
+        results[f"park_unpark.uncontended.threads_{threads}"] = _metric(
+            _best(rounds, "higher", bench_park_unpark, threads, ops, shared=False),
+            "ops/s",
+        )
+
+    for zones in zone_counts:
+        repeats = max(5, int(2_000 * scale * 10 / zones))
+        status_cost, capacity_cost = min(
+            bench_status(zones, repeats) for _ in range(rounds)
+        )
+        results[f"status.get_status_dict_all.zones_{zones}"] = _metric(
+            status_cost, "s", "lower"
+        )
+        results[f"status.get_total_capacity.zones_{zones}"] = _metric(
+            capacity_cost, "s", "lower"
+        )
+        results[f"simulation.events_per_sec.zones_{zones}"] = _metric(
+            _best(
+                rounds, "higher", bench_simulation, zones, 36_000 * scale * 10 / zones
+            ),
+            "events/s",
+        )
+
+    for zones in zone_counts[:2]:
+        measured = bench_gui_frame(zones, max(3, int(50 * scale)))
+        if measured is not None:
+            frame_cost, dashboard = measured
+            results[f"gui.update_widgets_once.zones_{zones}"] = {
+                **_metric(frame_cost, "s", "lower"),
+                "dashboard": dashboard,
+            }
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "rounds": rounds,
+            "platform": platform.platform(),
+            "quick": quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.10):
+    # Confronta con un baseline: regressione se peggiora oltre la tolleranza relativa.
+    # Restituisce la lista di (metrica, valore_baseline, valore_attuale, variazione)
+    regressions = []
+    for name, metric in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference or not reference["value"]:
+            continue
+        change = (metric["value"] - reference["value"]) / reference["value"]
+        worse = -change if metric["better"] == "higher" else change
+        if worse > tolerance:
+            regressions.append((name, reference["value"], metric["value"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark UniPark")
+    parser.add_argument(
+        "--quick", action="store_true", help="dimensioni ridotte (smoke test)"
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="ripetizioni per misura")
+    parser.add_argument("--output", help="file JSON in cui salvare i risultati")
+    parser.add_argument("--baseline", help="file JSON di riferimento per il confronto")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10, help="peggioramento tollerato"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_suite(quick=args.quick, rounds=args.rounds)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        for name, old, new, change in regressions:
+            print(
+                f"REGRESSIONE {name}: {old:.6g} -> {new:.6g} ({change:+.1%})",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
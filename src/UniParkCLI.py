@@ -0,0 +1,257 @@
+# Modulo UniParkCLI: Interfaccia a riga di comando di UniPark.
+#
+# Uso (dalla cartella src):
+#   python -m UniPark simulate --zones 50 --duration 3600 --json
+#   python -m UniPark simulate --zones 50 --export DIR [--export-format npy]
+#   python -m UniPark status [--shared NOME]
+#   python -m UniPark bench --quick
+#   python -m UniPark soak --threads 8 --ops 250000 [--processes 4]
+#   python -m UniPark serve --port 7070
+#   python -m UniPark gui [--zones 300]
+#
+# Il percorso headless importa solo il modello: tkinter, asyncio e i moduli opzionali
+# vengono importati soltanto dal sottocomando che li usa, per un avvio rapido.
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from UniPark import ParkingZone, SimulationEngine, UniParkSystem  # type: ignore # pylint: disable=import-error # isort: skip
+
+
+def _build_system(zones, capacity, seed):
+    # Sistema di default (tre zone) oppure "zones" zone generate in modo riproducibile
+    if not zones:
+        return UniParkSystem(seed=seed)
+    rng = random.Random(seed)
+    return UniParkSystem(
+        zones=[
+            ParkingZone(f"Zona {i}", capacity, rng.randint(0, capacity))
+            for i in range(zones)
+        ]
+    )
+
+
+def _report(system):
+    # Stato delle zone e totali da un unico snapshot coerente
+    snapshot = system.snapshot()
+    return [snapshot.status(i) for i in range(len(snapshot))], snapshot.totals()
+
+
+def _print_status(system, as_json, out):
+    statuses, totals = _report(system)
+    if as_json:
+        json.dump({"zones": statuses, "totals": totals}, out, indent=2)
+        out.write("\n")
+        return
+    out.write(f"{'Zona':<28} {'Occ.':>6} {'Cap.':>6} {'Coda':>6} {'%':>6}\n")
+    for status in statuses:
+        out.write(
+            f"{status['name'][:28]:<28} {status['occupied']:>6} {status['capacity']:>6} "
+            f"{status['waiting']:>6} {status['rate']:>5.1f}%\n"
+        )
+    out.write(
+        f"{'TOTALE':<28} {totals['occupied']:>6} {totals['capacity']:>6} "
+        f"{totals['waiting']:>6}\n"
+    )
+
+
+def cmd_simulate(args, out):
+    # Simulazione headless a eventi discreti per "duration" secondi virtuali
+    system = _build_system(args.zones, args.capacity, args.seed)
+    engine = SimulationEngine(
+        system.zones,
+        park_prob=args.park_prob,
+        unpark_prob=args.unpark_prob,
+        seed=args.seed,
+    )
+    start = time.perf_counter()
+    if args.export:
+        # pylint: disable-next=import-error, import-outside-toplevel
+        from UniParkExport import ColumnarExporter, export_simulation  # type: ignore # isort: skip
+
+        with ColumnarExporter(
+            args.export, system, fmt=args.export_format, clock=lambda: engine.now
+        ) as exporter:
+            events = export_simulation(
+                engine, exporter, args.duration, args.sample_every
+            )
+    else:
+        events = engine.run(args.duration)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        statuses, totals = _report(system)
+        json.dump(
+            {
+                "events": events,
+                "seconds": elapsed,
+                "zones": statuses,
+                "totals": totals,
+            },
+            out,
+            indent=2,
+        )
+        out.write("\n")
+    else:
+        _print_status(system, False, out)
+        out.write(f"{events} eventi simulati in {elapsed:.3f} s\n")
+    return 0
+
+
+def cmd_status(args, out):
+    # Stato corrente: di un blocco condiviso esistente oppure di un sistema di default
+    if args.shared:
+        system = UniParkSystem.attach_shared(args.shared)
+        try:
+            _print_status(system, args.json, out)
+        finally:
+            system.shared_table.close()
+    else:
+        _print_status(
+            _build_system(args.zones, args.capacity, args.seed), args.json, out
+        )
+    return 0
+
+
+def cmd_bench(args, _out):
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniParkBench import main as bench_main  # type: ignore # isort: skip
+
+    return bench_main(args.extra)
+
+
+def cmd_soak(args, out):
+    # Prova di resistenza concorrente: esito 1 se qualche invariante è violata
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniParkSoak import run_soak  # type: ignore # isort: skip
+
+    report = run_soak(
+        _build_system(args.zones, args.capacity, args.seed) if args.zones else None,
+        threads=args.threads,
+        processes=args.processes,
+        ops=args.ops,
+        seed=args.seed or 0,
+    )
+    if args.json:
+        json.dump(report, out, indent=2)
+        out.write("\n")
+    else:
+        latency = report["latency"]["all"]
+        out.write(
+            f"{report['operations']} operazioni ({report['mode']}, {report['workers']} "
+            f"worker) in {report['seconds']:.2f} s: {report['throughput']:.0f} op/s\n"
+            f"latenza p50 {latency['p50'] * 1e6:.1f} us, p99 {latency['p99'] * 1e6:.1f} us, "
+            f"p99.9 {latency['p999'] * 1e6:.1f} us, max {report['latency']['max'] * 1e6:.1f} us\n"
+            f"{report['checks']} verifiche, {report['violations']} violazioni\n"
+        )
+        for message in report["reports"]:
+            out.write(f"  {message}\n")
+    return 1 if report["violations"] else 0
+
+
+def cmd_serve(args, out):
+    # Servizio di ingestione degli eventi dei varchi fino a Ctrl-C
+    # pylint: disable-next=import-outside-toplevel
+    import asyncio
+
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniParkServer import IngestionServer  # type: ignore # isort: skip
+
+    system = _build_system(args.zones, args.capacity, args.seed)
+
+    async def serve():
+        server = await IngestionServer(
+            system, args.host, args.port, udp_port=args.udp_port
+        ).start()
+        out.write(f"In ascolto su {server.host}:{server.port}\n")
+        out.flush()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_gui(args, _out):
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniparkGUI import UniParkApp  # type: ignore # isort: skip
+
+    system = _build_system(args.zones, args.capacity, args.seed) if args.zones else None
+    UniParkApp(system, dashboard=args.dashboard).mainloop()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m UniPark", description="UniPark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_system_options(sub):
+        sub.add_argument("--zones", type=int, default=0, help="numero di zone generate")
+        sub.add_argument("--capacity", type=int, default=100, help="posti per zona")
+        sub.add_argument("--seed", type=int, default=None)
+
+    sub = commands.add_parser("simulate", help="simulazione headless")
+    add_system_options(sub)
+    sub.add_argument("--duration", type=float, default=3600.0, help="secondi virtuali")
+    sub.add_argument("--park-prob", type=float, default=0.4)
+    sub.add_argument("--unpark-prob", type=float, default=0.4)
+    sub.add_argument("--json", action="store_true", help="output JSON")
+    sub.add_argument("--export", metavar="DIR", help="esporta eventi e stato in DIR")
+    sub.add_argument("--export-format", choices=("csv", "npy"), default="csv")
+    sub.add_argument(
+        "--sample-every", type=float, default=60.0, help="secondi tra i campioni"
+    )
+    sub.set_defaults(handler=cmd_simulate)
+
+    sub = commands.add_parser("status", help="stato delle zone")
+    add_system_options(sub)
+    sub.add_argument("--shared", help="nome di un blocco di memoria condivisa")
+    sub.add_argument("--json", action="store_true", help="output JSON")
+    sub.set_defaults(handler=cmd_status)
+
+    sub = commands.add_parser(
+        "bench", help="suite di benchmark (opzioni di UniParkBench)"
+    )
+    sub.set_defaults(handler=cmd_bench)
+
+    sub = commands.add_parser("soak", help="prova di resistenza concorrente")
+    add_system_options(sub)
+    sub.add_argument("--threads", type=int, default=8)
+    sub.add_argument("--processes", type=int, default=0, help="processi (0: thread)")
+    sub.add_argument("--ops", type=int, default=250_000, help="operazioni per worker")
+    sub.add_argument("--json", action="store_true", help="output JSON")
+    sub.set_defaults(handler=cmd_soak)
+
+    sub = commands.add_parser("serve", help="servizio di ingestione TCP/UDP")
+    add_system_options(sub)
+    sub.add_argument("--host", default="127.0.0.1")
+    sub.add_argument("--port", type=int, default=7070)
+    sub.add_argument("--udp-port", type=int, default=None)
+    sub.set_defaults(handler=cmd_serve)
+
+    sub = commands.add_parser("gui", help="dashboard grafica")
+    add_system_options(sub)
+    sub.add_argument("--dashboard", choices=("cards", "heatmap"), default=None)
+    sub.set_defaults(handler=cmd_gui)
+    return parser
+
+
+def main(argv=None, out=None):
+    # Le opzioni non riconosciute sono ammesse solo per "bench" (passate a UniParkBench)
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != "bench":
+        parser.error(f"argomenti non riconosciuti: {' '.join(extra)}")
+    args.extra = extra
+    return args.handler(args, out or sys.stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+# Modulo UniParkControl: Controllo della domanda con prezzi dinamici per zona.
+# Una politica calcola il prezzo (o il livello della segnaletica) di una zona dal suo stato:
+# PIDPolicy insegue un obiettivo di occupazione, TieredPolicy applica prezzi a fasce in base
+# alla coda o all'occupazione. PricingController valuta la politica solo per la zona che è
+# appena cambiata (osservatori delle zone), senza rileggere tutte le zone a ogni tick, e
+# accumula metriche pesate nel tempo (occupazione, coda, prezzo medio, incasso).
+#
+# fast_forward() e replay() valutano una politica headless in tempo virtuale: sul traffico
+# simulato da SimulationEngine (flussi casuali per zona con seed) oppure su traffico
+# registrato, con una domanda che risponde al prezzo secondo un'elasticità costante.
+
+import time
+from bisect import bisect_right
+
+from UniPark import ParkingZone, RandomStream, SimulationEngine  # type: ignore # pylint: disable=import-error # isort: skip
+from UniParkJournal import RECORD  # type: ignore # pylint: disable=import-error # isort: skip
+
+MONTH_SECONDS = 30 * 24 * 3600.0
+
+
+class PIDPolicy:  # pylint: disable=too-many-instance-attributes
+    # PID sulla pressione della zona (posti occupati + coda) / capacità rispetto all'obiettivo:
+    # prezzo = base * (1 + kp*errore + ki*integrale + kd*derivata), limitato a [min, max]
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        target=0.85,
+        *,
+        kp=2.0,
+        ki=0.0005,
+        kd=0.0,
+        base_price=1.0,
+        min_price=0.5,
+        max_price=5.0,
+    ):
+        self.target = target
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.base_price = base_price
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def new_state(self):
+        # Stato per zona: [integrale dell'errore, ultimo errore]
+        return [0.0, None]
+
+    def price(self, state, capacity, free, waiting, dt):
+        # pylint: disable=too-many-arguments
+        error = (
+            (capacity - free + waiting) / capacity - self.target if capacity else 0.0
+        )
+        last = state[1]
+        derivative = 0.0
+        if last is not None and dt > 0:
+            # Lo stato è costante tra due eventi: l'integrale accumula l'errore precedente
+            state[0] += last * dt
+            derivative = (error - last) / dt
+        state[1] = error
+        raw = self.base_price * (
+            1.0 + self.kp * error + self.ki * state[0] + self.kd * derivative
+        )
+        price = min(max(raw, self.min_price), self.max_price)
+        # Anti-windup: a prezzo saturato l'integrale non cresce nella direzione della saturazione
+        if last is not None and dt > 0:
+            if (raw > self.max_price and last > 0) or (
+                raw < self.min_price and last < 0
+            ):
+                state[0] -= last * dt
+        return round(price, 2)
+
+
+class TieredPolicy:
+    # Prezzi a fasce: tiers = ((soglia, prezzo), ...) in ordine crescente di soglia; vale la
+    # fascia più alta raggiunta. metric "waiting" (auto in coda) o "occupancy" (percentuale)
+
+    def __init__(
+        self,
+        tiers=((0, 1.0), (1, 1.5), (5, 2.0), (20, 3.0)),
+        *,
+        metric="waiting",
+    ):
+        if metric not in ("waiting", "occupancy"):
+            raise ValueError(f"Metrica non valida: {metric}")
+        self.thresholds = [threshold for threshold, _ in tiers]
+        self.prices = [price for _, price in tiers]
+        self.metric = metric
+        self.base_price = self.prices[0]
+
+    def new_state(self):
+        return None
+
+    def price(self, _state, capacity, free, waiting, _dt):
+        # pylint: disable=too-many-arguments
+        if self.metric == "waiting":
+            value = waiting
+        else:
+            value = (capacity - free) / capacity * 100 if capacity else 0.0
+        return self.prices[max(0, bisect_right(self.thresholds, value) - 1)]
+
+
+class ZoneControl:  # pylint: disable=too-many-instance-attributes, too-few-public-methods
+    # Stato del controllore per una zona e metriche integrate nel tempo
+    __slots__ = (
+        "state",
+        "price",
+        "last_time",
+        "occupancy",
+        "waiting",
+        "elapsed",
+        "occupancy_seconds",
+        "waiting_seconds",
+        "price_seconds",
+        "error_seconds",
+        "full_seconds",
+        "max_waiting",
+        "entries",
+        "revenue",
+        "price_changes",
+    )
+
+    def __init__(self, state, now):
+        self.state = state
+        self.price = 0.0
+        self.last_time = now
+        self.occupancy = 0.0
+        self.waiting = 0
+        self.elapsed = 0.0
+        self.occupancy_seconds = 0.0
+        self.waiting_seconds = 0.0
+        self.price_seconds = 0.0
+        self.error_seconds = 0.0
+        self.full_seconds = 0.0
+        self.max_waiting = 0
+        self.entries = 0
+        self.revenue = 0.0
+        self.price_changes = 0
+
+    def accumulate(self, now, target):
+        # Integra le metriche dall'ultimo evento a "now" con lo stato (costante) precedente
+        dt = now - self.last_time
+        if dt <= 0:
+            return 0.0
+        self.last_time = now
+        self.elapsed += dt
+        self.occupancy_seconds += self.occupancy * dt
+        self.waiting_seconds += self.waiting * dt
+        self.price_seconds += self.price * dt
+        self.error_seconds += abs(self.occupancy - target) * dt
+        if self.occupancy >= 1.0:
+            self.full_seconds += dt
+        return dt
+
+
+class PricingController:
+    # Applica una politica alle zone di un sistema (o a un elenco di zone), aggiornata
+    # dagli osservatori
+
+    def __init__(self, system, policy, *, clock=time.monotonic, on_price=None):
+        # on_price(zone, prezzo): chiamata solo quando il prezzo di una zona cambia
+        # (es. aggiornamento della segnaletica), sotto il lock della zona
+        self.zones = list(getattr(system, "zones", system))
+        self.policy = policy
+        self.clock = clock
+        self.on_price = on_price
+        self.target = getattr(policy, "target", 1.0)
+        self.controls = {}
+        self.prices = {}
+        for zone in self.zones:
+            self.track(zone)
+
+    def track(self, zone):
+        if zone.name in self.controls:
+            return
+        if zone not in self.zones:
+            self.zones.append(zone)
+        control = ZoneControl(self.policy.new_state(), self.clock())
+        with zone.lock:
+            self.controls[zone.name] = control
+            self._evaluate(zone, control, 0.0)
+            zone.add_observer(self._on_zone_change)
+
+    def untrack(self, zone):
+        zone.remove_observer(self._on_zone_change)
+
+    def _on_zone_change(self, zone, delta_free, delta_waiting):
+        # Ingressi: posti occupati più auto uscite dalla coda per entrare
+        control = self.controls[zone.name]
+        dt = control.accumulate(self.clock(), self.target)
+        entries = max(0, -delta_free) + max(0, -delta_waiting)
+        control.entries += entries
+        control.revenue += entries * control.price  # Al prezzo esposto all'arrivo
+        self._evaluate(zone, control, dt)
+
+    def _evaluate(self, zone, control, dt):
+        # Chiamata con il lock della zona acquisito: lavoro O(1) sulla sola zona cambiata
+        capacity, free, waiting = zone.capacity, zone.free_slots, zone.waiting
+        control.occupancy = (capacity - free) / capacity if capacity else 0.0
+        control.waiting = waiting
+        control.max_waiting = max(control.max_waiting, waiting)
+        price = self.policy.price(control.state, capacity, free, waiting, dt)
+        if price != control.price:
+            control.price = price
+            control.price_changes += 1
+            self.prices[zone.name] = price
+            if self.on_price is not None:
+                self.on_price(zone, price)
+
+    def demand(self, elasticity=1.0):
+        # Fattore di domanda per zona a elasticità costante: (prezzo base / prezzo) ^ elasticità
+        base = self.policy.base_price
+        prices = self.prices
+        return lambda zone: (base / prices[zone.name]) ** elasticity
+
+    def report(self, now=None):
+        # Metriche per zona pesate nel tempo fino a "now" (default: l'orologio del controllore)
+        now = self.clock() if now is None else now
+        result = {}
+        for zone in self.zones:
+            control = self.controls[zone.name]
+            with zone.lock:
+                control.accumulate(now, self.target)
+                elapsed = control.elapsed or 1.0
+                result[zone.name] = {
+                    "price": control.price,
+                    "mean_price": control.price_seconds / elapsed,
+                    "mean_occupancy": control.occupancy_seconds / elapsed,
+                    "mean_waiting": control.waiting_seconds / elapsed,
+                    "mean_abs_error": control.error_seconds / elapsed,
+                    "full_fraction": control.full_seconds / elapsed,
+                    "max_waiting": control.max_waiting,
+                    "entries": control.entries,
+                    "revenue": control.revenue,
+                    "price_changes": control.price_changes,
+                }
+        return result
+
+
+def _build_zones(zones):
+    # zones: tuple (nome, capacità, posti liberi iniziali). Zone isolate, senza
+    # UniParkSystem: la valutazione non usa instradamento, totali e snapshot
+    return [ParkingZone(name, capacity, free) for name, capacity, free in zones]
+
+
+def fast_forward(  # pylint: disable=too-many-arguments
+    policy,
+    zones,
+    *,
+    duration=MONTH_SECONDS,
+    seed=0,
+    elasticity=1.0,
+    **engine_options,
+):
+    # Valuta la politica su traffico simulato: la probabilità di arrivo di ogni zona è scalata
+    # dal fattore di domanda del prezzo corrente. Il tempo del controllore è quello virtuale
+    zones = _build_zones(zones)
+    engine = SimulationEngine(zones, seed=seed, **engine_options)
+    controller = PricingController(zones, policy, clock=lambda: engine.now)
+    engine.demand = controller.demand(elasticity)
+    start = time.perf_counter()
+    events = engine.run(duration)
+    return {
+        "events": events,
+        "seconds": time.perf_counter() - start,
+        "zones": controller.report(engine.now),
+    }
+
+
+def replay(policy, zones, traffic, *, seed=0, elasticity=1.0):
+    # Valuta la politica su traffico registrato: tuple (istante, zona, tipo) con tipo
+    # "park"/"queue" (arrivo) o "unpark" (uscita), come gli eventi di SimulationEngine.
+    # Gli arrivi registrati sono il massimo della domanda: un prezzo più alto del base ne
+    # scarta una parte (auto dirottate), un prezzo più basso non può crearne di nuovi
+    zones = _build_zones(zones)
+    clock = [0.0]
+    controller = PricingController(zones, policy, clock=lambda: clock[0])
+    demand = controller.demand(elasticity)
+    rng = RandomStream(f"{seed}:replay")
+    by_name = {zone.name: zone for zone in zones}
+    diverted = dict.fromkeys(by_name, 0)
+    events = 0
+    start = time.perf_counter()
+    for when, name, kind in traffic:
+        zone = by_name[getattr(name, "name", name)]
+        clock[0] = max(clock[0], when)
+        events += 1
+        if kind == "unpark":
+            zone.unpark()
+        elif rng.random() < demand(zone):
+            zone.park()
+        else:
+            diverted[zone.name] += 1
+    report = controller.report(clock[0])
+    for name, count in diverted.items():
+        report[name]["diverted"] = count
+    return {
+        "events": events,
+        "seconds": time.perf_counter() - start,
+        "zones": report,
+    }
+
+
+def journal_traffic(path, names):
+    # Traffico registrato da un journal di UniParkJournal (journal.bin): ogni record diventa
+    # arrivi (posti occupati o auto in coda) e uscite; names è l'elenco delle zone in ordine
+    with open(path, "rb") as handle:
+        data = handle.read()
+    usable = len(data) - len(data) % RECORD.size
+    for when, index, delta_free, delta_waiting in RECORD.iter_unpack(data[:usable]):
+        name = names[index]
+        for _ in range(max(0, -delta_free) + max(0, delta_waiting)):
+            yield when, name, "park"
+        for _ in range(max(0, delta_free) + max(0, -delta_waiting)):
+            yield when, name, "unpark"
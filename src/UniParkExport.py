@@ -0,0 +1,290 @@
+# Modulo UniParkExport: Esportazione colonnare di eventi e stato per l'analisi offline.
+# Gli eventi delle zone (osservatori) e i campioni periodici dello stato (snapshot del
+# sistema) vengono accumulati in colonne array di dimensione fissa; ogni lotto pieno passa
+# a un thread di scrittura tramite una coda limitata, così il percorso caldo non fa I/O e la
+# memoria resta limitata (al più max_pending lotti in attesa) anche con decine di milioni
+# di eventi.
+#
+# Formati: "csv" (un file per tabella, scritto a blocchi con csv.writer) oppure "npy" (un
+# file NumPy .npy per colonna, scritto in streaming senza richiedere numpy: l'intestazione
+# ha dimensione fissa e viene riscritta con il numero finale di righe alla chiusura).
+# I nomi delle zone sono in zones.csv; eventi e campioni usano l'indice della zona.
+
+import csv
+import os
+import queue
+import sys
+import threading
+import time
+from array import array
+
+# Tipi di evento ricavati dai delta notificati dagli osservatori
+KINDS = ("park", "queue", "unpark", "other")
+PARK, QUEUE, UNPARK, OTHER = range(len(KINDS))
+
+# Tabelle esportate: (nome colonna, typecode array)
+TABLES = {
+    "events": (
+        ("time", "d"),
+        ("zone", "q"),
+        ("kind", "b"),
+        ("delta_free", "q"),
+        ("delta_waiting", "q"),
+    ),
+    "status": (
+        ("time", "d"),
+        ("zone", "q"),
+        ("capacity", "q"),
+        ("free_slots", "q"),
+        ("waiting", "q"),
+        ("reserved", "q"),
+    ),
+}
+
+# Descrittore NumPy di ogni typecode, nell'ordine dei byte della macchina
+_ENDIAN = "<" if sys.byteorder == "little" else ">"
+_DESCR = {"d": f"{_ENDIAN}f8", "q": f"{_ENDIAN}i8", "b": "|i1"}
+
+# Intestazione .npy versione 1.0 di lunghezza fissa (multiplo di 64 byte)
+_NPY_HEADER = 128
+
+
+def _kind(delta_free, delta_waiting):
+    if delta_free < 0:
+        return PARK
+    if delta_waiting > 0:
+        return QUEUE
+    if delta_free > 0 or delta_waiting < 0:
+        return UNPARK
+    return OTHER
+
+
+def _npy_header(descr, rows):
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({rows},), }}"
+    header = header.ljust(_NPY_HEADER - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode()
+
+
+class _CsvSink:
+    # Una tabella in un file CSV: intestazione all'apertura, poi un blocco per lotto
+
+    def __init__(self, path, columns):
+        self._file = open(  # pylint: disable=consider-using-with
+            path, "w", newline="", encoding="utf-8", buffering=1 << 20
+        )
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write(self, batch):
+        self._writer.writerows(zip(*batch))
+
+    def close(self):
+        self._file.close()
+
+
+class _NpySink:
+    # Una tabella come un file .npy per colonna (es. events.time.npy)
+
+    def __init__(self, path, columns):
+        base = path[: -len(".npy")]
+        self._columns = columns
+        self._rows = 0
+        self._files = []
+        for name, typecode in columns:
+            handle = open(  # pylint: disable=consider-using-with
+                f"{base}.{name}.npy", "wb", buffering=1 << 20
+            )
+            handle.write(_npy_header(_DESCR[typecode], 0))
+            self._files.append(handle)
+
+    def write(self, batch):
+        for handle, column in zip(self._files, batch):
+            handle.write(column.tobytes())
+        self._rows += len(batch[0])
+
+    def close(self):
+        # Riscrive le intestazioni con il numero finale di righe
+        for handle, (_, typecode) in zip(self._files, self._columns):
+            handle.seek(0)
+            handle.write(_npy_header(_DESCR[typecode], self._rows))
+            handle.close()
+
+
+SINKS = {"csv": _CsvSink, "npy": _NpySink}
+
+
+class ColumnarExporter:  # pylint: disable=too-many-instance-attributes
+    # Esportatore collegato alle zone di un UniParkSystem tramite gli osservatori
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        directory,
+        system,
+        *,
+        fmt="csv",
+        batch_size=65_536,
+        max_pending=4,
+        clock=time.time,
+    ):
+        if fmt not in SINKS:
+            raise ValueError(f"Formato non supportato: {fmt}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.system = system
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.clock = clock
+        self.rows = dict.fromkeys(TABLES, 0)
+
+        self.zone_names = []  # Indice esportato -> nome della zona
+        self._zone_ids = []
+        self._index = {}  # Nome della zona -> indice esportato
+        self._tracked = set()  # Zone con l'osservatore registrato
+        self._batches = {table: self._new_batch(table) for table in TABLES}
+        self._lock = threading.Lock()
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._sinks = {
+            table: SINKS[fmt](os.path.join(directory, f"{table}.{fmt}"), columns)
+            for table, columns in TABLES.items()
+        }
+        self._writer = threading.Thread(
+            target=self._write_loop, name="UniParkExport", daemon=True
+        )
+        self._writer.start()
+        for zone in system.zones:
+            self.track(zone)
+
+    @staticmethod
+    def _new_batch(table):
+        return [array(typecode) for _, typecode in TABLES[table]]
+
+    def _zone_index(self, name, zone_id=None):
+        index = self._index.get(name)
+        if index is None:
+            index = self._index[name] = len(self.zone_names)
+            self.zone_names.append(name)
+            self._zone_ids.append(zone_id)
+        return index
+
+    def track(self, zone):
+        # Collega una zona (anche aggiunta a runtime) all'esportatore
+        with self._lock:
+            if zone in self._tracked:
+                return
+            self._tracked.add(zone)
+            self._zone_index(zone.name, zone.zone_id)
+        zone.add_observer(self._on_zone_change)
+
+    # --------------------- Percorso caldo ---------------------
+
+    def _append(self, table, row):
+        # Chiamata con self._lock acquisito: aggiunge una riga e consegna il lotto se pieno
+        batch = self._batches[table]
+        for column, value in zip(batch, row):
+            column.append(value)
+        if len(batch[0]) >= self.batch_size:
+            self._hand_off(table)
+
+    def _hand_off(self, table):
+        # Il lotto passa al thread di scrittura; se la coda è piena si attende (memoria limitata)
+        batch = self._batches[table]
+        if len(batch[0]):
+            self._batches[table] = self._new_batch(table)
+            self.rows[table] += len(batch[0])
+            self._pending.put((table, batch))
+
+    def _on_zone_change(self, zone, delta_free, delta_waiting):
+        row = (
+            self.clock(),
+            self._index[zone.name],
+            _kind(delta_free, delta_waiting),
+            delta_free,
+            delta_waiting,
+        )
+        with self._lock:
+            self._append("events", row)
+
+    def sample(self, when=None):
+        # Campione dello stato di tutte le zone da un unico snapshot coerente
+        when = self.clock() if when is None else when
+        snapshot = self.system.snapshot()
+        with self._lock:
+            for i, name in enumerate(snapshot.names):
+                self._append(
+                    "status",
+                    (
+                        when,
+                        self._zone_index(name, snapshot.ids[i]),
+                        snapshot.capacity[i],
+                        snapshot.free_slots[i],
+                        snapshot.waiting[i],
+                        snapshot.reserved[i],
+                    ),
+                )
+
+    # --------------------- Scrittura in background ---------------------
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    table, batch = item
+                    self._sinks[table].write(batch)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # L'errore viene rilanciato da close(); i lotti successivi vengono scartati
+                self._error = exc
+            finally:
+                self._pending.task_done()
+
+    def flush(self):
+        # Consegna i lotti parziali e attende che il thread di scrittura li abbia scritti
+        with self._lock:
+            for table in TABLES:
+                self._hand_off(table)
+        self._pending.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        # Scollega gli osservatori, scrive i lotti rimasti, chiude i file e salva zones.csv
+        for zone in self._tracked:
+            zone.remove_observer(self._on_zone_change)
+        with self._lock:
+            for table in TABLES:
+                self._hand_off(table)
+        self._pending.put(None)
+        self._writer.join()
+        for sink in self._sinks.values():
+            sink.close()
+        with open(
+            os.path.join(self.directory, "zones.csv"), "w", newline="", encoding="utf-8"
+        ) as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["zone", "zone_id", "name"])
+            writer.writerows(
+                zip(range(len(self.zone_names)), self._zone_ids, self.zone_names)
+            )
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_simulation(engine, exporter, duration, sample_every=60.0):
+    # Esegue il motore di simulazione campionando lo stato ogni sample_every secondi virtuali;
+    # l'orologio dell'esportatore deve essere quello del motore (clock=lambda: engine.now)
+    end = engine.now + duration
+    events = 0
+    exporter.sample(engine.now)
+    while engine.now < end:
+        events += engine.run_until(min(end, engine.now + sample_every))
+        exporter.sample(engine.now)
+    return events
@@ -0,0 +1,151 @@
+# Modulo UniParkForecast: Previsione della domanda per zona.
+# Per ogni zona si contano arrivi e uscite per fascia della settimana (giorno x ora, a slot
+# di 15 minuti) insieme al tempo di osservazione di ogni fascia: i tassi sono conteggi /
+# esposizione. I modelli si aggiornano a ogni evento (osservatori delle zone) e i tassi
+# vengono ricalcolati solo per le fasce modificate, così le previsioni di tutte le zone
+# restano nell'ordine dei millisecondi.
+#
+# La previsione usa un modello fluido: occupazione e coda evolvono seguendo i tassi medi
+# di arrivo e uscita della fascia, fino all'orizzonte richiesto.
+
+import time
+from array import array
+
+SLOT_SECONDS = 900.0
+WEEK_SECONDS = 7 * 24 * 3600.0
+
+
+class ZoneDemandModel:  # pylint: disable=too-many-instance-attributes
+    # Tassi di arrivo e di uscita per fascia della settimana di una singola zona
+
+    def __init__(self, slot_seconds=SLOT_SECONDS, week_start=0.0):
+        # week_start: un istante (nello stesso orologio degli eventi) che cade a inizio settimana
+        self.slot_seconds = slot_seconds
+        self.week_start = week_start
+        self.slots = int(WEEK_SECONDS // slot_seconds)
+        self.arrivals = array("d", bytes(8 * self.slots))
+        self.departures = array("d", bytes(8 * self.slots))
+        self.exposure = array("d", bytes(8 * self.slots))
+        self._arrival_rate = array("d", bytes(8 * self.slots))
+        self._departure_rate = array("d", bytes(8 * self.slots))
+        self._dirty = set()
+        self._last_seen = None
+
+    def slot_of(self, when):
+        return int((when - self.week_start) % WEEK_SECONDS // self.slot_seconds)
+
+    def _advance(self, when):
+        # Accumula il tempo di osservazione tra l'ultimo evento e "when", fascia per fascia
+        last = self._last_seen
+        self._last_seen = when if last is None else max(last, when)
+        if last is None or when <= last:
+            return
+        if when - last > WEEK_SECONDS:
+            # Oltre una settimana di silenzio: ogni fascia riceve le settimane intere
+            weeks = int((when - last) // WEEK_SECONDS)
+            for slot in range(self.slots):
+                self.exposure[slot] += weeks * self.slot_seconds
+            self._dirty.update(range(self.slots))
+            last += weeks * WEEK_SECONDS
+        while last < when:
+            slot = self.slot_of(last)
+            offset = (last - self.week_start) % self.slot_seconds
+            step = min(self.slot_seconds - offset, when - last)
+            self.exposure[slot] += step
+            self._dirty.add(slot)
+            last += step
+
+    def observe(self, when, arrivals=0, departures=0):
+        # Aggiornamento incrementale con gli eventi avvenuti all'istante "when"
+        self._advance(when)
+        slot = self.slot_of(when)
+        self.arrivals[slot] += arrivals
+        self.departures[slot] += departures
+        self._dirty.add(slot)
+
+    def rates(self):
+        # Tassi per secondo (arrivi, uscite) per fascia; ricalcola solo le fasce modificate
+        for slot in self._dirty:
+            seconds = self.exposure[slot]
+            if seconds > 0:
+                self._arrival_rate[slot] = self.arrivals[slot] / seconds
+                self._departure_rate[slot] = self.departures[slot] / seconds
+        self._dirty.clear()
+        return self._arrival_rate, self._departure_rate
+
+    def predict(self, now, horizon, capacity, occupied, waiting=0):
+        # Modello fluido sulle fasce future: istante di saturazione e coda massima prevista
+        arrival_rate, departure_rate = self.rates()
+        saturation = now if occupied >= capacity else None
+        max_queue = float(waiting)
+        occupied, waiting = float(occupied), float(waiting)
+        clock, end = now, now + horizon
+        while clock < end:
+            slot = self.slot_of(clock)
+            offset = (clock - self.week_start) % self.slot_seconds
+            step = min(self.slot_seconds - offset, end - clock)
+            net = (arrival_rate[slot] - departure_rate[slot]) * step
+            if net >= 0:
+                room = capacity - occupied
+                if saturation is None and net >= room and net > 0:
+                    saturation = clock + step * room / net
+                occupied += min(net, room)
+                waiting += net - min(net, room)
+            else:
+                drained = min(-net, waiting)
+                waiting -= drained
+                occupied = max(0.0, occupied + net + drained)
+            max_queue = max(max_queue, waiting)
+            clock += step
+        return {
+            "saturation_time": saturation,
+            "max_queue": max_queue,
+            "occupied_at_horizon": occupied,
+            "queue_at_horizon": waiting,
+        }
+
+
+class DemandForecaster:
+    # Modelli di domanda di tutte le zone di un sistema, alimentati dagli osservatori
+
+    def __init__(self, system, *, clock=time.time, **model_options):
+        self.system = system
+        self.clock = clock
+        self.model_options = model_options
+        self.models = {}
+        for zone in system.zones:
+            self.track(zone)
+
+    def track(self, zone):
+        if zone.name not in self.models:
+            self.models[zone.name] = ZoneDemandModel(**self.model_options)
+            zone.add_observer(self._on_zone_change)
+
+    def untrack(self, zone):
+        zone.remove_observer(self._on_zone_change)
+
+    def _on_zone_change(self, zone, delta_free, delta_waiting):
+        # Arrivo: un posto occupato o un'auto in coda; uscita: un posto liberato o
+        # un'auto in coda che subentra a chi esce
+        arrivals = max(0, -delta_free) + max(0, delta_waiting)
+        departures = max(0, delta_free) + max(0, -delta_waiting)
+        self.models[zone.name].observe(self.clock(), arrivals, departures)
+
+    def forecast(self, zone, horizon=4 * 3600.0, now=None):
+        now = self.clock() if now is None else now
+        with zone.lock:
+            capacity, occupied, waiting = (
+                zone.capacity,
+                zone.occupied_slots,
+                zone.waiting,
+            )
+        return self.models[zone.name].predict(now, horizon, capacity, occupied, waiting)
+
+    def forecast_all(self, horizon=4 * 3600.0, now=None):
+        # Previsioni per tutte le zone tracciate, indicizzate per nome
+        now = self.clock() if now is None else now
+        return {
+            zone.name: self.forecast(zone, horizon, now)
+            for zone in self.system.zones
+            if zone.name in self.models
+        }
@@ -0,0 +1,302 @@
+# Modulo UniParkGates: Varchi d'ingresso con corsie a capacità limitata.
+# Ogni zona ha uno o più varchi, ogni varco una o più corsie; ogni corsia serve un'auto alla
+# volta con un tasso di servizio (auto al minuto) e ha la propria coda FIFO. Lo stato di
+# tutte le corsie di tutte le zone è in colonne array contigue (layout CSR: le corsie della
+# zona i sono [zone_start[i], zone_start[i + 1])), senza un oggetto per corsia.
+#
+# Con servizio deterministico e FIFO basta l'istante in cui ogni corsia si libera: un'auto
+# che arriva sceglie la corsia che si libera prima, attende fino a quell'istante e supera il
+# varco dopo il tempo di servizio. GateSimulator genera arrivi, passaggi e uscite a eventi
+# discreti (come SimulationEngine) per riprodurre i colli di bottiglia dei varchi.
+
+import heapq
+import math
+import time
+from array import array
+
+from UniPark import RandomStreams  # type: ignore # pylint: disable=import-error # isort: skip
+
+# Default: un varco con una corsia da 6 auto al minuto (10 secondi per auto)
+DEFAULT_GATES = ((1, 6.0),)
+
+ARRIVAL, PASS, DEPART = 0, 1, 2
+
+
+class GateNetwork:  # pylint: disable=too-many-instance-attributes
+    # Varchi e corsie di un insieme di zone in colonne array
+
+    def __init__(self, system, gates=DEFAULT_GATES, *, queue_limit=None):
+        # gates: tuple (corsie, auto al minuto per corsia) per varco, uguali per tutte le zone,
+        # oppure un dizionario nome zona -> tuple. queue_limit: auto per corsia oltre le quali
+        # chi arriva rinuncia (None: code illimitate)
+        self.zones = list(getattr(system, "zones", system))
+        self.queue_limit = queue_limit
+        # Struttura: varchi per zona e corsie per varco (indici di inizio, layout CSR)
+        self.zone_start = array("l", [0])
+        self.gate_start = array("l", [0])
+        self.gate_zone = array("l")
+        self.lane_gate = array("l")
+        self.service = array("d")  # Secondi di servizio per auto
+        for index, zone in enumerate(self.zones):
+            layout = (
+                gates.get(zone.name, DEFAULT_GATES)
+                if isinstance(gates, dict)
+                else gates
+            )
+            for lanes, per_minute in layout:
+                gate = len(self.gate_zone)
+                self.gate_zone.append(index)
+                for _ in range(lanes):
+                    self.lane_gate.append(gate)
+                    self.service.append(60.0 / per_minute)
+                self.gate_start.append(len(self.lane_gate))
+            self.zone_start.append(len(self.lane_gate))
+
+        # Stato dinamico per corsia
+        lanes = len(self.lane_gate)
+        # Istante in cui la corsia finisce il suo arretrato
+        self.next_free = array("d", bytes(8 * lanes))
+        # Auto assegnate alla corsia e non ancora passate
+        self.queued = array("l", [0]) * lanes
+        self.max_queue = array("l", [0]) * lanes
+        self.served = array("q", [0]) * lanes
+        self.wait_total = array("d", bytes(8 * lanes))
+
+    @property
+    def lanes(self):
+        return len(self.lane_gate)
+
+    def capacity_per_minute(self, index):
+        # Auto al minuto che i varchi della zona possono servire al massimo
+        lo, hi = self.zone_start[index], self.zone_start[index + 1]
+        return sum(60.0 / self.service[lane] for lane in range(lo, hi))
+
+    def arrive(self, index, now):
+        # Assegna l'auto alla corsia della zona che si libera prima.
+        # Restituisce (corsia, istante di passaggio) oppure None se l'auto rinuncia
+        lo, hi = self.zone_start[index], self.zone_start[index + 1]
+        if lo == hi:
+            return None
+        next_free = self.next_free
+        lane = min(range(lo, hi), key=next_free.__getitem__)
+        queued = self.queued[lane]
+        if self.queue_limit is not None and queued >= self.queue_limit:
+            return None
+        start = max(now, next_free[lane])
+        done = start + self.service[lane]
+        next_free[lane] = done
+        self.wait_total[lane] += start - now
+        self.queued[lane] = queued + 1
+        if queued + 1 > self.max_queue[lane]:
+            self.max_queue[lane] = queued + 1
+        return lane, done
+
+    def complete(self, lane):
+        # L'auto ha superato il varco
+        self.queued[lane] -= 1
+        self.served[lane] += 1
+
+    def gate_stats(self, elapsed):
+        # Per varco: auto servite, throughput al minuto, utilizzo, attesa media, coda massima
+        stats = []
+        for gate, index in enumerate(self.gate_zone):
+            lanes = range(self.gate_start[gate], self.gate_start[gate + 1])
+            served = sum(self.served[lane] for lane in lanes)
+            busy = sum(self.served[lane] * self.service[lane] for lane in lanes)
+            stats.append(
+                {
+                    "zone": self.zones[index].name,
+                    "gate": gate,
+                    "lanes": len(lanes),
+                    "served": served,
+                    "throughput": served * 60.0 / elapsed if elapsed else 0.0,
+                    "utilization": (
+                        min(1.0, busy / (elapsed * len(lanes))) if elapsed else 0.0
+                    ),
+                    "mean_wait": sum(self.wait_total[lane] for lane in lanes)
+                    / max(1, served + sum(self.queued[lane] for lane in lanes)),
+                    "max_queue": max(self.max_queue[lane] for lane in lanes),
+                }
+            )
+        return stats
+
+
+class GateSimulator:  # pylint: disable=too-many-instance-attributes
+    # Simulazione a eventi discreti di arrivi, passaggi ai varchi e uscite dalle zone
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        network,
+        *,
+        arrival_rate=4.0,
+        dwell_mean=7200.0,
+        seed=None,
+    ):
+        # arrival_rate: auto al minuto per zona (numero o dizionario nome -> tasso), arrivi di
+        # Poisson; dwell_mean: permanenza media nella zona in secondi (esponenziale)
+        self.network = network
+        self.zones = network.zones
+        self.dwell_mean = dwell_mean
+        self.streams = RandomStreams(seed)
+        self.seed = self.streams.seed
+        self._rngs = [self.streams.stream(f"gates:{zone.name}") for zone in self.zones]
+        self.rates = [
+            (
+                arrival_rate.get(zone.name, 0.0)
+                if isinstance(arrival_rate, dict)
+                else arrival_rate
+            )
+            / 60.0
+            for zone in self.zones
+        ]
+        self.now = 0.0
+        self.calendar = []  # Heap di (tempo, sequenza, tipo, indice zona o corsia)
+        self._seq = 0
+        zones = len(self.zones)
+        self.offered = array("q", [0]) * zones
+        self.balked = array("q", [0]) * zones
+        self.admitted = array("q", [0]) * zones
+        self.queued_in_zone = array("q", [0]) * zones
+        self.departed = array("q", [0]) * zones
+        for index, rate in enumerate(self.rates):
+            if rate > 0:
+                self._push(
+                    self.now + self._exponential(index, 1.0 / rate), ARRIVAL, index
+                )
+        # Le auto già parcheggiate all'avvio escono dopo una permanenza esponenziale (senza
+        # memoria: la permanenza residua ha la stessa distribuzione)
+        for index, zone in enumerate(self.zones):
+            for _ in range(zone.capacity - zone.free_slots):
+                self._push(
+                    self.now + self._exponential(index, dwell_mean), DEPART, index
+                )
+
+    def _exponential(self, index, mean):
+        return -math.log(1.0 - self._rngs[index].random()) * mean
+
+    def _push(self, when, kind, target):
+        heapq.heappush(self.calendar, (when, self._seq, kind, target))
+        self._seq += 1
+
+    def step(self):
+        # Esegue il prossimo evento e restituisce (tempo, tipo, indice)
+        if not self.calendar:
+            return None
+        when, _, kind, target = heapq.heappop(self.calendar)
+        self.now = when
+        if kind == ARRIVAL:
+            self._push(
+                when + self._exponential(target, 1.0 / self.rates[target]),
+                ARRIVAL,
+                target,
+            )
+            self.offered[target] += 1
+            assigned = self.network.arrive(target, when)
+            if assigned is None:
+                self.balked[target] += 1
+            else:
+                self._push(assigned[1], PASS, assigned[0])
+        elif kind == PASS:
+            self.network.complete(target)
+            index = self.network.gate_zone[self.network.lane_gate[target]]
+            if self.zones[index].park():
+                self.admitted[index] += 1
+                self._push(
+                    when + self._exponential(index, self.dwell_mean), DEPART, index
+                )
+            else:
+                self.queued_in_zone[index] += 1
+        else:
+            zone = self.zones[target]
+            waiting = zone.waiting
+            if zone.unpark():
+                self.departed[target] += 1
+            if zone.waiting < waiting:
+                # Un'auto in coda nella zona occupa il posto appena liberato
+                self.admitted[target] += 1
+                self._push(
+                    when + self._exponential(target, self.dwell_mean), DEPART, target
+                )
+        return when, kind, target
+
+    def run(self, duration):
+        # Avanza di "duration" secondi virtuali; restituisce il numero di eventi eseguiti
+        end, step, calendar = self.now + duration, self.step, self.calendar
+        events = 0
+        while calendar and calendar[0][0] <= end:
+            step()
+            events += 1
+        self.now = max(self.now, end)
+        return events
+
+    def report(self):
+        # Per zona: domanda offerta e servita (auto al minuto), rinunce, attesa media ai varchi
+        elapsed = self.now
+        network = self.network
+        zones = []
+        for index, zone in enumerate(self.zones):
+            lo, hi = network.zone_start[index], network.zone_start[index + 1]
+            passed = sum(network.served[lo:hi])
+            zones.append(
+                {
+                    "zone": zone.name,
+                    "offered": self.offered[index],
+                    "passed": passed,
+                    "balked": self.balked[index],
+                    "at_gates": sum(network.queued[lo:hi]),
+                    "queued_in_zone": self.queued_in_zone[index],
+                    "offered_rate": (
+                        self.offered[index] * 60.0 / elapsed if elapsed else 0.0
+                    ),
+                    "throughput": passed * 60.0 / elapsed if elapsed else 0.0,
+                    "gate_capacity": network.capacity_per_minute(index),
+                    "mean_wait": sum(network.wait_total[lo:hi])
+                    / max(1, self.offered[index] - self.balked[index]),
+                }
+            )
+        return {
+            "elapsed": elapsed,
+            "zones": zones,
+            "gates": network.gate_stats(elapsed),
+        }
+
+
+def sweep_arrival_rates(  # pylint: disable=too-many-arguments
+    zone_factory,
+    gates,
+    rates,
+    *,
+    duration=3600.0,
+    seed=0,
+    queue_limit=None,
+    collapse=0.95,
+    **options,
+):
+    # Esegue una simulazione per ogni tasso di arrivo (auto al minuto per zona) su zone nuove
+    # create da zone_factory() e indica il primo tasso oltre cui il throughput dei varchi
+    # crolla sotto la frazione "collapse" della domanda offerta
+    rows = []
+    knee = None
+    for rate in rates:
+        network = GateNetwork(zone_factory(), gates, queue_limit=queue_limit)
+        simulator = GateSimulator(network, arrival_rate=rate, seed=seed, **options)
+        start = time.perf_counter()
+        events = simulator.run(duration)
+        report = simulator.report()
+        offered = sum(zone["offered_rate"] for zone in report["zones"])
+        served = sum(zone["throughput"] for zone in report["zones"])
+        ratio = served / offered if offered else 1.0
+        if knee is None and ratio < collapse:
+            knee = rate
+        rows.append(
+            {
+                "rate": rate,
+                "offered": offered,
+                "throughput": served,
+                "ratio": ratio,
+                "mean_wait": max(zone["mean_wait"] for zone in report["zones"]),
+                "events": events,
+                "seconds": time.perf_counter() - start,
+            }
+        )
+    return {"rows": rows, "collapse_rate": knee}
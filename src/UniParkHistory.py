@@ -0,0 +1,208 @@
+# Modulo UniParkHistory: Storico compatto dell'occupazione per zona.
+# Ogni zona registra posti occupati, posti liberi e lunghezza della coda in colonne array.
+# I campioni grezzi vengono aggregati in livelli al minuto e all'ora (min/max/media) e ogni
+# livello ha una ritenzione massima, così la memoria resta limitata. Le query per intervallo
+# usano la ricerca binaria sui timestamp ordinati.
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+METRICS = ("occupied", "free", "waiting")
+
+MINUTE = 60.0
+HOUR = 3600.0
+
+
+class _RawTier:
+    # Campioni grezzi: una riga per campione
+
+    def __init__(self, retention):
+        self.retention = retention
+        self.time = array("d")
+        self.columns = {metric: array("l") for metric in METRICS}
+
+    def append(self, when, values):
+        self.time.append(when)
+        for metric, value in zip(METRICS, values):
+            self.columns[metric].append(value)
+        _trim(self)
+
+    def rows(self, start, end):
+        lo, hi = bisect_left(self.time, start), bisect_right(self.time, end)
+        result = {"time": self.time[lo:hi].tolist()}
+        for metric in METRICS:
+            values = self.columns[metric][lo:hi].tolist()
+            result[f"{metric}_min"] = values
+            result[f"{metric}_max"] = values
+            result[f"{metric}_mean"] = [float(v) for v in values]
+        return result
+
+
+class _RollupTier:
+    # Livello aggregato: una riga per intervallo (inizio, min, max, somma, numero di campioni)
+
+    def __init__(self, width, retention):
+        self.width = width
+        self.retention = retention
+        self.time = array("d")
+        self.count = array("l")
+        self.columns = {}
+        for metric in METRICS:
+            self.columns[f"{metric}_min"] = array("l")
+            self.columns[f"{metric}_max"] = array("l")
+            self.columns[f"{metric}_sum"] = array("d")
+        # Intervallo in corso: [inizio, conteggio, minimi, massimi, somme]
+        self._open = None
+
+    def add(self, when, values):
+        bucket = when - when % self.width
+        current = self._open
+        if current is not None and current[0] != bucket:
+            self._close()
+            current = None
+        if current is None:
+            self._open = [
+                bucket,
+                1,
+                list(values),
+                list(values),
+                [float(v) for v in values],
+            ]
+            return
+        current[1] += 1
+        for i, value in enumerate(values):
+            current[2][i] = min(current[2][i], value)
+            current[3][i] = max(current[3][i], value)
+            current[4][i] += value
+
+    def _close(self):
+        bucket, count, mins, maxs, sums = self._open
+        self.time.append(bucket)
+        self.count.append(count)
+        for i, metric in enumerate(METRICS):
+            self.columns[f"{metric}_min"].append(mins[i])
+            self.columns[f"{metric}_max"].append(maxs[i])
+            self.columns[f"{metric}_sum"].append(sums[i])
+        self._open = None
+        _trim(self)
+
+    def rows(self, start, end):
+        # Le righe chiuse nell'intervallo più l'eventuale intervallo ancora aperto
+        lo = bisect_left(self.time, start - start % self.width)
+        hi = bisect_right(self.time, end)
+        counts = self.count[lo:hi].tolist()
+        result = {"time": self.time[lo:hi].tolist()}
+        for metric in METRICS:
+            result[f"{metric}_min"] = self.columns[f"{metric}_min"][lo:hi].tolist()
+            result[f"{metric}_max"] = self.columns[f"{metric}_max"][lo:hi].tolist()
+            sums = self.columns[f"{metric}_sum"][lo:hi].tolist()
+            result[f"{metric}_mean"] = [s / c for s, c in zip(sums, counts)]
+
+        if self._open is not None and start - self.width < self._open[0] <= end:
+            bucket, count, mins, maxs, sums = self._open
+            result["time"].append(bucket)
+            for i, metric in enumerate(METRICS):
+                result[f"{metric}_min"].append(mins[i])
+                result[f"{metric}_max"].append(maxs[i])
+                result[f"{metric}_mean"].append(sums[i] / count)
+        return result
+
+
+def _trim(tier):
+    # Ritenzione: elimina le righe più vecchie a blocchi (costo ammortizzato O(1) per riga)
+    excess = len(tier.time) - tier.retention
+    if excess > tier.retention // 4:
+        del tier.time[:excess]
+        if hasattr(tier, "count"):
+            del tier.count[:excess]
+        for column in tier.columns.values():
+            del column[:excess]
+
+
+class ZoneHistory:
+    # Storico di una zona su tre livelli: grezzo, al minuto, all'ora
+
+    def __init__(
+        self,
+        raw_retention=86_400,
+        minute_retention=60 * 24 * 31,
+        hour_retention=24 * 366 * 2,
+    ):
+        # Default: un giorno di campioni al secondo, un mese al minuto, due anni all'ora
+        self.raw = _RawTier(raw_retention)
+        self.minute = _RollupTier(MINUTE, minute_retention)
+        self.hour = _RollupTier(HOUR, hour_retention)
+
+    def record(self, when, occupied, free, waiting):
+        # I campioni devono arrivare in ordine di tempo non decrescente
+        values = (occupied, free, waiting)
+        self.raw.append(when, values)
+        self.minute.add(when, values)
+        self.hour.add(when, values)
+
+    def _tier(self, resolution, start, end):
+        # Sceglie il livello: il più fine che copre l'inizio dell'intervallo e resta compatto
+        if resolution != "auto":
+            return {"raw": self.raw, "minute": self.minute, "hour": self.hour}[
+                resolution
+            ]
+        span = end - start
+        for tier, max_span in ((self.raw, 2 * HOUR), (self.minute, 7 * 24 * HOUR)):
+            covers = len(tier.time) and tier.time[0] <= start
+            if span <= max_span and covers:
+                return tier
+        return self.hour
+
+    def query(self, start, end, resolution="auto"):
+        # Serie nell'intervallo [start, end]: tempi e min/max/media per ogni metrica
+        return self._tier(resolution, start, end).rows(start, end)
+
+    def value_at(self, when):
+        # Valore più vicino a un istante (es. "quanto era piena alle 9:00"), dal livello più fine.
+        # Sui campioni grezzi vale l'ultimo campione non successivo all'istante
+        index = bisect_right(self.raw.time, when) - 1
+        if index >= 0:
+            return {
+                metric: float(self.raw.columns[metric][index]) for metric in METRICS
+            }
+        for tier in (self.minute, self.hour):
+            if len(tier.time) and tier.time[0] <= when:
+                rows = tier.rows(when - tier.width, when)
+                if rows["time"]:
+                    return {metric: rows[f"{metric}_mean"][-1] for metric in METRICS}
+        return None
+
+    def nbytes(self):
+        # Memoria occupata dalle colonne di tutti i livelli
+        total = 0
+        for tier in (self.raw, self.minute, self.hour):
+            columns = [tier.time, *tier.columns.values()]
+            if isinstance(tier, _RollupTier):
+                columns.append(tier.count)
+            total += sum(col.buffer_info()[1] * col.itemsize for col in columns)
+        return total
+
+
+class HistoryStore:
+    # Storico di tutte le zone di un sistema, indicizzato per nome di zona
+
+    def __init__(self, **retention):
+        self.retention = retention
+        self.zones = {}
+
+    def zone(self, name):
+        history = self.zones.get(name)
+        if history is None:
+            history = self.zones[name] = ZoneHistory(**self.retention)
+        return history
+
+    def sample(self, system, when):
+        # Registra lo stato di ogni zona del sistema all'istante indicato (da un unico snapshot)
+        snapshot = system.snapshot()
+        for i, name in enumerate(snapshot.names):
+            self.zone(name).record(
+                when, snapshot.occupied(i), snapshot.free_slots[i], snapshot.waiting[i]
+            )
+
+    def query(self, name, start, end, resolution="auto"):
+        return self.zone(name).query(start, end, resolution)
@@ -0,0 +1,274 @@
+# Modulo UniParkJournal: Persistenza opzionale dello stato delle zone.
+# Ogni variazione (park/unpark/coda) viene aggiunta a un journal binario append-only con
+# scritture bufferizzate e fsync periodico; snapshot periodici di tutte le zone permettono
+# al riavvio di caricare l'ultimo snapshot e ripetere solo la coda del journal.
+
+import json
+import os
+import struct
+import time
+from contextlib import ExitStack
+from threading import Event, Lock, Thread
+
+from UniPark import ParkingZone  # type: ignore # pylint: disable=import-error # isort: skip
+
+# Record del journal: istante (double), indice zona, delta posti liberi, delta coda (18 byte)
+RECORD = struct.Struct("<dHii")
+
+JOURNAL_FILE = "journal.bin"
+SNAPSHOT_FILE = "snapshot.json"
+
+
+class EventJournal:  # pylint: disable=too-many-instance-attributes
+    # Journal collegato alle zone di un UniParkSystem tramite il meccanismo degli osservatori
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        directory,
+        system,
+        *,
+        flush_bytes=64 * 1024,
+        fsync_interval=1.0,
+        snapshot_every=100_000,
+        clock=time.time,
+    ):
+        self.directory = directory
+        self.system = system
+        self.flush_bytes = flush_bytes
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.clock = clock
+
+        self.zone_ids = []  # Indice nel journal -> identificativo della zona
+        self._index = {}  # Zona -> indice nel journal
+        self._buffer = bytearray()
+        self._lock = Lock()
+        self._last_fsync = time.monotonic()
+        self.events_since_snapshot = 0
+        self._snapshot_thread = None
+        # Serializza gli snapshot (in background e espliciti) fino al rename del file
+        self._snapshot_lock = Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self.replayed = self.recover()
+        self._file = open(  # pylint: disable=consider-using-with
+            os.path.join(directory, JOURNAL_FILE), "ab"
+        )
+        # L'fsync periodico avviene in un thread dedicato: l'osservatore gira con il lock
+        # della zona e non deve attendere il disco
+        self._sync_request = Event()
+        self._closing = False
+        self._sync_thread = Thread(
+            target=self._sync_loop, name="UniParkJournal-fsync", daemon=True
+        )
+        self._sync_thread.start()
+
+        # Le zone non presenti nello snapshot ricevono nuovi indici; la mappa indici -> zone
+        # viene persistita subito, prima che la zona scriva record nel journal
+        untracked = [zone for zone in system.zones if zone not in self._index]
+        for zone in untracked:
+            self._attach(zone)
+        if untracked:
+            self.snapshot()
+
+    # --------------------- Scrittura ---------------------
+
+    def _attach(self, zone):
+        # Assegna alla zona il prossimo indice del journal e registra l'osservatore
+        with self._lock:
+            self._index[zone] = len(self.zone_ids)
+            self.zone_ids.append(zone.zone_id)
+        zone.add_observer(self._on_zone_change)
+
+    def track(self, zone):
+        # Collega al journal una zona aggiunta a runtime (con snapshot della nuova mappa indici)
+        if zone not in self._index:
+            self._attach(zone)
+            self.snapshot()
+
+    def _on_zone_change(self, zone, delta_free, delta_waiting):
+        # Osservatore: accoda il record nel buffer in memoria; il buffer va su disco quando è
+        # pieno oppure quando è trascorso fsync_interval dall'ultimo fsync
+        record = RECORD.pack(self.clock(), self._index[zone], delta_free, delta_waiting)
+        with self._lock:
+            self._buffer += record
+            self.events_since_snapshot += 1
+            if (
+                len(self._buffer) >= self.flush_bytes
+                or time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._flush_locked()
+            if (
+                self.events_since_snapshot >= self.snapshot_every
+                and self._snapshot_thread is None
+            ):
+                # Lo snapshot acquisisce i lock di tutte le zone: non può essere eseguito
+                # dentro l'osservatore (che possiede già il lock di questa zona)
+                self._snapshot_thread = Thread(
+                    target=self._background_snapshot, name="UniParkJournal", daemon=True
+                )
+                self._snapshot_thread.start()
+
+    def _background_snapshot(self):
+        try:
+            self.snapshot()
+        finally:
+            with self._lock:
+                self._snapshot_thread = None
+
+    def _flush_locked(self):
+        # Scrive il buffer su file; scaduto fsync_interval passa i dati al sistema operativo
+        # e chiede l'fsync al thread di sincronizzazione
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+        now = time.monotonic()
+        if now - self._last_fsync >= self.fsync_interval:
+            self._file.flush()
+            self._last_fsync = now
+            self._sync_request.set()
+
+    def _sync_loop(self):
+        # Thread di sincronizzazione: fsync su richiesta, senza lock del journal o delle zone
+        fd = self._file.fileno()
+        while True:
+            self._sync_request.wait()
+            self._sync_request.clear()
+            if self._closing:
+                return
+            os.fsync(fd)
+
+    def flush(self, sync=True):
+        # Forza la scrittura del buffer (e l'fsync se sync=True)
+        with self._lock:
+            if self._buffer:
+                self._file.write(self._buffer)
+                self._buffer.clear()
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+                self._last_fsync = time.monotonic()
+
+    # --------------------- Snapshot ---------------------
+
+    def snapshot(self):
+        # Salva lo stato di tutte le zone e la posizione corrente nel journal.
+        # I lock delle zone (in ordine globale) bloccano brevemente le scritture, così
+        # lo stato salvato corrisponde esattamente all'offset registrato
+        with self._snapshot_lock:
+            return self._snapshot_serialized()
+
+    def _snapshot_serialized(self):
+        zones = sorted(self._index, key=id)
+        with ExitStack() as stack:
+            for zone in zones:
+                stack.enter_context(zone.lock)
+            with self._lock:
+                if self._buffer:
+                    self._file.write(self._buffer)
+                    self._buffer.clear()
+                self._file.flush()
+                offset = self._file.tell()
+                data = {
+                    "time": self.clock(),
+                    "offset": offset,
+                    "zone_ids": list(self.zone_ids),
+                    "zones": {
+                        zone.zone_id: {
+                            "name": zone.name,
+                            "capacity": zone.capacity,
+                            "free_slots": zone.free_slots,
+                            "waiting": zone.waiting,
+                        }
+                        for zone in zones
+                    },
+                }
+                self.events_since_snapshot = 0
+
+        # Il journal fino a offset va su disco prima dello snapshot che lo richiama, ma
+        # fuori dai lock: le zone non attendono l'fsync
+        os.fsync(self._file.fileno())
+        # Scrittura atomica: file temporaneo + rename
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(path + ".tmp", path)
+        return offset
+
+    def checkpoint_if_due(self):
+        # Snapshot immediato se sono passati snapshot_every eventi (lo stesso controllo avviene
+        # in background a ogni evento; utile per forzarlo in un punto preciso, es. a fine lotto)
+        if self.events_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+            return True
+        return False
+
+    # --------------------- Ripristino ---------------------
+
+    def recover(self):
+        # Carica l'ultimo snapshot e ripete i record del journal successivi all'offset salvato.
+        # Restituisce il numero di record ripetuti
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+
+        zones = []
+        for zone_id in data["zone_ids"]:
+            saved = data["zones"][zone_id]
+            zone = self.system.get_zone(zone_id)
+            if zone is None:
+                zone = self.system.add_zone(
+                    ParkingZone(saved["name"], saved["capacity"], 0), zone_id
+                )
+            zones.append(zone)
+
+        free = [data["zones"][zone_id]["free_slots"] for zone_id in data["zone_ids"]]
+        waiting = [data["zones"][zone_id]["waiting"] for zone_id in data["zone_ids"]]
+        replayed = self._replay_tail(data["offset"], free, waiting)
+
+        for zone, target_free, target_waiting in zip(zones, free, waiting):
+            zone.restore_state(target_free, target_waiting)
+
+        # Gli indici del journal restano quelli registrati nello snapshot
+        for zone in zones:
+            self._attach(zone)
+        return replayed
+
+    def _replay_tail(self, offset, free, waiting):
+        # Somma i delta del journal a partire da offset. Un record troncato (crash durante la
+        # scrittura) viene eliminato dal file: i record aggiunti dopo il riavvio restano allineati
+        path = os.path.join(self.directory, JOURNAL_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            tail = handle.read()
+        usable = len(tail) - len(tail) % RECORD.size
+        if usable < len(tail):
+            os.truncate(path, offset + usable)
+
+        count = 0
+        for _, index, delta_free, delta_waiting in RECORD.iter_unpack(tail[:usable]):
+            free[index] += delta_free
+            waiting[index] += delta_waiting
+            count += 1
+        return count
+
+    def close(self):
+        # Scollega gli osservatori, attende lo snapshot in corso e chiude il file dopo un
+        # ultimo flush con fsync
+        for zone in self._index:
+            zone.remove_observer(self._on_zone_change)
+        with self._lock:
+            pending = self._snapshot_thread
+        if pending is not None:
+            pending.join()
+        self._closing = True
+        self._sync_request.set()
+        self._sync_thread.join()
+        self.flush(sync=True)
+        self._file.close()
@@ -0,0 +1,221 @@
+# Modulo UniParkReservations: Prenotazioni di posti per fascia oraria.
+# Il tempo è diviso in slot fissi (default 15 minuti) a partire da un'origine. Per ogni zona
+# un segment tree con aggiornamento pigro mantiene il numero di posti prenotati per slot:
+# prenotare o cancellare è un "range add" e la disponibilità in una finestra è un
+# "range max", entrambi O(log slot) anche con decine di migliaia di prenotazioni.
+#
+# Quando una prenotazione inizia, la zona trattiene un posto (ParkingZone.reserved_slots)
+# che park() non assegna alle auto senza prenotazione; check_in() lo consuma all'arrivo.
+# park() confronta l'istante corrente con il primo evento della timeline (O(1)) e attiva
+# le prenotazioni iniziate anche se nessuno ha chiamato advance().
+# Alla fine della finestra le prenotazioni senza arrivo rilasciano il posto.
+
+import heapq
+import itertools
+import math
+import time
+from threading import Lock
+
+SLOT_SECONDS = 900.0
+
+BOOKED, ACTIVE, CHECKED_IN, CANCELLED, EXPIRED = (
+    "booked",
+    "active",
+    "checked_in",
+    "cancelled",
+    "expired",
+)
+
+
+class _MaxSegmentTree:
+    # Segment tree su n slot: somma su intervallo (lazy) e massimo su intervallo
+
+    def __init__(self, size):
+        self.size = size
+        self._max = [0] * (4 * size)
+        self._lazy = [0] * (4 * size)
+
+    def add(self, lo, hi, value):
+        # Aggiunge value agli slot [lo, hi)
+        self._add(1, (0, self.size), (lo, hi), value)
+
+    def max(self, lo, hi):
+        # Massimo sugli slot [lo, hi)
+        return self._query(1, (0, self.size), (lo, hi))
+
+    def _add(self, node, bounds, span, value):
+        (left, right), (lo, hi) = bounds, span
+        if hi <= left or right <= lo:
+            return
+        if lo <= left and right <= hi:
+            self._max[node] += value
+            self._lazy[node] += value
+            return
+        mid = (left + right) // 2
+        self._add(2 * node, (left, mid), span, value)
+        self._add(2 * node + 1, (mid, right), span, value)
+        self._max[node] = self._lazy[node] + max(
+            self._max[2 * node], self._max[2 * node + 1]
+        )
+
+    def _query(self, node, bounds, span):
+        (left, right), (lo, hi) = bounds, span
+        if hi <= left or right <= lo:
+            return 0
+        if lo <= left and right <= hi:
+            return self._max[node]
+        mid = (left + right) // 2
+        return self._lazy[node] + max(
+            self._query(2 * node, (left, mid), span),
+            self._query(2 * node + 1, (mid, right), span),
+        )
+
+
+class Booking:  # pylint: disable=too-few-public-methods
+    # Prenotazione di un posto in una zona per gli slot [start_slot, end_slot)
+    __slots__ = ("booking_id", "zone", "start_slot", "end_slot", "holder", "status")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, booking_id, zone, start_slot, end_slot, holder
+    ):
+        self.booking_id = booking_id
+        self.zone = zone
+        self.start_slot = start_slot
+        self.end_slot = end_slot
+        self.holder = holder
+        self.status = BOOKED
+
+    def __repr__(self):
+        return f"Booking({self.booking_id}, {self.zone.name}, {self.status})"
+
+
+class ReservationBook:  # pylint: disable=too-many-instance-attributes
+    # Registro delle prenotazioni di tutte le zone di un UniParkSystem
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        system,
+        *,
+        origin=None,
+        slot_seconds=SLOT_SECONDS,
+        horizon_days=366,
+        clock=time.time,
+    ):
+        self.system = system
+        self.clock = clock
+        self.origin = clock() if origin is None else origin
+        self.slot_seconds = slot_seconds
+        self.slots = int(horizon_days * 24 * 3600 // slot_seconds)
+        self.bookings = {}
+        self._trees = {}  # nome zona -> _MaxSegmentTree
+        self._timeline = []  # Heap di (slot, id_prenotazione, tipo di evento)
+        self._next_due = math.inf  # Istante del primo evento della timeline
+        self._ids = itertools.count(1)
+        self._lock = Lock()
+
+    def _zone(self, zone):
+        # Accetta un oggetto ParkingZone, un identificativo breve o il nome completo
+        if isinstance(zone, str):
+            zone = self.system.get_zone(zone) or self.system.get_zone_by_name(zone)
+        if zone is None:
+            raise KeyError("Zona inesistente")
+        return zone
+
+    def _tree(self, zone):
+        tree = self._trees.get(zone.name)
+        if tree is None:
+            tree = self._trees[zone.name] = _MaxSegmentTree(self.slots)
+        return tree
+
+    def _slot_range(self, start, end):
+        # Converte una finestra temporale in slot [lo, hi) (arrotondata agli slot interi)
+        lo = int((start - self.origin) // self.slot_seconds)
+        hi = -int(-(end - self.origin) // self.slot_seconds)
+        if lo < 0 or hi > self.slots or lo >= hi:
+            raise ValueError("Finestra di prenotazione fuori dall'orizzonte")
+        return lo, hi
+
+    def available(self, zone, start, end):
+        # Posti prenotabili in tutta la finestra [start, end): capacità - picco di prenotati
+        zone = self._zone(zone)
+        lo, hi = self._slot_range(start, end)
+        with self._lock:
+            return max(0, zone.capacity - self._tree(zone).max(lo, hi))
+
+    def book(self, zone, start, end, holder=None):
+        # Prenota un posto; restituisce la Booking oppure None se la zona è al completo
+        zone = self._zone(zone)
+        lo, hi = self._slot_range(start, end)
+        with self._lock:
+            tree = self._tree(zone)
+            if tree.max(lo, hi) >= zone.capacity:
+                return None
+            tree.add(lo, hi, 1)
+            booking = Booking(next(self._ids), zone, lo, hi, holder)
+            self.bookings[booking.booking_id] = booking
+            heapq.heappush(self._timeline, (lo, booking.booking_id, ACTIVE))
+            heapq.heappush(self._timeline, (hi, booking.booking_id, EXPIRED))
+            self._update_due()
+        zone.reservations = self
+        self.advance()
+        return booking
+
+    def cancel(self, booking_id):
+        # Annulla una prenotazione non ancora usata, liberando gli slot e l'eventuale posto
+        with self._lock:
+            booking = self.bookings.get(booking_id)
+            if booking is None or booking.status not in (BOOKED, ACTIVE):
+                return False
+            self._tree(booking.zone).add(booking.start_slot, booking.end_slot, -1)
+            was_active = booking.status == ACTIVE
+            booking.status = CANCELLED
+        if was_active:
+            booking.zone.adjust_reserved(-1)
+        return True
+
+    def check_in(self, booking_id, vehicle_id=None):
+        # Arrivo dell'auto prenotata: consuma il posto trattenuto.
+        # Restituisce True se l'auto è entrata, False se è in coda, None se non valida
+        self.advance()
+        with self._lock:
+            booking = self.bookings.get(booking_id)
+            if booking is None or booking.status != ACTIVE:
+                return None
+            booking.status = CHECKED_IN
+        return booking.zone.check_in(vehicle_id)
+
+    def _update_due(self):
+        # Chiamata con self._lock acquisito, dopo ogni modifica della timeline
+        self._next_due = (
+            self.origin + self._timeline[0][0] * self.slot_seconds
+            if self._timeline
+            else math.inf
+        )
+
+    def advance_if_due(self):
+        # Controllo O(1) sul percorso di park(), prima del lock della zona: avanza solo se il
+        # primo evento della timeline è già iniziato
+        if self._next_due <= self.clock():
+            self.advance()
+
+    def advance(self, now=None):
+        # Attiva le prenotazioni iniziate e fa scadere quelle terminate fino all'istante now
+        now = self.clock() if now is None else now
+        current = int((now - self.origin) // self.slot_seconds)
+        changes = []
+        with self._lock:
+            while self._timeline and self._timeline[0][0] <= current:
+                _, booking_id, kind = heapq.heappop(self._timeline)
+                booking = self.bookings[booking_id]
+                if kind == ACTIVE and booking.status == BOOKED:
+                    booking.status = ACTIVE
+                    changes.append((booking.zone, 1))
+                elif kind == EXPIRED and booking.status in (BOOKED, ACTIVE):
+                    if booking.status == ACTIVE:
+                        changes.append((booking.zone, -1))
+                    booking.status = EXPIRED
+            self._update_due()
+        # I lock delle zone si acquisiscono fuori dal lock del registro
+        for zone, delta in changes:
+            zone.adjust_reserved(delta)
+        return len(changes)
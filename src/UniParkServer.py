@@ -0,0 +1,229 @@
+# Modulo UniParkServer: Servizio asyncio di ingestione degli eventi dei varchi (gate/sensori).
+# I controller dei varchi inviano righe di testo su TCP (o datagrammi UDP):
+#
+#   P <id_zona> [n]    n arrivi (default 1)
+#   U <id_zona> [n]    n uscite (default 1)
+#   SYNC               risponde "OK" quando gli eventi inviati finora sono stati applicati
+#
+# Gli eventi vengono accumulati per zona e applicati a blocchi con UniParkSystem.apply_batch.
+# Se i client sono più veloci dell'elaborazione, la lettura si sospende (backpressure TCP).
+
+import asyncio
+import time
+
+# Massimo numero di auto in una singola riga (un varco non ne fa passare di più in un colpo)
+MAX_COUNT = 10_000
+
+
+class IngestionServer:  # pylint: disable=too-many-instance-attributes
+    # Server di ingestione davanti a un UniParkSystem
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        system,
+        host="127.0.0.1",
+        port=0,
+        *,
+        udp_port=None,
+        flush_interval=0.005,
+        max_pending=50_000,
+    ):
+        self.system = system
+        self.host = host
+        self.port = port
+        self.udp_port = udp_port
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending = {}  # id_zona -> [arrivi, uscite] dall'ultimo flush
+        self._pending_events = 0
+        self._flushed = None  # Future completato al prossimo flush
+        self._wakeup = None
+        self._server = None
+        self._udp_transport = None
+        self._flusher = None
+        self.stats = {"events": 0, "batches": 0, "errors": 0, "paused": 0}
+
+    # --------------------- Ciclo di vita ---------------------
+
+    async def start(self):
+        # Avvia il listener TCP, l'eventuale endpoint UDP e il task di flush
+        loop = asyncio.get_running_loop()
+        self._flushed = loop.create_future()
+        self._wakeup = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.udp_port is not None:
+            self._udp_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self), local_addr=(self.host, self.udp_port)
+            )
+            self.udp_port = self._udp_transport.get_extra_info("sockname")[1]
+        self._flusher = asyncio.create_task(self._flush_loop())
+        return self
+
+    async def close(self):
+        # Ferma i listener e applica gli eventi ancora in sospeso
+        self._server.close()
+        await self._server.wait_closed()
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self.flush()
+
+    # --------------------- Ingestione ---------------------
+
+    def submit_line(self, line):
+        # Interpreta una riga del protocollo e la accumula; restituisce False se non valida
+        parts = line.split()
+        if len(parts) < 2 or parts[0] not in (b"P", b"U"):
+            self.stats["errors"] += 1
+            return False
+        try:
+            count = int(parts[2]) if len(parts) > 2 else 1
+            zone_id = parts[1].decode()
+        except (ValueError, UnicodeDecodeError):
+            # Conteggio non numerico o id zona non UTF-8: errore di protocollo
+            count = 0
+        if not 1 <= count <= MAX_COUNT:
+            self.stats["errors"] += 1
+            return False
+
+        counters = self._pending.get(zone_id)
+        if counters is None:
+            if self.system.get_zone(zone_id) is None:
+                self.stats["errors"] += 1
+                return False
+            counters = self._pending[zone_id] = [0, 0]
+        counters[0 if parts[0] == b"P" else 1] += count
+        self._pending_events += count
+        self.stats["events"] += count
+        if self._pending_events >= self.max_pending:
+            self._wakeup.set()
+        return True
+
+    async def _handle_client(self, reader, writer):
+        # Gestisce una connessione TCP di un controller dei varchi
+        try:
+            async for line in reader:
+                if line.startswith(b"SYNC"):
+                    await asyncio.shield(self._flushed)
+                    writer.write(b"OK\n")
+                    await writer.drain()
+                    continue
+                self.submit_line(line)
+                if self._pending_events >= self.max_pending:
+                    # Backpressure: si smette di leggere finché il flush non ha svuotato i contatori
+                    self.stats["paused"] += 1
+                    await asyncio.shield(self._flushed)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # --------------------- Applicazione a blocchi ---------------------
+
+    def flush(self):
+        # Applica gli eventi accumulati: per zona prima gli arrivi, poi le uscite
+        pending, self._pending = self._pending, {}
+        self._pending_events = 0
+        operations = []
+        for zone_id, (parks, unparks) in pending.items():
+            if parks:
+                operations.append((zone_id, parks))
+            if unparks:
+                operations.append((zone_id, -unparks))
+        if operations:
+            self.system.apply_batch(operations)
+            self.stats["batches"] += 1
+
+        # Sveglia chi attendeva questo flush (SYNC o backpressure)
+        if self._flushed is not None:
+            done, self._flushed = (
+                self._flushed,
+                asyncio.get_running_loop().create_future(),
+            )
+            done.set_result(None)
+
+    async def _flush_loop(self):
+        # Flush periodico ogni flush_interval, anticipato se si supera max_pending
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self.flush()
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    # Endpoint UDP: ogni datagramma contiene una o più righe del protocollo
+
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        for line in data.splitlines():
+            self.server.submit_line(line)
+
+
+# ==================== CLIENT DI CARICO (LOAD GENERATOR) ====================
+
+
+async def _load_client(host, port, lines, chunk, latencies):
+    # Un client: invia le righe a blocchi e misura la latenza di un SYNC per blocco
+    reader, writer = await asyncio.open_connection(host, port)
+    for start in range(0, len(lines), chunk):
+        writer.write(b"".join(lines[start : start + chunk]))
+        sent = time.perf_counter()
+        writer.write(b"SYNC\n")
+        await writer.drain()
+        await reader.readline()
+        latencies.append(time.perf_counter() - sent)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load_generator(  # pylint: disable=too-many-arguments
+    host, port, zone_ids, *, clients=8, events_per_client=10_000, chunk=2_000, seed=0
+):
+    # Simula molti controller dei varchi in parallelo e misura throughput e latenza
+    lines = []
+    for i in range(events_per_client):
+        zone_id = zone_ids[(i * 7 + seed) % len(zone_ids)]
+        lines.append(f"{'P' if (i + seed) % 2 == 0 else 'U'} {zone_id}\n".encode())
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_load_client(host, port, lines, chunk, latencies) for _ in range(clients))
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    events = clients * events_per_client
+    return {
+        "events": events,
+        "seconds": elapsed,
+        "rate": events / elapsed if elapsed else 0.0,
+        "sync_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        "sync_max": latencies[-1] if latencies else 0.0,
+    }
+
+
+async def benchmark_localhost(system, **kwargs):
+    # Avvia un server locale, lo satura con il load generator e restituisce le statistiche
+    server = await IngestionServer(system).start()
+    try:
+        result = await run_load_generator(
+            server.host, server.port, list(system.zone_map), **kwargs
+        )
+    finally:
+        await server.close()
+    result["server"] = dict(server.stats)
+    return result
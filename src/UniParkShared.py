@@ -0,0 +1,323 @@
+# Modulo UniParkShared: Backend a memoria condivisa per lo stato delle zone.
+# Capacità, posti liberi e coda vivono in un blocco multiprocessing.shared_memory a layout
+# fisso: più processi (dashboard, exporter, simulatore) leggono gli stessi contatori senza
+# copiarli su un socket. Le scritture usano un seqlock per zona, quindi i lettori ottengono
+# sempre valori coerenti senza bloccare lo scrittore.
+#
+# Layout del blocco:
+#   header: magic (8 byte) + numero di zone (int64)
+#   tabella numerica: per zona [seq, capacity, free_slots, waiting, version] (int64)
+#   tabella testi: per zona id (16 byte) + nome (64 byte), UTF-8 con padding di zeri
+
+import heapq
+import struct
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from threading import Lock
+
+from UniPark import ParkingZone, SystemSnapshot, UniParkSystem  # type: ignore # pylint: disable=import-error # isort: skip
+
+MAGIC = b"UNIPARK1"
+HEADER = struct.Struct("<8sq")
+FIELDS = 5  # seq, capacity, free_slots, waiting, version
+SEQ, CAPACITY, FREE, WAITING, VERSION = range(FIELDS)
+ID_BYTES = 16
+NAME_BYTES = 64
+
+
+def _encode_text(text, size):
+    # Codifica UTF-8 troncata a "size" byte senza spezzare un carattere multibyte
+    return text.encode()[:size].decode(errors="ignore").encode().ljust(size, b"\0")
+
+
+# Blocchi creati da questo processo (l'insieme è ereditato dai figli creati con fork)
+_CREATED: set[str] = set()
+
+
+def _shares_creator_tracker(name):
+    # Vero se il processo usa lo stesso resource tracker del creatore del blocco: è il
+    # creatore stesso, un suo figlio con fork (eredita _CREATED) oppure un figlio spawn
+    # (tracker ereditato dal padre: il pid del tracker è noto solo a chi lo ha avviato)
+    # pylint: disable-next=protected-access
+    tracker = resource_tracker._resource_tracker  # type: ignore[attr-defined]
+    # pylint: disable-next=protected-access
+    return name in _CREATED or (tracker._fd is not None and tracker._pid is None)
+
+
+def _open_block(name, create, size=0):
+    # Apre (o crea) il blocco condiviso; i lettori non devono distruggerlo all'uscita
+    try:
+        # pylint: disable-next=unexpected-keyword-arg
+        return shared_memory.SharedMemory(
+            name=name, create=create, size=size, track=create
+        )
+    except TypeError:  # Python < 3.13: nessun parametro track
+        # Un lettore con un tracker proprio deve togliere la registrazione automatica
+        # (altrimenti il tracker distrugge il blocco all'uscita del lettore); con il tracker
+        # del creatore la rimozione cancellerebbe la registrazione del creatore, e il suo
+        # unlink() farebbe fallire il tracker con KeyError
+        unregister = not create and not _shares_creator_tracker(name)
+        block = shared_memory.SharedMemory(name=name, create=create, size=size)
+        if create:
+            _CREATED.add(name)
+        elif unregister:
+            # pylint: disable-next=protected-access
+            resource_tracker.unregister(block._name, "shared_memory")  # type: ignore[attr-defined]
+        return block
+
+
+class SharedZoneTable:
+    # Tabella a layout fisso nel blocco condiviso, con viste zero-copy sui contatori
+
+    def __init__(self, block):
+        self.block = block
+        magic, count = HEADER.unpack_from(block.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Blocco condiviso non valido: {block.name}")
+        self.count = count
+        numeric_bytes = count * FIELDS * 8
+        self._numbers = block.buf[HEADER.size : HEADER.size + numeric_bytes].cast("q")
+        self._texts_offset = HEADER.size + numeric_bytes
+
+    @property
+    def name(self):
+        return self.block.name
+
+    @classmethod
+    def create(cls, name, zones):
+        # Crea un nuovo blocco con lo stato iniziale delle zone indicate
+        zones = list(zones)
+        size = HEADER.size + len(zones) * (FIELDS * 8 + ID_BYTES + NAME_BYTES)
+        block = _open_block(name, True, size)
+        HEADER.pack_into(block.buf, 0, MAGIC, len(zones))
+        table = cls(block)
+        for index, zone in enumerate(zones):
+            base = index * FIELDS
+            table._numbers[base + CAPACITY] = zone.capacity
+            table._numbers[base + FREE] = zone.free_slots
+            table._numbers[base + WAITING] = zone.waiting
+            offset = table._texts_offset + index * (ID_BYTES + NAME_BYTES)
+            zone_id = str(zone.zone_id if zone.zone_id is not None else index)
+            block.buf[offset : offset + ID_BYTES] = _encode_text(zone_id, ID_BYTES)
+            block.buf[offset + ID_BYTES : offset + ID_BYTES + NAME_BYTES] = (
+                _encode_text(zone.name, NAME_BYTES)
+            )
+        return table
+
+    @classmethod
+    def attach(cls, name):
+        # Si collega a un blocco esistente: nessuna copia, nessun polling del produttore
+        return cls(_open_block(name, False))
+
+    def zone_label(self, index):
+        # Restituisce (id, nome) della zona all'indice indicato
+        offset = self._texts_offset + index * (ID_BYTES + NAME_BYTES)
+        raw = bytes(self.block.buf[offset : offset + ID_BYTES + NAME_BYTES])
+        return (
+            raw[:ID_BYTES].rstrip(b"\0").decode(),
+            raw[ID_BYTES:].rstrip(b"\0").decode(),
+        )
+
+    def read(self, index):
+        # Lettura coerente (seqlock): (capacity, free_slots, waiting, version)
+        numbers = self._numbers
+        base = index * FIELDS
+        while True:
+            before = numbers[base + SEQ]
+            if before % 2:
+                continue  # Scrittura in corso
+            values = (
+                numbers[base + CAPACITY],
+                numbers[base + FREE],
+                numbers[base + WAITING],
+                numbers[base + VERSION],
+            )
+            if numbers[base + SEQ] == before:
+                return values
+
+    def view(self):
+        # Vista zero-copy dell'intera tabella numerica come matrice (zone x campi)
+        return self._numbers.cast("B").cast("q", [self.count, FIELDS])
+
+    def get(self, index, field):
+        return self._numbers[index * FIELDS + field]
+
+    def set(self, index, field, value):
+        self._numbers[index * FIELDS + field] = value
+
+    def close(self):
+        # Rilascia le viste e chiude il blocco (senza distruggerlo)
+        self._numbers.release()
+        self.block.close()
+
+    def unlink(self):
+        # Distrugge il blocco (da chiamare solo dal processo che lo ha creato)
+        self.block.unlink()
+
+
+class _SeqWriteLock:  # pylint: disable=too-few-public-methods
+    # Lock di scrittura: mutua esclusione nel processo + contatore di sequenza nel blocco
+    # (dispari durante la scrittura) che permette ai lettori di altri processi di riprovare
+
+    def __init__(self, table, index):
+        self._lock = Lock()
+        self._table = table
+        self._index = index
+
+    def __enter__(self):
+        self._lock.acquire()  # pylint: disable=consider-using-with
+        self._table.set(self._index, SEQ, self._table.get(self._index, SEQ) + 1)
+        return self
+
+    def __exit__(self, *exc):
+        self._table.set(self._index, SEQ, self._table.get(self._index, SEQ) + 1)
+        self._lock.release()
+        return False
+
+    def locked(self):
+        return self._lock.locked()
+
+
+class SharedParkingZone(ParkingZone):
+    # ParkingZone i cui contatori risiedono nel blocco condiviso.
+    # Le scritture da più processi sulla stessa zona non sono serializzate:
+    # ogni zona deve avere un solo processo produttore
+
+    def __init__(self, table, index, track_queue=False):
+        # Durante l'inizializzazione della classe base le scritture dei contatori vengono
+        # ignorate (_index None): chi si collega non deve sovrascrivere lo stato del produttore
+        self._table = table
+        self._index = None
+        zone_id, name = table.zone_label(index)
+        super().__init__(
+            name, table.get(index, CAPACITY), table.get(index, FREE), track_queue
+        )
+        self._index = index
+        self.lock = _SeqWriteLock(table, index)
+        self.zone_id = zone_id
+
+    def _write(self, field, value):
+        # Scrive un campo nel blocco (ignorato durante l'inizializzazione della classe base)
+        if self._index is not None:
+            self._table.set(self._index, field, value)
+
+    # Proprietà che leggono/scrivono direttamente i campi nel blocco condiviso
+
+    @property
+    def capacity(self):
+        return self._table.get(self._index, CAPACITY)
+
+    @capacity.setter
+    def capacity(self, value):
+        self._write(CAPACITY, value)
+
+    @property
+    def free_slots(self):
+        return self._table.get(self._index, FREE)
+
+    @free_slots.setter
+    def free_slots(self, value):
+        self._write(FREE, value)
+
+    @property
+    def waiting(self):
+        return self._table.get(self._index, WAITING)
+
+    @waiting.setter
+    def waiting(self, value):
+        self._write(WAITING, value)
+
+    @property
+    def version(self):
+        return self._table.get(self._index, VERSION)
+
+    @version.setter
+    def version(self, value):
+        self._write(VERSION, value)
+
+    def read_shared(self):
+        # Lettura coerente dal blocco: (capacity, free_slots, waiting, version)
+        return self._table.read(self._index)
+
+    def get_status_dict(self):
+        # Lettura senza lock tramite seqlock: i lettori non scrivono mai nel blocco
+        capacity, free, waiting, _ = self._table.read(self._index)
+        status = {
+            "name": self.name,
+            "capacity": capacity,
+            "free_slots": free,
+            "occupied": capacity - free,
+            "waiting": waiting,
+            "rate": (capacity - free) / capacity * 100,
+        }
+        if self.queue is not None:
+            with self.lock:
+                status.update(self._wait_stats())
+        return status
+
+
+class SharedParkSystem(UniParkSystem):  # pylint: disable=too-few-public-methods
+    # UniParkSystem le cui zone leggono/scrivono direttamente nel blocco condiviso
+
+    def __init__(self, table):
+        super().__init__(zones={})
+        self.shared_table = table
+        for index in range(table.count):
+            zone = SharedParkingZone(table, index)
+            self.add_zone(zone, zone.zone_id)
+
+    # Totali e indice di instradamento incrementali vedono solo le scritture di questo
+    # processo: nel backend condiviso si leggono dal blocco (coerenti per zona)
+
+    def get_total_capacity(self):
+        return sum(zone.capacity for zone in self.zones)
+
+    def get_totals(self):
+        capacity = free = waiting = 0
+        for zone in self.zones:
+            zone_capacity, zone_free, zone_waiting, _ = zone.read_shared()
+            capacity += zone_capacity
+            free += zone_free
+            waiting += zone_waiting
+        return {
+            "capacity": capacity,
+            "free_slots": free,
+            "occupied": capacity - free,
+            "waiting": waiting,
+        }
+
+    def _route_candidates(self, count):
+        # Le "count" zone più disponibili (più posti liberi, poi coda più corta) in O(zone)
+        def key(zone):
+            _, free, waiting, _ = zone.read_shared()
+            return -max(0, free - zone.reserved_slots), waiting
+
+        return heapq.nsmallest(count, self.zones, key=key)
+
+    def snapshot(self):
+        # Le scritture possono arrivare da altri processi: i valori si leggono dal blocco
+        # (coerenti per zona grazie al seqlock) invece che dalla copia locale del sistema
+        ids, names, index = self._snap_layout
+        rows = [zone.read_shared() + (zone.reserved_slots,) for zone in self.zones]
+        columns = [array("q", column) for column in zip(*rows)] or [
+            array("q") for _ in SystemSnapshot.COLUMNS
+        ]
+        capacity, free, waiting, version, reserved = columns
+        return SystemSnapshot(
+            sum(version),
+            ids,
+            names,
+            index,
+            (capacity, free, waiting, reserved, version),
+        )
+
+
+def share_system(system, name):
+    # Produttore: copia lo stato delle zone in un nuovo blocco e restituisce il sistema
+    # condiviso (la tabella è in system.shared_table, da chiudere e distruggere a fine uso)
+    return SharedParkSystem(SharedZoneTable.create(name, system.zones))
+
+
+def attach_system(name):
+    # Lettore: si collega a un blocco esistente per nome
+    return SharedParkSystem(SharedZoneTable.attach(name))
@@ -0,0 +1,320 @@
+# Modulo UniParkSoak: Test di resistenza concorrente delle invarianti delle zone.
+# Più thread (o processi, sul backend a memoria condivisa) eseguono milioni di operazioni
+# casuali park/unpark/park_many/unpark_many mentre un verificatore legge di continuo lo
+# snapshot del sistema e controlla per ogni zona:
+#   0 <= free_slots <= capacity, waiting >= 0, reserved_slots >= 0,
+#   coda solo se non ci sono posti disponibili (waiting > 0 => free_slots <= reserved_slots),
+#   versione non decrescente tra due letture.
+# A fine corsa si verifica la conservazione delle auto: per ogni zona occupati + coda =
+# valore iniziale + arrivi - uscite contati dai worker, e la coerenza dei totali di sistema.
+# Nella stessa corsa si misurano throughput e latenza (p50/p99/p99.9) per tipo di operazione.
+
+import os
+import threading
+import time
+
+from UniPark import ParkingZone, RandomStream, UniParkSystem  # type: ignore # pylint: disable=import-error # isort: skip
+from UniParkStats import Histogram  # type: ignore # pylint: disable=import-error # isort: skip
+
+OPERATIONS = ("park", "unpark", "park_many", "unpark_many")
+# Probabilità cumulative delle operazioni, nell'ordine di OPERATIONS
+DEFAULT_MIX = (0.4, 0.8, 0.9)
+# Bucket di latenza: da 100 ns a ~5 s con crescita 1.25x (percentili con errore < 25%)
+LATENCY_BOUNDS = tuple(1e-7 * 1.25**i for i in range(80))
+
+
+def default_zones(count=16, capacity=50):
+    return [ParkingZone(f"Soak {i}", capacity, capacity // 2) for i in range(count)]
+
+
+def _run_operations(zones, ops, seed, *, stop=None, mix=DEFAULT_MIX, batch=8):
+    # pylint: disable=too-many-arguments, too-many-locals
+    # Esegue ops operazioni casuali sulle zone. Restituisce arrivi e uscite per zona, le
+    # latenze per operazione (bucket, somma), la latenza massima e le operazioni eseguite
+    rng = RandomStream(seed)
+    arrivals = [0] * len(zones)
+    departures = [0] * len(zones)
+    histograms = [Histogram(LATENCY_BOUNDS) for _ in OPERATIONS]
+    worst = 0.0
+    perf = time.perf_counter
+    count = len(zones)
+    park_p, unpark_p, many_p = mix
+    done = 0
+    while done < ops:
+        if stop is not None and done % 1024 == 0 and stop.is_set():
+            break
+        index = int(rng.random() * count)
+        zone = zones[index]
+        draw = rng.random()
+        if draw < park_p:
+            kind = 0
+            start = perf()
+            zone.park()
+            elapsed = perf() - start
+            arrivals[index] += 1
+        elif draw < unpark_p:
+            kind = 1
+            start = perf()
+            left = zone.unpark()
+            elapsed = perf() - start
+            departures[index] += 1 if left else 0
+        elif draw < many_p:
+            kind = 2
+            start = perf()
+            zone.park_many(batch)
+            elapsed = perf() - start
+            arrivals[index] += batch
+        else:
+            kind = 3
+            start = perf()
+            from_queue, released = zone.unpark_many(batch)
+            elapsed = perf() - start
+            departures[index] += from_queue + released
+        histograms[kind].observe(elapsed)
+        worst = max(worst, elapsed)
+        done += 1
+    latencies = [(hist.counts, hist.total) for hist in histograms]
+    return arrivals, departures, latencies, worst, done
+
+
+class InvariantChecker:
+    # Verifica le invarianti di ogni zona su snapshot coerenti del sistema
+
+    def __init__(self, system, max_reports=20):
+        self.system = system
+        self.max_reports = max_reports
+        self.checks = 0
+        self.violations = 0
+        self.reports = []
+        self._versions = {}
+
+    def _violation(self, message):
+        self.violations += 1
+        if len(self.reports) < self.max_reports:
+            self.reports.append(message)
+
+    def check(self):
+        snapshot = self.system.snapshot()
+        for i, name in enumerate(snapshot.names):
+            capacity, free = snapshot.capacity[i], snapshot.free_slots[i]
+            waiting, reserved = snapshot.waiting[i], snapshot.reserved[i]
+            version = snapshot.version[i]
+            if not 0 <= free <= capacity:
+                self._violation(f"{name}: free_slots={free} fuori da [0, {capacity}]")
+            if waiting < 0 or reserved < 0:
+                self._violation(f"{name}: waiting={waiting}, reserved={reserved}")
+            if waiting > 0 and free > reserved:
+                self._violation(f"{name}: {waiting} in coda con {free} posti liberi")
+            if version < self._versions.get(name, 0):
+                self._violation(f"{name}: versione {version} tornata indietro")
+            self._versions[name] = version
+        self.checks += 1
+
+    def check_conservation(self, initial, arrivals, departures):
+        # Auto nel sistema a fine corsa: occupati + coda = iniziali + arrivi - uscite
+        for zone, start, arrived, left in zip(
+            self.system.zones, initial, arrivals, departures
+        ):
+            with zone.lock:
+                present = zone.capacity - zone.free_slots + zone.waiting
+            if present != start + arrived - left:
+                self._violation(
+                    f"{zone.name}: {present} auto presenti, attese {start + arrived - left}"
+                )
+        # I totali e lo snapshot mantenuti dagli osservatori coincidono con le zone
+        snapshot = self.system.snapshot()
+        totals = snapshot.totals()
+        expected = {
+            "capacity": sum(zone.capacity for zone in self.system.zones),
+            "free_slots": sum(zone.free_slots for zone in self.system.zones),
+            "waiting": sum(zone.waiting for zone in self.system.zones),
+        }
+        for key, value in expected.items():
+            if totals[key] != value:
+                self._violation(f"snapshot: {key}={totals[key]}, atteso {value}")
+        if not hasattr(self.system, "shared_table"):
+            system_totals = self.system.get_totals()
+            for key, value in expected.items():
+                if system_totals[key] != value:
+                    self._violation(
+                        f"totali: {key}={system_totals[key]}, atteso {value}"
+                    )
+
+
+def _watch(checker, running, check_interval):
+    # Verifica continua finché running() è vera, più una verifica finale
+    while running():
+        checker.check()
+        time.sleep(check_interval)
+    checker.check()
+
+
+def _process_worker(name, indexes, ops, seed, options):
+    # Processo worker: si collega al blocco condiviso e opera solo sulle sue zone
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniParkShared import attach_system  # type: ignore # isort: skip
+
+    system = attach_system(name)
+    try:
+        zones = [system.zones[index] for index in indexes]
+        return indexes, _run_operations(zones, ops, seed, **options)
+    finally:
+        system.shared_table.close()
+
+
+def _merge_results(results, count):
+    # Somma i risultati dei worker: (indici delle zone, risultato di _run_operations)
+    arrivals, departures = [0] * count, [0] * count
+    merged = [Histogram(LATENCY_BOUNDS) for _ in OPERATIONS]
+    worst = 0.0
+    operations = 0
+    for indexes, (zone_arrivals, zone_departures, latencies, slowest, done) in results:
+        for local, index in enumerate(indexes):
+            arrivals[index] += zone_arrivals[local]
+            departures[index] += zone_departures[local]
+        for hist, (counts, spent) in zip(merged, latencies):
+            hist.merge(counts, spent)
+        worst = max(worst, slowest)
+        operations += done
+    return arrivals, departures, merged, worst, operations
+
+
+def _latency(hist):
+    return {
+        "count": hist.count,
+        "mean": hist.total / hist.count if hist.count else 0.0,
+        "p50": hist.percentile(50),
+        "p99": hist.percentile(99),
+        "p999": hist.percentile(99.9),
+    }
+
+
+def _initial_cars(zones):
+    return [zone.capacity - zone.free_slots + zone.waiting for zone in zones]
+
+
+def _soak_threads(system, workers, ops, *, seed, check_interval, options):
+    # pylint: disable=too-many-arguments
+    # Tutti i thread operano su tutte le zone dello stesso sistema (massima contesa)
+    zones = system.zones
+    initial = _initial_cars(zones)
+    indexes = list(range(len(zones)))
+    stop = threading.Event()
+    results = [None] * workers
+    errors = []
+
+    def work(worker):
+        try:
+            results[worker] = indexes, _run_operations(
+                zones, ops, f"{seed}:soak:{worker}", stop=stop, **options
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # Un'eccezione in un worker ferma gli altri e viene rilanciata dal chiamante
+            errors.append(exc)
+            stop.set()
+
+    threads = [
+        threading.Thread(target=work, args=(worker,), name=f"soak-{worker}")
+        for worker in range(workers)
+    ]
+    checker = InvariantChecker(system)
+    for thread in threads:
+        thread.start()
+    try:
+        _watch(checker, lambda: any(t.is_alive() for t in threads), check_interval)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    merged = _merge_results(results, len(zones))
+    checker.check_conservation(initial, merged[0], merged[1])
+    return checker, merged
+
+
+def _soak_processes(system, workers, ops, *, seed, check_interval, options):
+    # pylint: disable=too-many-arguments
+    # Ogni processo opera su un sottoinsieme disgiunto di zone: il backend condiviso
+    # ammette un solo processo produttore per zona
+    # pylint: disable-next=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor
+
+    # pylint: disable-next=import-error, import-outside-toplevel
+    from UniParkShared import share_system  # type: ignore # isort: skip
+
+    name = f"unipark_soak_{os.getpid()}_{time.monotonic_ns()}"
+    shared = share_system(system, name)
+    try:
+        initial = _initial_cars(shared.zones)
+        checker = InvariantChecker(shared)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _process_worker,
+                    name,
+                    list(range(worker, len(shared.zones), workers)),
+                    ops,
+                    f"{seed}:soak:{worker}",
+                    options,
+                )
+                for worker in range(workers)
+            ]
+            _watch(
+                checker,
+                lambda: not all(future.done() for future in futures),
+                check_interval,
+            )
+            results = [future.result() for future in futures]
+        # La conservazione si verifica sul blocco condiviso, prima di chiuderlo
+        merged = _merge_results(results, len(shared.zones))
+        checker.check_conservation(initial, merged[0], merged[1])
+        return checker, merged
+    finally:
+        shared.shared_table.close()
+        shared.shared_table.unlink()
+
+
+def run_soak(  # pylint: disable=too-many-arguments
+    system=None,
+    *,
+    threads=8,
+    processes=0,
+    ops=250_000,
+    seed=0,
+    check_interval=0.001,
+    **options,
+):
+    # Esegue la prova: threads worker sullo stesso sistema oppure, con processes > 0,
+    # processi sul backend a memoria condivisa. ops è il numero di operazioni per worker;
+    # options: mix (probabilità cumulative) e batch (auto per park_many/unpark_many)
+    system = system if system is not None else UniParkSystem(zones=default_zones())
+    # Con i processi ogni worker ha zone proprie: non più processi che zone
+    workers = min(processes, len(system.zones)) if processes else threads
+    soak = _soak_processes if processes else _soak_threads
+    start = time.perf_counter()
+    checker, merged = soak(
+        system, workers, ops, seed=seed, check_interval=check_interval, options=options
+    )
+    elapsed = time.perf_counter() - start
+    _, _, histograms, worst, operations = merged
+
+    total = Histogram(LATENCY_BOUNDS)
+    for hist in histograms:
+        total.merge(hist.counts, hist.total)
+    return {
+        "mode": "processes" if processes else "threads",
+        "workers": workers,
+        "zones": len(system.zones),
+        "operations": operations,
+        "seconds": elapsed,
+        "throughput": operations / elapsed if elapsed else 0.0,
+        "latency": {
+            "all": _latency(total),
+            "max": worst,
+            **{name: _latency(hist) for name, hist in zip(OPERATIONS, histograms)},
+        },
+        "checks": checker.checks,
+        "violations": checker.violations,
+        "reports": checker.reports,
+    }
@@ -0,0 +1,204 @@
+# Modulo UniParkStats: Strumentazione opzionale dei percorsi critici.
+# Istogrammi a bucket fissi per attesa/possesso dei lock delle zone, latenza di park/unpark,
+# durata dei frame della UI e profondità della coda di callback after().
+# Quando la strumentazione non è attiva nessun oggetto viene modificato: costo nullo.
+
+import time
+from bisect import bisect_left
+from threading import Lock
+
+# Bucket di default in secondi: da 1 µs a ~1 s, crescita 2x
+DEFAULT_BOUNDS = tuple(1e-6 * 2**i for i in range(21))
+# Bucket per grandezze intere (es. profondità di una coda)
+COUNT_BOUNDS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histogram:
+    # Istogramma a bucket fissi: un solo bisect e un incremento per osservazione
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        # L'ultimo bucket raccoglie i valori oltre l'ultimo limite
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    def merge(self, counts, total):
+        # Somma le osservazioni di un altro istogramma con gli stessi bucket (es. per thread
+        # o per processo): counts e total come negli attributi omonimi
+        with self._lock:
+            for index, bucket in enumerate(counts):
+                self.counts[index] += bucket
+            self.total += total
+            self.count += sum(counts)
+
+    def percentile(self, pct):
+        # Stima del percentile: limite superiore del bucket che lo contiene
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+        if not count:
+            return 0.0
+        rank = pct / 100 * count
+        seen = 0
+        for index, bucket in enumerate(counts):
+            seen += bucket
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+        }
+
+
+class InstrumentedLock:
+    # Involucro di un lock che misura il tempo di attesa e il tempo di possesso
+
+    def __init__(self, inner, wait_hist, hold_hist):
+        self.inner = inner
+        self.wait_hist = wait_hist
+        self.hold_hist = hold_hist
+        self._acquired_at = 0.0
+
+    def __enter__(self):
+        start = time.perf_counter()
+        self.inner.__enter__()
+        self._acquired_at = time.perf_counter()
+        self.wait_hist.observe(self._acquired_at - start)
+        return self
+
+    def __exit__(self, *exc):
+        held = time.perf_counter() - self._acquired_at
+        result = self.inner.__exit__(*exc)
+        self.hold_hist.observe(held)
+        return result
+
+    def locked(self):
+        return self.inner.locked()
+
+
+def _timed(method, hist):
+    # Avvolge un metodo registrando la sua latenza nell'istogramma
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            hist.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+class Instrumentation:
+    # Registro di istogrammi e gauge, con esportazione testuale e in formato Prometheus
+
+    TIMED_METHODS = ("park", "unpark")
+    COUNT_BOUNDS = COUNT_BOUNDS
+
+    def __init__(self):
+        self.histograms = {}  # (nome, etichette) -> Histogram
+        self.gauges = {}  # (nome, etichette) -> valore
+        self._lock = Lock()
+
+    def histogram(self, name, bounds=DEFAULT_BOUNDS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(bounds)
+            return self.histograms[key]
+
+    def set_gauge(self, name, value, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    # --------------------- Zone ---------------------
+
+    def instrument_zone(self, zone):
+        # Sostituisce il lock della zona e i metodi park/unpark dell'istanza con versioni misurate
+        if isinstance(zone.lock, InstrumentedLock):
+            return
+        label = zone.zone_id if zone.zone_id is not None else zone.name
+        zone.lock = InstrumentedLock(
+            zone.lock,
+            self.histogram("zone_lock_wait_seconds", zone=label),
+            self.histogram("zone_lock_hold_seconds", zone=label),
+        )
+        for method in self.TIMED_METHODS:
+            hist = self.histogram("zone_call_seconds", zone=label, method=method)
+            setattr(zone, method, _timed(getattr(zone, method), hist))
+
+    def uninstrument_zone(self, zone):
+        # Ripristina il lock originale e i metodi della classe
+        if not isinstance(zone.lock, InstrumentedLock):
+            return
+        zone.lock = zone.lock.inner
+        for method in self.TIMED_METHODS:
+            vars(zone).pop(method, None)
+
+    # --------------------- Esportazione ---------------------
+
+    def stats(self):
+        # Riepilogo di tutti gli istogrammi e gauge come dizionario
+        def key_name(name, labels):
+            if not labels:
+                return name
+            return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+        return {
+            "histograms": {
+                key_name(*key): hist.summary() for key, hist in self.histograms.items()
+            },
+            "gauges": {key_name(*key): value for key, value in self.gauges.items()},
+        }
+
+    def to_text(self):
+        # Riepilogo leggibile, una riga per metrica
+        data = self.stats()
+        lines = [
+            f"{name}: count={s['count']} mean={s['mean']:.3g} p50={s['p50']:.3g} p99={s['p99']:.3g}"
+            for name, s in sorted(data["histograms"].items())
+        ]
+        lines += [f"{name}: {value}" for name, value in sorted(data["gauges"].items())]
+        return "\n".join(lines) + "\n"
+
+    def to_prometheus(self):
+        # Formato di esposizione testuale di Prometheus (istogrammi cumulativi)
+        def fmt_labels(labels, extra=()):
+            pairs = [f'{k}="{v}"' for k, v in list(labels) + list(extra)]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        lines = []
+        for (name, labels), hist in sorted(self.histograms.items()):
+            lines.append(f"# TYPE unipark_{name} histogram")
+            cumulative = 0
+            for bound, bucket in zip(hist.bounds + (float("inf"),), hist.counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(
+                    f"unipark_{name}_bucket{fmt_labels(labels, [('le', le)])} {cumulative}"
+                )
+            lines.append(f"unipark_{name}_sum{fmt_labels(labels)} {hist.total}")
+            lines.append(f"unipark_{name}_count{fmt_labels(labels)} {hist.count}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE unipark_{name} gauge")
+            lines.append(f"unipark_{name}{fmt_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, fmt="prometheus"):
+        # Scrive le metriche su file (fmt: "prometheus" oppure "text")
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_text()
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(text)
@@ -1,16 +1,56 @@
-import random
 import threading
 import time
 import tkinter as tk
+from collections import deque
 from tkinter import messagebox, scrolledtext, ttk
 
 # IMPORTIAMO LA LOGICA DAL MODELLO
 # IMPORTIAMO LA LOGICA DAL MODELLO
-from UniPark import UniParkSystem  # type: ignore # pylint: disable=import-error # isort: skip
-
-
-class UniParkApp(tk.Tk):
-    def __init__(self):
+from UniPark import SimulationEngine, UniParkSystem  # type: ignore # pylint: disable=import-error # isort: skip
+
+
+class LogBuffer:
+    # Ring buffer thread-safe per i messaggi di log: i thread produttori scrivono,
+    # la UI svuota a blocchi. Quando è pieno il messaggio più vecchio viene scartato e contato.
+
+    def __init__(self, capacity=2000):
+        self._lines = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.dropped = 0
+
+    def push(self, line, level):
+        # Inserisce una riga; restituisce True se il chiamante deve pianificare uno svuotamento
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self.dropped += 1
+            self._lines.append((line, level))
+            if self._scheduled:
+                return False
+            self._scheduled = True
+            return True
+
+    def drain(self, max_items):
+        # Estrae fino a max_items righe e il numero di righe scartate dall'ultimo svuotamento.
+        # Se il buffer resta vuoto lo svuotamento non è più pianificato
+        with self._lock:
+            count = min(max_items, len(self._lines))
+            items = [self._lines.popleft() for _ in range(count)]
+            dropped, self.dropped = self.dropped, 0
+            if not self._lines:
+                self._scheduled = False
+            return items, dropped, bool(self._lines)
+
+
+class UniParkApp(tk.Tk):  # pylint: disable=too-many-instance-attributes
+    FRAME_MS = 50  # Intervallo minimo tra due ridisegni consecutivi
+    LOG_BATCH = 200  # Righe di log inserite al massimo per frame
+    LOG_KEEP = 500  # Righe mantenute nel pannello System Logs
+    CARD_LIMIT = 12  # Oltre questo numero di zone la dashboard passa alla heatmap
+    CELL_W = 150  # Dimensioni di una cella della heatmap (pixel)
+    CELL_H = 48
+
+    def __init__(self, system=None, dashboard=None):
         super().__init__()
 
         # --- Configurazione Finestra ---
@@ -23,9 +63,34 @@ class UniParkApp(tk.Tk):
         self.running = True
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        self.system = UniParkSystem()
+        self.system = system if system is not None else UniParkSystem()
         self.zones = self.system.zones
 
+        # Modalità della dashboard: "cards" (una scheda per zona) oppure "heatmap"
+        # (canvas virtualizzato: solo le celle visibili esistono e vengono riciclate)
+        if dashboard is None:
+            dashboard = "heatmap" if len(self.zones) > self.CARD_LIMIT else "cards"
+        self.dashboard_mode = dashboard
+        self.heatmap = None
+        self._heatmap_cols = 0
+        self._cells = {}  # indice zona -> cella visibile
+        self._cell_pool = []  # Celle nascoste riutilizzabili
+        self._zone_index = {}
+        self.summary_labels = {}
+        self._summary_text = {}
+
+        # Ridisegno guidato dagli eventi: le zone modificate vengono raccolte in un insieme
+        # e ridisegnate insieme al frame successivo (coalescing delle notifiche)
+        self._dirty_zones = set()
+        self._dirty_lock = threading.Lock()
+        self._redraw_pending = False
+        # Ultimo stato disegnato per zona (versione, banda, testi)
+        self._drawn_state = {}
+
+        # Strumentazione opzionale (vedi enable_instrumentation): None = disattivata, costo nullo
+        self.stats = None
+        self._after_pending = 0
+
         # --- Setup Stili ---
         self.setup_styles()
 
@@ -34,10 +99,11 @@ class UniParkApp(tk.Tk):
         self.create_dashboard_area()
         self.create_log_area()
 
-        # --- Avvio Thread ---
+        # --- Avvio Simulazione ---
         self.start_background_workers()
 
         # --- Avvio Loop UI ---
+        self.update_widgets_once()
         self.update_ui_loop()
 
     def setup_styles(self):
@@ -99,6 +165,9 @@ class UniParkApp(tk.Tk):
         container.pack(fill="both", expand=True, padx=20, pady=20)
 
         self.zone_widgets = {}
+        if self.dashboard_mode == "heatmap":
+            self.create_heatmap_area(container)
+            return
 
         for zone in self.zones:
             # Card Frame
@@ -183,6 +252,160 @@ class UniParkApp(tk.Tk):
                 "lbl_queue": lbl_queue,
             }
 
+    def create_heatmap_area(self, container):
+        # Dashboard scalabile: riquadri di riepilogo dai totali di sistema e heatmap
+        # scorrevole in cui esistono solo le celle visibili (costo indipendente dalle zone)
+        summary = tk.Frame(container, bg=self.colors["bg"])
+        summary.pack(fill="x", pady=(0, 10))
+        for key, title in (
+            ("capacity", "Capacità"),
+            ("free_slots", "Liberi"),
+            ("occupied", "Occupati"),
+            ("waiting", "In coda"),
+        ):
+            tile = tk.LabelFrame(
+                summary,
+                text=f" {title} ",
+                font=("Arial", 10, "bold"),
+                bg="white",
+                fg="#34495e",
+                bd=1,
+                relief="solid",
+            )
+            tile.pack(side=tk.LEFT, fill="x", expand=True, padx=5)
+            label = tk.Label(tile, text="--", font=("Arial", 16, "bold"), bg="white")
+            label.pack(pady=5)
+            self.summary_labels[key] = label
+
+        body = tk.Frame(container, bg=self.colors["bg"])
+        body.pack(fill="both", expand=True)
+        self.heatmap = tk.Canvas(
+            body,
+            bg=self.colors["bg"],
+            highlightthickness=0,
+            yscrollincrement=self.CELL_H,
+        )
+        scrollbar = tk.Scrollbar(
+            body, orient="vertical", command=self._on_heatmap_scroll
+        )
+        self.heatmap.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.heatmap.pack(side=tk.LEFT, fill="both", expand=True)
+
+        self._zone_index = {zone.name: index for index, zone in enumerate(self.zones)}
+        self.heatmap.bind("<Configure>", self._relayout_heatmap)
+        self.heatmap.bind("<MouseWheel>", lambda e: self._scroll_units(-e.delta // 120))
+        self.heatmap.bind("<Button-4>", lambda e: self._scroll_units(-1))
+        self.heatmap.bind("<Button-5>", lambda e: self._scroll_units(1))
+        # Click sinistro: PARK, click destro: UNPARK
+        self.heatmap.tag_bind(
+            "cell", "<Button-1>", lambda e: self._on_cell_click(e, "park")
+        )
+        self.heatmap.tag_bind(
+            "cell", "<Button-3>", lambda e: self._on_cell_click(e, "unpark")
+        )
+
+    def _on_heatmap_scroll(self, *args):
+        self.heatmap.yview(*args)
+        self._render_visible()
+
+    def _scroll_units(self, units):
+        self.heatmap.yview_scroll(units, "units")
+        self._render_visible()
+
+    def _relayout_heatmap(self, _event=None):
+        # Ricalcola le colonne in base alla larghezza e la regione scorrevole
+        cols = max(1, self.heatmap.winfo_width() // self.CELL_W)
+        if cols != self._heatmap_cols:
+            self._heatmap_cols = cols
+            for index in list(self._cells):
+                self._hide_cell(index)
+            rows = -(-len(self.zones) // cols)
+            self.heatmap.configure(
+                scrollregion=(0, 0, cols * self.CELL_W, rows * self.CELL_H)
+            )
+        self._render_visible()
+
+    def _hide_cell(self, index):
+        # Nasconde una cella uscita dalla vista e la rimette nel pool
+        cell = self._cells.pop(index)
+        self.heatmap.itemconfigure(cell["rect"], state="hidden")
+        self.heatmap.itemconfigure(cell["text"], state="hidden")
+        self._drawn_state.pop(cell["zone"].name, None)
+        self._cell_pool.append(cell)
+
+    def _render_visible(self):
+        # Associa le celle (riciclate dal pool) alle sole zone nella porzione visibile
+        cols = max(1, self._heatmap_cols)
+        top = int(self.heatmap.canvasy(0))
+        bottom = top + self.heatmap.winfo_height()
+        first = max(0, top // self.CELL_H) * cols
+        last = min(len(self.zones), (bottom // self.CELL_H + 1) * cols)
+
+        for index in [i for i in self._cells if not first <= i < last]:
+            self._hide_cell(index)
+        snapshot = self.system.snapshot()
+        for index in range(first, last):
+            if index in self._cells:
+                continue
+            if self._cell_pool:
+                cell = self._cell_pool.pop()
+            else:
+                cell = {
+                    "rect": self.heatmap.create_rectangle(
+                        0, 0, 0, 0, outline="white", tags=("cell",)
+                    ),
+                    "text": self.heatmap.create_text(
+                        0, 0, font=("Arial", 9, "bold"), fill="white", tags=("cell",)
+                    ),
+                }
+            cell.update(zone=self.zones[index], fill=None, label=None)
+            row, col = divmod(index, cols)
+            x, y = col * self.CELL_W, row * self.CELL_H
+            self.heatmap.coords(
+                cell["rect"], x + 2, y + 2, x + self.CELL_W - 2, y + self.CELL_H - 2
+            )
+            self.heatmap.coords(cell["text"], x + self.CELL_W / 2, y + self.CELL_H / 2)
+            self.heatmap.itemconfigure(cell["rect"], state="normal")
+            self.heatmap.itemconfigure(cell["text"], state="normal")
+            self._cells[index] = cell
+            self._draw_cell(cell, snapshot)
+
+    def _draw_cell(self, cell, snapshot):
+        # Colore della fascia di occupazione e testo sintetico; riconfigura solo se cambiati
+        zone = cell["zone"]
+        i = snapshot.position(zone.name)
+        if i is None:
+            return
+        occ, cap, wait = snapshot.occupied(i), snapshot.capacity[i], snapshot.waiting[i]
+        self._drawn_state.setdefault(zone.name, {})["version"] = snapshot.version[i]
+
+        fill = self._band(snapshot.rate(i))[2]
+        label = f"{zone.name[:20]}\n{occ}/{cap}" + (f"  ⚠ {wait}" if wait else "")
+        if cell["fill"] != fill:
+            self.heatmap.itemconfigure(cell["rect"], fill=fill)
+            cell["fill"] = fill
+        if cell["label"] != label:
+            self.heatmap.itemconfigure(cell["text"], text=label)
+            cell["label"] = label
+
+    def _on_cell_click(self, event, action):
+        # Individua la cella cliccata dalle coordinate e applica l'azione manuale
+        col = int(self.heatmap.canvasx(event.x) // self.CELL_W)
+        row = int(self.heatmap.canvasy(event.y) // self.CELL_H)
+        cell = self._cells.get(row * max(1, self._heatmap_cols) + col)
+        if cell is not None and col < self._heatmap_cols:
+            self.manual_action(cell["zone"], action)
+
+    def _update_summary(self, snapshot):
+        # Riquadri di riepilogo: totali dello stesso snapshot usato per le celle
+        totals = snapshot.totals()
+        for key, label in self.summary_labels.items():
+            text = str(totals[key])
+            if self._summary_text.get(key) != text:
+                label.config(text=text)
+                self._summary_text[key] = text
+
     def create_log_area(self):
         # Area di log scorrevole
         log_frame = tk.LabelFrame(
@@ -204,36 +427,85 @@ class UniParkApp(tk.Tk):
         self.log_area.tag_config("WARNING", foreground=self.colors["warning"])
         self.log_area.tag_config("ERROR", foreground=self.colors["danger"])
 
+        self.log_buffer = LogBuffer()
+
     def log_msg(self, msg, level="INFO"):
-        # Scrive nel log in modo thread-safe
-        def _write():
+        # Scrive nel log in modo thread-safe: il messaggio va nel ring buffer e
+        # viene pianificato un solo svuotamento per frame
+        timestamp = time.strftime("%H:%M:%S")
+        if self.log_buffer.push(f"[{timestamp}] {msg}\n", level):
+            self._schedule(self.FRAME_MS, self._drain_logs)
+
+    def _drain_logs(self):
+        # Inserisce un blocco di righe con una sola insert e mantiene solo le ultime LOG_KEEP
+        items, dropped, more = self.log_buffer.drain(self.LOG_BATCH)
+        chunks = []
+        if dropped:
+            chunks += [f"... {dropped} messaggi scartati (buffer pieno)\n", "WARNING"]
+        for line, level in items:
+            chunks += [line, level]
+
+        if chunks:
             self.log_area.config(state="normal")
-            timestamp = time.strftime("%H:%M:%S")
-            self.log_area.insert(tk.END, f"[{timestamp}] {msg}\n", level)
+            self.log_area.insert(tk.END, *chunks)
+            lines = int(self.log_area.index("end-1c").split(".", maxsplit=1)[0])
+            if lines > self.LOG_KEEP:
+                self.log_area.delete("1.0", f"{lines - self.LOG_KEEP + 1}.0")
             self.log_area.see(tk.END)
             self.log_area.config(state="disabled")
 
-        self.after(0, _write)
+        if more:
+            self._schedule(self.FRAME_MS, self._drain_logs)
+
+    # ==================== STRUMENTAZIONE ====================
+
+    def enable_instrumentation(self, stats=None):
+        # Attiva la misura di lock e latenze delle zone, durata delle callback Tk
+        # e profondità della coda after(); restituisce il registro delle metriche
+        if stats is None:
+            # pylint: disable-next=import-error, import-outside-toplevel
+            from UniParkStats import Instrumentation  # type: ignore # isort: skip
+
+            stats = Instrumentation()
+        for zone in self.zones:
+            stats.instrument_zone(zone)
+        self.stats = stats
+        return stats
+
+    def _schedule(self, delay, callback):
+        # Pianifica una callback Tk; con la strumentazione attiva ne misura la durata
+        # e registra quante callback sono in attesa di esecuzione
+        if self.stats is None:
+            return self.after(delay, callback)
+
+        stats = self.stats
+        self._after_pending += 1
+        stats.set_gauge("ui_after_pending", self._after_pending)
+        stats.histogram("ui_after_queue_depth", bounds=stats.COUNT_BOUNDS).observe(
+            self._after_pending
+        )
+        frame_hist = stats.histogram("ui_callback_seconds", callback=callback.__name__)
+
+        def timed_callback():
+            self._after_pending -= 1
+            start = time.perf_counter()
+            try:
+                callback()
+            finally:
+                frame_hist.observe(time.perf_counter() - start)
+
+        return self.after(delay, timed_callback)
 
     # ==================== LOGICA & WORKERS ====================
 
-    def _zone_worker(self, zone):
-        # Simulazione traffico in background
-        while self.running:
-            time.sleep(random.uniform(2.0, 5.0))
-            if not self.running:
-                break
-
-            # Genera eventi casuali (park/unpark)
-            evento = random.randint(0, 100)
-            if evento < 40:
-                if zone.park():
-                    self.log_msg(f"AUTO-PARK: Auto entrata in {zone.name}", "INFO")
-                else:
-                    self.log_msg(f"AUTO-PARK: {zone.name} PIENA -> Coda", "WARNING")
-            elif 40 <= evento < 80:
-                if zone.unpark():
-                    self.log_msg(f"AUTO-UNPARK: Auto uscita da {zone.name}", "INFO")
+    def _on_sim_event(self, _when, zone, kind):
+        # Callback del motore di simulazione: traduce gli eventi in messaggi di log
+        if kind == "park":
+            self.log_msg(f"AUTO-PARK: Auto entrata in {zone.name}", "INFO")
+        elif kind == "queue":
+            self.log_msg(f"AUTO-PARK: {zone.name} PIENA -> Coda", "WARNING")
+        elif kind == "unpark":
+            self.log_msg(f"AUTO-UNPARK: Auto uscita da {zone.name}", "INFO")
 
     def manual_action(self, zone, action):
         # Gestione pulsanti manuali
@@ -248,59 +520,137 @@ class UniParkApp(tk.Tk):
             else:
                 self.log_msg(f"MANUALE: Errore {zone.name} vuota", "ERROR")
 
-        # Aggiornamento immediato (senza aspettare il loop)
-        self.update_widgets_once()
+        # Aggiornamento immediato della sola zona interessata (senza aspettare il frame)
+        self.update_widgets_once([zone])
 
     def start_background_workers(self):
+        # Il traffico automatico è generato dal motore a eventi discreti (nessun thread per zona):
+        # il loop della UI lo fa avanzare in tempo reale scalato di time_scale
+        self.time_scale = 1.0
+        self.engine = SimulationEngine(self.zones, on_event=self._on_sim_event)
+        self._last_tick = time.monotonic()
+
         for zone in self.zones:
-            t = threading.Thread(target=self._zone_worker, args=(zone,), daemon=True)
-            t.start()
+            zone.add_observer(self._on_zone_change)
+
+    def advance_simulation(self):
+        # Avanza il motore del tempo reale trascorso dall'ultimo tick
+        now = time.monotonic()
+        elapsed = now - self._last_tick
+        self._last_tick = now
+        self.engine.advance_realtime(elapsed, self.time_scale)
 
     def update_ui_loop(self):
-        # Polling loop per aggiornare la grafica
+        # Loop di simulazione: fa avanzare il motore; il ridisegno avviene solo su notifica
         if self.running:
-            self.update_widgets_once()
-            self.after(200, self.update_ui_loop)
+            self.advance_simulation()
+            self._schedule(200, self.update_ui_loop)
+
+    def _on_zone_change(self, zone, _delta_free, _delta_waiting):
+        # Osservatore delle zone (può essere invocato da qualsiasi thread):
+        # marca la zona come da ridisegnare e pianifica un solo ridisegno per frame
+        with self._dirty_lock:
+            self._dirty_zones.add(zone)
+            if self._redraw_pending:
+                return
+            self._redraw_pending = True
+        self._schedule(self.FRAME_MS, self._flush_dirty_zones)
+
+    def _flush_dirty_zones(self):
+        # Ridisegna in un colpo solo tutte le zone modificate dall'ultimo frame
+        with self._dirty_lock:
+            dirty = self._dirty_zones
+            self._dirty_zones = set()
+            self._redraw_pending = False
+        changed = [
+            z
+            for z in dirty
+            if self._drawn_state.get(z.name, {}).get("version") != z.version
+        ]
+        if changed:
+            self.update_widgets_once(changed)
+
+    def _band(self, rate):
+        # Fascia di soglia della progress bar: (stile, testo di stato, colore)
+        if rate > 90:
+            return (
+                "Red.Horizontal.TProgressbar",
+                "● PIENO",  # Pallino rosso simulato
+                self.colors["danger"],
+            )
+        if rate > 70:
+            return (
+                "Orange.Horizontal.TProgressbar",
+                "● AFFOLLATO",  # Pallino arancione simulato
+                "#e67e22",
+            )
+        return (
+            "Green.Horizontal.TProgressbar",
+            "● DISPONIBILE",  # Pallino verde simulato
+            self.colors["success"],
+        )
 
-    def update_widgets_once(self):
-        # Logica di aggiornamento singolo widget
-        for zone in self.zones:
+    def update_widgets_once(self, zones=None):
+        # Aggiorna i widget delle zone indicate (tutte se None), riconfigurando solo
+        # ciò che è effettivamente cambiato rispetto all'ultimo disegno.
+        # Tutti i valori provengono da un unico snapshot coerente del sistema (senza lock)
+        snapshot = self.system.snapshot()
+        if self.dashboard_mode == "heatmap":
+            self._update_heatmap(snapshot, zones)
+            return
+        for zone in self.zones if zones is None else zones:
+            i = snapshot.position(zone.name)
+            if i is None:
+                continue
             widgets = self.zone_widgets[zone.name]
+            drawn = self._drawn_state.setdefault(zone.name, {})
 
-            with zone.lock:
-                occ = zone.occupied_slots
-                cap = zone.capacity
-                wait = zone.waiting
-                rate = zone.occupancy_rate
-                free = zone.free_slots
+            cap = snapshot.capacity[i]
+            free = snapshot.free_slots[i]
+            wait = snapshot.waiting[i]
+            occ = snapshot.occupied(i)
+            rate = snapshot.rate(i)
+            drawn["version"] = snapshot.version[i]
 
             # Progress Bar
-            widgets["progress"]["value"] = rate
-            widgets["progress"]["maximum"] = 100
-
-            if rate > 90:
-                widgets["progress"].configure(style="Red.Horizontal.TProgressbar")
-                status_txt = "● PIENO"  # Pallino rosso simulato
-                fg_col = self.colors["danger"]
-            elif rate > 70:
-                widgets["progress"].configure(style="Orange.Horizontal.TProgressbar")
-                status_txt = "● AFFOLLATO"  # Pallino arancione simulato
-                fg_col = "#e67e22"
-            else:
-                widgets["progress"].configure(style="Green.Horizontal.TProgressbar")
-                status_txt = "● DISPONIBILE"  # Pallino verde simulato
-                fg_col = self.colors["success"]
+            if drawn.get("rate") != rate:
+                widgets["progress"]["value"] = rate
+                widgets["progress"]["maximum"] = 100
+                drawn["rate"] = rate
+
+            # Lo stile viene riapplicato solo quando cambia la fascia di soglia
+            band = self._band(rate)
+            if drawn.get("band") != band:
+                style, status_txt, fg_col = band
+                widgets["progress"].configure(style=style)
+                widgets["lbl_status"].config(text=status_txt, fg=fg_col)
+                drawn["band"] = band
 
             # Label
-            widgets["lbl_status"].config(text=status_txt, fg=fg_col)
-            widgets["lbl_details"].config(text=f"{occ}/{cap} Occ. | {free} Lib.")
-
-            if wait > 0:
-                widgets["lbl_queue"].config(
-                    text=f"⚠ Coda: {wait}", fg=self.colors["danger"]
-                )
-            else:
-                widgets["lbl_queue"].config(text="Nessuna Coda", fg="#bdc3c7")
+            details = f"{occ}/{cap} Occ. | {free} Lib."
+            if drawn.get("details") != details:
+                widgets["lbl_details"].config(text=details)
+                drawn["details"] = details
+
+            if drawn.get("wait") != wait:
+                if wait > 0:
+                    widgets["lbl_queue"].config(
+                        text=f"⚠ Coda: {wait}", fg=self.colors["danger"]
+                    )
+                else:
+                    widgets["lbl_queue"].config(text="Nessuna Coda", fg="#bdc3c7")
+                drawn["wait"] = wait
+
+    def _update_heatmap(self, snapshot, zones=None):
+        # Ridisegna solo le celle visibili delle zone indicate (le altre non hanno widget)
+        if zones is None:
+            cells = list(self._cells.values())
+        else:
+            indexes = (self._zone_index.get(zone.name) for zone in zones)
+            cells = [self._cells[i] for i in indexes if i in self._cells]
+        for cell in cells:
+            self._draw_cell(cell, snapshot)
+        self._update_summary(snapshot)
 
     def on_close(self):
         if messagebox.askokcancel("Esci", "Vuoi davvero chiudere UniPark?"):
@@ -10,7 +10,15 @@ import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
 # pylint: disable=import-error, wrong-import-position
-from UniPark import ParkingZone, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniPark import (  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+    ParkingZone,
+    RandomStreams,
+    SimulationEngine,
+    UniParkSystem,
+    build_scenario_grid,
+    iter_scenario_sweep,
+    run_scenario_sweep,
+)
 
 # ==================== TEST MODELLO (ParkingZone) ====================
 
@@ -93,3 +101,447 @@ def test_concurrency_stress():
         t.join()
 
     assert z.free_slots == 0
+
+
+# ==================== TEST SIMULAZIONE (SimulationEngine) ====================
+
+
+def test_engine_advances_virtual_time():
+    zones = [ParkingZone("Sim A", 10, 5), ParkingZone("Sim B", 10, 5)]
+    engine = SimulationEngine(zones, seed=1)
+    processed = engine.run(3600)
+    # Con un evento ogni 2-5 secondi per zona, un'ora virtuale produce ~2000 eventi
+    assert engine.now == 3600
+    assert 1400 <= processed <= 3600
+    for z in zones:
+        assert 0 <= z.free_slots <= z.capacity
+        assert z.waiting >= 0
+
+
+def test_engine_is_reproducible_with_seed():
+    traces = []
+    for _ in range(2):
+        trace = []
+        zones = [ParkingZone("Sim", 5, 1)]
+        engine = SimulationEngine(
+            zones, seed=42, on_event=lambda t, z, k, tr=trace: tr.append((t, k))
+        )
+        engine.run(500)
+        traces.append(trace)
+    assert traces[0] == traces[1]
+    assert traces[0]
+
+
+def test_engine_realtime_scaled():
+    engine = SimulationEngine([ParkingZone("RT", 10, 10)], seed=3)
+    engine.advance_realtime(0.5, time_scale=60)
+    assert engine.now == 30
+
+
+# ==================== TEST SWEEP DI SCENARI ====================
+
+
+def test_scenario_grid_product():
+    grid = build_scenario_grid(
+        capacities=[(10, 20)], free_slots=[(5, 5), (10, 20)], park_probs=(0.4, 0.6)
+    )
+    assert len(grid) == 4
+    assert grid[0]["capacities"] == (10, 20)
+
+
+def test_scenario_sweep_is_deterministic():
+    grid = build_scenario_grid(
+        capacities=[(10, 20)], free_slots=[(5, 5)], horizons=(600,)
+    )
+    first = sorted(iter_scenario_sweep(grid, replicas=2, seed=9, workers=0))
+    second = sorted(iter_scenario_sweep(grid, replicas=2, seed=9, workers=0))
+    assert first == second
+    assert first[0][2] != first[1][2]  # Repliche con seed diversi
+
+
+def test_scenario_sweep_process_pool_matches_inline():
+    grid = build_scenario_grid(
+        capacities=[(10,), (30,)], free_slots=[(5,)], horizons=(300,)
+    )
+    inline = run_scenario_sweep(grid, replicas=2, seed=1, workers=0)
+    pooled = run_scenario_sweep(grid, replicas=2, seed=1, workers=2)
+    assert inline == pooled
+    assert inline[0]["replicas"] == 2
+
+
+# ==================== TEST OPERAZIONI BULK ====================
+
+
+def test_park_many_fills_then_queues():
+    z = ParkingZone("Bulk", 10, 3)
+    assert z.park_many(5) == (3, 2)
+    assert z.free_slots == 0
+    assert z.waiting == 2
+
+
+def test_unpark_many_admits_queue_first():
+    z = ParkingZone("Bulk", 10, 0)
+    z.waiting = 2
+    assert z.unpark_many(5) == (2, 3)
+    assert z.waiting == 0
+    assert z.free_slots == 3
+    # Le uscite oltre la capacità vengono ignorate
+    assert z.unpark_many(100) == (0, 7)
+    assert z.free_slots == 10
+
+
+def test_bulk_operations_reject_negative_counts():
+    z = ParkingZone("Bulk", 10, 5)
+    with pytest.raises(ValueError):
+        z.park_many(-3)
+    with pytest.raises(ValueError):
+        z.unpark_many(-3)
+    assert (z.free_slots, z.waiting, z.version) == (5, 0, 0)
+
+
+def test_bulk_matches_single_operations():
+    bulk = ParkingZone("Bulk", 20, 4)
+    single = ParkingZone("Single", 20, 4)
+    for delta in (7, -3, 12, -25, 30, -8):
+        if delta < 0:
+            bulk.unpark_many(-delta)
+            for _ in range(-delta):
+                single.unpark()
+        else:
+            bulk.park_many(delta)
+            for _ in range(delta):
+                single.park()
+        assert (bulk.free_slots, bulk.waiting) == (single.free_slots, single.waiting)
+
+
+def test_system_apply_batch(park_system):
+    zone_a, zone_b = park_system.zones[0], park_system.zones[1]
+    free_a = zone_a.free_slots
+    results = park_system.apply_batch([("a", 1), (zone_b, -1), (zone_a.name, -1)])
+    assert len(results) == 3
+    assert zone_a.free_slots == free_a
+    with pytest.raises(KeyError):
+        park_system.apply_batch([("inesistente", 1)])
+
+
+# ==================== TEST REGISTRO ZONE ====================
+
+
+def test_registry_default_ids(park_system):
+    assert park_system.get_zone("a") is park_system.zones[0]
+    assert park_system.zone_map["c"] is park_system.zones[2]
+    assert park_system.get_zone_by_name("Inesistente") is None
+
+
+def test_registry_add_remove_and_totals():
+    system = UniParkSystem(zones=[ParkingZone("X", 10, 4), ParkingZone("Y", 20, 20)])
+    assert system.get_totals() == {
+        "capacity": 30,
+        "free_slots": 24,
+        "occupied": 6,
+        "waiting": 0,
+    }
+
+    extra = system.add_zone(ParkingZone("Z", 5, 0), "zeta")
+    assert system.get_zone("zeta") is extra
+    assert system.get_total_capacity() == 35
+
+    extra.park()
+    system.zones[0].park_many(6)
+    system.apply_batch([("zeta", -2)])
+    assert system.get_totals() == {
+        "capacity": 35,
+        "free_slots": 21,
+        "occupied": 14,
+        "waiting": 2,
+    }
+
+    system.remove_zone("X")
+    assert system.get_totals() == {
+        "capacity": 25,
+        "free_slots": 21,
+        "occupied": 4,
+        "waiting": 0,
+    }
+    assert system.get_zone_by_name("X") is None
+    with pytest.raises(ValueError):
+        system.add_zone(ParkingZone("Y", 1, 1))
+
+
+def test_registry_totals_match_zones_under_load():
+    system = UniParkSystem(zones=[ParkingZone(f"Z{i}", 15, 7) for i in range(6)])
+    engine = SimulationEngine(system.zones, seed=5)
+    engine.run(2000)
+    totals = system.get_totals()
+    assert totals["free_slots"] == sum(z.free_slots for z in system.zones)
+    assert totals["waiting"] == sum(z.waiting for z in system.zones)
+
+
+# ==================== TEST CODA FIFO ====================
+
+
+def test_fifo_queue_admits_head_first():
+    clock = iter(range(100)).__next__
+    z = ParkingZone("Fifo", 1, 0, track_queue=True, clock=clock)
+    z.park(vehicle_id=11)
+    z.park(vehicle_id=22)
+    assert z.waiting == 2
+    assert z.queue.peek().vehicle_id == 11
+    z.unpark()
+    assert z.queue.peek().vehicle_id == 22
+    assert len(z.queue) == 1 == z.waiting
+
+
+def test_fifo_wait_percentiles_in_status():
+    now = [0.0]
+    z = ParkingZone("Fifo", 1, 0, track_queue=True, clock=lambda: now[0])
+    z.park_many(10)
+    for _ in range(10):
+        now[0] += 1.0
+        z.unpark()
+    status = z.get_status_dict()
+    assert status["waiting"] == 0
+    assert status["wait_p50"] == 5.0
+    assert status["wait_p99"] == 10.0
+    assert status["longest_wait"] == 0.0
+
+
+def test_fifo_rejects_non_integer_id_without_changing_state():
+    z = ParkingZone("Fifo", 1, 0, track_queue=True)
+    z.park(vehicle_id=7)
+    with pytest.raises(TypeError):
+        z.park(vehicle_id="AB123CD")
+    assert z.waiting == 1 == len(z.queue)
+    assert z.version == 1
+    assert z.unpark() and z.waiting == 0
+
+
+def test_fifo_queue_is_compact():
+    z = ParkingZone("Big", 1, 0, track_queue=True)
+    z.park_many(100_000)
+    assert len(z.queue) == 100_000
+    assert z.queue.nbytes() < 4 * 1024 * 1024
+    assert z.unpark_many(100_000) == (100_000, 0)
+    assert len(z.queue) == 0
+
+
+# ==================== TEST INSTRADAMENTO TRA ZONE ====================
+
+
+def test_park_best_redirects_to_nearest_free_zone():
+    system = UniParkSystem(
+        zones=[
+            ParkingZone("Piena", 5, 0),
+            ParkingZone("Vicina", 5, 2),
+            ParkingZone("Lontana", 50, 40),
+        ]
+    )
+    system.set_distances({("Piena", "Vicina"): 1.0, ("Piena", "Lontana"): 10.0})
+
+    zone, admitted = system.park_best("Piena")
+    assert zone.name == "Vicina" and admitted
+    # Senza distanze vince la zona più disponibile
+    zone, _ = system.park_best()
+    assert zone.name == "Lontana"
+    # La zona preferita con posti liberi viene usata direttamente
+    assert system.park_best("Vicina")[0].name == "Vicina"
+    assert system.get_zone_by_name("Piena").waiting == 0
+
+
+def test_park_best_prefers_near_zone_outside_most_available():
+    system = UniParkSystem(
+        zones=[
+            ParkingZone("Full", 10, 0),
+            ParkingZone("Near", 10, 5),
+            ParkingZone("Far1", 50, 40),
+            ParkingZone("Far2", 50, 45),
+            ParkingZone("Far3", 50, 42),
+        ]
+    )
+    system.set_distances(
+        {
+            ("Full", "Near"): 1.0,
+            ("Full", "Far1"): 100.0,
+            ("Full", "Far2"): 100.0,
+            ("Full", "Far3"): 100.0,
+        }
+    )
+    # Near non è tra le 3 zone più disponibili, ma è la più vicina con posti liberi
+    zone, admitted = system.park_best("Full")
+    assert zone.name == "Near" and admitted
+
+
+def test_best_zone_walks_only_nearest_neighbors():
+    zones = [ParkingZone("O", 10, 0)]
+    zones += [ParkingZone(f"D{i}", 100, 90) for i in range(3)]
+    zones += [ParkingZone(f"Z{i}", 10, 1) for i in range(200)]
+    system = UniParkSystem(zones=zones)
+    # Matrice densa: tutte le zone hanno una distanza nota dall'origine
+    distances = {("O", f"D{i}"): 50.0 for i in range(3)}
+    distances.update({("O", f"Z{i}"): float(i + 1) for i in range(200)})
+    system.set_distances(distances)
+
+    examined = []
+    route_cost = system._route_cost  # pylint: disable=protected-access
+
+    def counting_cost(origin, zone):
+        examined.append(zone)
+        return route_cost(origin, zone)
+
+    system._route_cost = counting_cost  # pylint: disable=protected-access
+    assert system.best_zone("O").name == "Z0"
+    # Le 3 zone più disponibili più il vicino più prossimo, non tutte le 203 della matrice
+    assert len(examined) <= 3 + 1
+
+
+def test_route_index_tracks_changes_and_stays_compact():
+    system = UniParkSystem(zones=[ParkingZone(f"R{i}", 10, 5) for i in range(20)])
+    target = system.get_zone_by_name("R7")
+    for _ in range(5):
+        target.unpark()
+    assert system.best_zone() is target
+    for _ in range(10):
+        target.park()
+    assert system.best_zone() is not target
+
+    for i in range(2000):
+        system.zones[i % 20].park()
+        system.zones[i % 20].unpark()
+    assert len(system._route_heap) <= 2 * 20 + 65  # pylint: disable=protected-access
+
+    system.remove_zone("R3")
+    assert all(system.best_zone().name != "R3" for _ in range(3))
+
+
+def test_rebalance_moves_queued_cars():
+    system = UniParkSystem(
+        zones=[
+            ParkingZone("Coda", 2, 0, track_queue=True),
+            ParkingZone("Libera", 4, 3),
+        ]
+    )
+    source = system.get_zone_by_name("Coda")
+    for vehicle_id in range(5):
+        source.park(vehicle_id)
+    before = system.get_totals()
+
+    assert system.rebalance_queues() == 3
+    assert source.waiting == 2
+    assert source.queue.peek().vehicle_id == 0  # I primi della fila restano
+    assert system.get_zone_by_name("Libera").free_slots == 0
+    after = system.get_totals()
+    assert (
+        after["occupied"] + after["waiting"] == before["occupied"] + before["waiting"]
+    )
+
+
+# ==================== TEST FLUSSI CASUALI ====================
+
+
+def test_random_streams_are_reproducible_and_independent():
+    first = RandomStreams(7).stream("zone:A")
+    again = RandomStreams(7).stream("zone:A")
+    other = RandomStreams(7).stream("zone:B")
+    values = [first.random() for _ in range(5000)]
+    assert values == [again.random() for _ in range(5000)]
+    assert values[:10] != [other.random() for _ in range(10)]
+    assert all(0 <= v < 1 for v in values)
+    assert {first.randint(1, 3) for _ in range(200)} == {1, 2, 3}
+
+
+def test_zone_trace_independent_of_other_zones():
+    def trace_of(zone_names):
+        zones = [ParkingZone(name, 10, 5) for name in zone_names]
+        trace = []
+        engine = SimulationEngine(
+            zones,
+            seed=11,
+            on_event=lambda t, z, k: trace.append((t, k)) if z.name == "A" else None,
+        )
+        engine.run(600)
+        return trace
+
+    alone = trace_of(["A"])
+    assert alone and alone == trace_of(["A", "B", "C"])
+    assert UniParkSystem(seed=3).get_totals() == UniParkSystem(seed=3).get_totals()
+
+
+# ==================== TEST SNAPSHOT DI SISTEMA ====================
+
+
+def test_snapshot_matches_zones_and_is_read_only():
+    system = UniParkSystem(zones=[ParkingZone("S1", 10, 4), ParkingZone("S2", 3, 0)])
+    system.get_zone_by_name("S2").park_many(2)
+    snapshot = system.snapshot()
+
+    assert snapshot.names == ("S1", "S2") and len(snapshot) == 2
+    i = snapshot.position("S2")
+    assert snapshot.status(i) == system.get_zone_by_name("S2").get_status_dict()
+    assert snapshot.totals() == system.get_totals()
+    with pytest.raises(TypeError):
+        snapshot.free_slots[0] = 99
+
+    # Gli snapshot già presi non cambiano; il registro aggiornato si riflette nei nuovi
+    system.get_zone_by_name("S1").park()
+    system.remove_zone("S2")
+    system.add_zone(ParkingZone("S3", 7, 7))
+    assert snapshot.free_slots[0] == 4 and snapshot.position("S3") is None
+    fresh = system.snapshot()
+    assert fresh.names == ("S1", "S3")
+    assert list(fresh.free_slots) == [3, 7]
+    # Gli id automatici non vengono riusati: S3 riceve "c", non l'id "b" della zona rimossa
+    assert fresh.position("c") == fresh.position("S3") == 1
+    assert fresh.position("b") is None
+
+
+def test_snapshot_consistent_under_concurrent_writers():
+    zones = [ParkingZone(f"W{i}", 50, 25) for i in range(8)]
+    system = UniParkSystem(zones=zones)
+    stop = threading.Event()
+
+    def writer(zone):
+        while not stop.is_set():
+            zone.park()
+            zone.unpark()
+
+    threads = [threading.Thread(target=writer, args=(z,)) for z in zones]
+    for t in threads:
+        t.start()
+    try:
+        previous = system.snapshot()
+        for _ in range(500):
+            snapshot = system.snapshot()
+            assert snapshot.seq >= previous.seq and snapshot.seq % 2 == 0
+            for i in range(len(snapshot)):
+                assert 24 <= snapshot.free_slots[i] <= 25
+                assert snapshot.version[i] >= previous.version[i]
+            previous = snapshot
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+def test_snapshot_never_sees_half_a_batch():
+    system = UniParkSystem(
+        zones=[ParkingZone("B1", 100, 50), ParkingZone("B2", 100, 50)]
+    )
+    stop = threading.Event()
+
+    def mover():
+        # Ogni batch sposta un'auto tra le due zone: i posti liberi totali non cambiano
+        while not stop.is_set():
+            system.apply_batch([("B1", 1), ("B2", -1)])
+            system.apply_batch([("B2", 1), ("B1", -1)])
+
+    thread = threading.Thread(target=mover)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    thread.start()
+    try:
+        for _ in range(2000):
+            assert system.snapshot().totals()["free_slots"] == 100
+    finally:
+        stop.set()
+        thread.join()
+        sys.setswitchinterval(interval)
@@ -0,0 +1,48 @@
+# Unit Test Suite per il simulatore vettoriale UniParkBatch.
+import os
+import sys
+
+import numpy as np
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkBatch import BatchSimulator  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def test_batch_matches_parking_zone_semantics():
+    # Stessa sequenza di eventi applicata al simulatore e a ParkingZone
+    rng = np.random.default_rng(7)
+    sim = BatchSimulator([5], [1], 1)
+    zone = ParkingZone("Ref", 5, 1)
+
+    for _ in range(2000):
+        draw = rng.random((1, 1))
+        sim.step(draw)
+        if draw[0, 0] < 0.4:
+            zone.park()
+        elif draw[0, 0] < 0.8:
+            zone.unpark()
+        assert sim.free_slots[0, 0] == zone.free_slots
+        assert sim.waiting[0, 0] == zone.waiting
+
+
+def test_batch_invariants_and_distributions():
+    sim = BatchSimulator([60, 45, 80], [30, 20, 40], 200, seed=1)
+    result = sim.run(300)
+
+    assert (sim.free_slots >= 0).all()
+    assert (sim.free_slots <= sim.capacity[:, None]).all()
+    assert (sim.waiting >= 0).all()
+    assert result["ticks"] == 300
+    np.testing.assert_allclose(result["occupancy_distribution"].sum(axis=1), 1.0)
+    np.testing.assert_allclose(result["queue_distribution"].sum(axis=1), 1.0)
+
+
+def test_batch_full_zone_queues():
+    sim = BatchSimulator([2], [0], 4, park_prob=1.0, unpark_prob=0.0, seed=0)
+    sim.run(10)
+    assert (sim.free_slots == 0).all()
+    assert (sim.waiting == 10).all()
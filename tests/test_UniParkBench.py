@@ -0,0 +1,68 @@
+# Unit Test Suite per la suite di benchmark UniParkBench.
+import json
+import os
+import sys
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniParkBench import compare, main, run_suite  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def report(**values):
+    return {
+        "results": {
+            name: {
+                "value": value,
+                "unit": "x",
+                "better": "lower" if "cost" in name else "higher",
+            }
+            for name, value in values.items()
+        }
+    }
+
+
+def test_compare_flags_only_regressions():
+    baseline = report(rate=100.0, cost=1.0, new_only=5.0)
+    current = report(rate=80.0, cost=0.5, other=1.0)
+    regressions = compare(current, baseline, tolerance=0.10)
+    assert [name for name, *_ in regressions] == ["rate"]
+
+    current = report(rate=100.0, cost=1.5)
+    assert [name for name, *_ in compare(current, baseline)] == ["cost"]
+
+
+def test_quick_suite_is_json_serializable():
+    result = run_suite(quick=True, rounds=1)
+    json.dumps(result)
+    names = result["results"]
+    assert "park_unpark.contended.threads_4" in names
+    assert "status.get_total_capacity.zones_100" in names
+    assert names["simulation.events_per_sec.zones_10"]["value"] > 0
+
+
+def test_main_baseline_exit_code(tmp_path):
+    output = tmp_path / "bench.json"
+    assert main(["--quick", "--rounds", "1", "--output", str(output)]) == 0
+    # Un baseline irraggiungibile deve produrre un codice di uscita di errore
+    baseline = json.loads(output.read_text())
+    for metric in baseline["results"].values():
+        metric["value"] = (
+            metric["value"] * 1000 if metric["better"] == "higher" else 1e-12
+        )
+    output.write_text(json.dumps(baseline))
+    assert (
+        main(
+            [
+                "--quick",
+                "--rounds",
+                "1",
+                "--output",
+                str(tmp_path / "b.json"),
+                "--baseline",
+                str(output),
+            ]
+        )
+        == 1
+    )
@@ -0,0 +1,91 @@
+# Unit Test Suite per l'interfaccia a riga di comando UniParkCLI.
+import io
+import json
+import os
+import subprocess
+import sys
+
+# Collegamento alla cartella src
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"))
+sys.path.insert(0, SRC)
+
+# pylint: disable=import-error, wrong-import-position
+from UniParkCLI import main  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def test_simulate_json_is_reproducible():
+    argv = ["simulate", "--zones", "20", "--duration", "600", "--seed", "3", "--json"]
+    outputs = []
+    for _ in range(2):
+        out = io.StringIO()
+        assert main(argv, out) == 0
+        outputs.append(json.loads(out.getvalue()))
+    assert outputs[0]["events"] > 0
+    assert len(outputs[0]["zones"]) == 20
+    assert outputs[0]["zones"] == outputs[1]["zones"]
+    totals = outputs[0]["totals"]
+    assert totals["capacity"] == 20 * 100
+
+
+def test_default_system_follows_seed():
+    # Senza --zones il sistema di default usa lo stesso seed della simulazione
+    argv = ["simulate", "--duration", "600", "--seed", "5", "--json"]
+    outputs = []
+    for _ in range(2):
+        out = io.StringIO()
+        assert main(argv, out) == 0
+        result = json.loads(out.getvalue())
+        del result["seconds"]  # Tempo reale impiegato: l'unico campo non riproducibile
+        outputs.append(result)
+    assert outputs[0] == outputs[1]
+
+
+def test_status_table():
+    out = io.StringIO()
+    assert main(["status", "--zones", "3", "--seed", "1"], out) == 0
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 5 and lines[-1].startswith("TOTALE")
+
+
+def test_python_m_unipark_headless_startup():
+    # Il percorso headless non deve importare tkinter né il pool di processi
+    code = (
+        "import sys, UniPark, UniParkCLI; "
+        "print(any(m in sys.modules for m in ('tkinter', 'concurrent.futures.process')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+    result = subprocess.run(
+        [sys.executable, "-m", "UniPark", "simulate", "--zones", "3", "--json"],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert len(json.loads(result.stdout)["zones"]) == 3
+
+
+def test_bench_forwards_options(monkeypatch):
+    forwarded = []
+    # pylint: disable-next=import-outside-toplevel
+    import UniParkBench  # type: ignore # isort: skip
+
+    monkeypatch.setattr(UniParkBench, "main", lambda argv: forwarded.append(argv) or 0)
+    assert main(["bench", "--quick", "--rounds", "1"]) == 0
+    assert forwarded == [["--quick", "--rounds", "1"]]
+
+
+def test_simulate_export(tmp_path):
+    out = io.StringIO()
+    argv = ["simulate", "--zones", "5", "--duration", "600", "--seed", "1"]
+    assert main(argv + ["--export", str(tmp_path), "--sample-every", "300"], out) == 0
+    assert sorted(os.listdir(tmp_path)) == ["events.csv", "status.csv", "zones.csv"]
+    with open(tmp_path / "status.csv", encoding="utf-8") as handle:
+        assert len(handle.readlines()) == 1 + 3 * 5
@@ -0,0 +1,77 @@
+# Unit Test Suite per l'esportazione colonnare UniParkExport.
+import csv
+import os
+import sys
+
+import numpy as np
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, SimulationEngine, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkExport import KINDS, ColumnarExporter, export_simulation  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_csv_export_in_batches(tmp_path):
+    clock = [0.0]
+    system = UniParkSystem(zones=[ParkingZone("E1", 2, 2), ParkingZone("E2", 5, 5)])
+    exporter = ColumnarExporter(tmp_path, system, batch_size=4, clock=lambda: clock[0])
+    zone = system.get_zone_by_name("E1")
+    for _ in range(3):
+        clock[0] += 1.0
+        zone.park()  # La terza auto va in coda
+    clock[0] += 1.0
+    zone.unpark()
+    for _ in range(6):
+        system.get_zone_by_name("E2").park()
+    exporter.sample(100.0)
+    exporter.close()
+
+    events = _read_csv(tmp_path / "events.csv")
+    assert len(events) == 10 and exporter.rows["events"] == 10
+    assert [KINDS[int(row["kind"])] for row in events[:4]] == [
+        "park",
+        "park",
+        "queue",
+        "unpark",
+    ]
+    assert events[3]["delta_free"] == "0" and events[3]["delta_waiting"] == "-1"
+    assert float(events[2]["time"]) == 3.0
+
+    zones = {row["name"]: row["zone"] for row in _read_csv(tmp_path / "zones.csv")}
+    status = {row["zone"]: row for row in _read_csv(tmp_path / "status.csv")}
+    assert status[zones["E2"]]["free_slots"] == "0"
+    assert status[zones["E2"]]["waiting"] == "1"
+    assert status[zones["E1"]]["time"] == "100.0"
+
+
+def test_npy_export_of_simulation(tmp_path):
+    zones = [ParkingZone(f"N{i}", 20, 10) for i in range(8)]
+    system = UniParkSystem(zones=zones)
+    engine = SimulationEngine(system.zones, seed=4)
+    with ColumnarExporter(
+        tmp_path, system, fmt="npy", batch_size=1000, clock=lambda: engine.now
+    ) as exporter:
+        export_simulation(engine, exporter, 3600.0, sample_every=600.0)
+
+    columns = {
+        name: np.load(tmp_path / f"events.{name}.npy")
+        for name in ("time", "zone", "kind", "delta_free", "delta_waiting")
+    }
+    assert len(columns["time"]) == exporter.rows["events"] > 1000
+    assert np.all(np.diff(columns["time"]) >= 0)
+    # I delta esportati ricostruiscono lo stato finale di ogni zona
+    names = [row["name"] for row in _read_csv(tmp_path / "zones.csv")]
+    free = np.bincount(columns["zone"], weights=columns["delta_free"], minlength=8)
+    for index, name in enumerate(names):
+        assert 10 + free[index] == system.get_zone_by_name(name).free_slots
+
+    status_time = np.load(tmp_path / "status.time.npy")
+    assert len(status_time) == 7 * 8  # Campione iniziale + uno ogni 10 minuti
+    assert np.load(tmp_path / "status.capacity.npy").sum() == 7 * 8 * 20
@@ -0,0 +1,73 @@
+# Unit Test Suite per la previsione della domanda UniParkForecast.
+import os
+import sys
+import time
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkForecast import DemandForecaster, ZoneDemandModel  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def test_rates_follow_time_of_day_peaks():
+    model = ZoneDemandModel()
+    # Due settimane: alle 9:00 (slot 36) 20 arrivi in 15 minuti, nel resto 1 arrivo l'ora
+    for week in range(2):
+        for hour in range(24 * 7):
+            base = week * 7 * 24 * 3600.0 + hour * 3600.0
+            model.observe(base + 1800.0, arrivals=1)
+            if hour % 24 == 9:
+                for i in range(20):
+                    model.observe(base + i * 45.0, arrivals=1)
+    model.observe(2 * 7 * 24 * 3600.0)
+    arrivals, _ = model.rates()
+    peak = arrivals[model.slot_of(9 * 3600.0)]
+    quiet = arrivals[model.slot_of(3 * 3600.0)]
+    assert abs(peak - 20 / 900) < 1e-9
+    assert quiet == 0.0
+    assert abs(arrivals[model.slot_of(3 * 3600.0 + 1800.0)] - 1 / 900) < 1e-9
+
+
+def test_predict_saturation_and_queue():
+    model = ZoneDemandModel()
+    slot = model.slot_of(0.0)
+    model.arrivals[slot] = 900 * 0.2  # 0.2 arrivi/s nella prima fascia
+    model.departures[slot] = 900 * 0.1
+    model.exposure[slot] = 900.0
+    model._dirty.add(slot)  # pylint: disable=protected-access
+
+    forecast = model.predict(0.0, 900.0, capacity=100, occupied=70)
+    # Netto +0.1/s: 30 posti liberi finiscono dopo 300 s, poi la coda cresce di 60
+    assert abs(forecast["saturation_time"] - 300.0) < 1e-6
+    assert abs(forecast["max_queue"] - 60.0) < 1e-6
+    assert (
+        model.predict(900.0, 900.0, capacity=100, occupied=10)["saturation_time"]
+        is None
+    )
+
+
+def test_forecaster_updates_from_observers():
+    clock = [0.0]
+    system = UniParkSystem(zones=[ParkingZone("F1", 10, 10), ParkingZone("F2", 5, 5)])
+    forecaster = DemandForecaster(system, clock=lambda: clock[0])
+    zone = system.get_zone_by_name("F1")
+    for _ in range(12):
+        clock[0] += 10.0
+        zone.park()
+    clock[0] += 10.0
+    zone.unpark()
+
+    model = forecaster.models["F1"]
+    assert sum(model.arrivals) == 12
+    assert sum(model.departures) == 1
+    arrivals, _ = model.rates()
+    assert abs(arrivals[0] - 12 / 120) < 1e-9
+
+    start = time.perf_counter()
+    forecasts = forecaster.forecast_all(horizon=3600.0)
+    assert time.perf_counter() - start < 0.05
+    assert forecasts["F1"]["saturation_time"] == clock[0]
+    assert forecasts["F1"]["max_queue"] > 2
+    assert forecasts["F2"]["saturation_time"] is None
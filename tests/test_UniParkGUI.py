@@ -1,11 +1,13 @@
-# pylint: disable=redefined-outer-name
+# pylint: disable=redefined-outer-name, protected-access
+import itertools
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 # Import the GUI class
 # Import the GUI class
-from UniparkGUI import UniParkApp  # type: ignore # pylint: disable=import-error # isort: skip
+from UniPark import ParkingZone, SystemSnapshot, UniParkSystem  # type: ignore # pylint: disable=import-error # isort: skip
+from UniparkGUI import LogBuffer, UniParkApp  # type: ignore # pylint: disable=import-error # isort: skip
 
 
 @pytest.fixture
@@ -57,6 +59,9 @@ def mock_app():
                 mock_zone.waiting = 0
                 mock_zone.occupancy_rate = 50.0
                 mock_zone.free_slots = 50
+                mock_zone.reserved_slots = 0
+                mock_zone.version = 0
+                mock_zone.zone_id = "t"
 
                 mock_zone.get_status_dict.return_value = {
                     "name": "TestZone",
@@ -70,6 +75,10 @@ def mock_app():
                 mock_zone.unpark.return_value = True
 
                 mock_system.zones = [mock_zone]
+                # La GUI legge lo stato tramite snapshot del sistema
+                mock_system.snapshot.side_effect = lambda: SystemSnapshot.from_zones(
+                    mock_system.zones
+                )
 
                 # --- START APP ---
                 # Now it won't crash because 'after' is mocked BEFORE __init__ runs
@@ -94,6 +103,7 @@ def mock_app():
                 }
 
                 app.root = app
+                app._drawn_state = {}  # I widget finti partono senza stato disegnato
 
                 return app, mock_zone
 
@@ -139,8 +149,138 @@ def test_gui_update_widgets(mock_app):
     }
     mock_zone.get_status_dict.return_value = new_stats
     mock_zone.occupied_slots = 90
+    mock_zone.free_slots = 10
     mock_zone.occupancy_rate = 90.0
 
     app.update_widgets_once()
 
     app.zone_widgets["TestZone"]["progress"].__setitem__.assert_any_call("value", 90.0)
+
+
+def test_gui_zone_change_coalesced(mock_app):
+    """Several notifications in the same frame schedule a single redraw."""
+    app, mock_zone = mock_app
+    app.after.reset_mock()
+
+    app._on_zone_change(mock_zone, -1, 0)
+    app._on_zone_change(mock_zone, -1, 0)
+    app._on_zone_change(mock_zone, 0, 1)
+
+    app.after.assert_called_once_with(app.FRAME_MS, app._flush_dirty_zones)
+    assert app._dirty_zones == {mock_zone}
+
+    app._flush_dirty_zones()
+    assert not app._dirty_zones
+    app.zone_widgets["TestZone"]["progress"].__setitem__.assert_any_call("value", 50.0)
+
+
+def test_gui_style_only_on_band_change(mock_app):
+    """The progress-bar style is reapplied only when the threshold band changes."""
+    app, mock_zone = mock_app
+    progress = app.zone_widgets["TestZone"]["progress"]
+
+    app.update_widgets_once([mock_zone])
+    assert progress.configure.call_count == 1
+
+    mock_zone.occupied_slots = 60
+    mock_zone.free_slots = 40
+    mock_zone.occupancy_rate = 60.0
+    app.update_widgets_once([mock_zone])
+    assert progress.configure.call_count == 1  # Sempre in fascia verde
+
+    mock_zone.occupied_slots = 95
+    mock_zone.free_slots = 5
+    mock_zone.occupancy_rate = 95.0
+    app.update_widgets_once([mock_zone])
+    progress.configure.assert_called_with(style="Red.Horizontal.TProgressbar")
+    assert progress.configure.call_count == 2
+
+
+def test_log_buffer_counts_overflow():
+    """A full ring buffer drops the oldest lines and counts them."""
+    buffer = LogBuffer(capacity=3)
+    assert buffer.push("1", "INFO") is True  # Primo messaggio: pianifica lo svuotamento
+    for i in range(2, 6):
+        assert buffer.push(str(i), "INFO") is False
+
+    items, dropped, more = buffer.drain(2)
+    assert [line for line, _ in items] == ["3", "4"]
+    assert dropped == 2
+    assert more is True
+
+    items, dropped, more = buffer.drain(10)
+    assert items == [("5", "INFO")] and dropped == 0 and more is False
+    assert buffer.push("6", "INFO") is True
+
+
+def test_gui_logs_drained_in_batches(mock_app):
+    """Log lines reach the widget with one insert per frame, trimmed to LOG_KEEP."""
+    app, _ = mock_app
+    app.after.reset_mock()
+    app.log_area.reset_mock()
+    app.log_area.index.return_value = f"{app.LOG_KEEP + 11}.0"
+
+    for i in range(5):
+        app.log_msg(f"evento {i}")
+    app.after.assert_called_once_with(app.FRAME_MS, app._drain_logs)
+
+    app._drain_logs()
+    assert app.log_area.insert.call_count == 1
+    assert len(app.log_area.insert.call_args.args) == 1 + 2 * 5
+    app.log_area.delete.assert_called_once_with("1.0", "12.0")
+
+
+def test_gui_instrumented_callbacks(mock_app):
+    """With instrumentation on, scheduled callbacks are timed and counted."""
+    app, mock_zone = mock_app
+    stats = app.enable_instrumentation()
+    mock_zone.lock = MagicMock()
+
+    app.after.reset_mock()
+    app.log_msg("misurato")
+    assert stats.gauges[("ui_after_pending", ())] == 1
+
+    scheduled = app.after.call_args.args[1]
+    scheduled()
+    summary = stats.stats()["histograms"]["ui_callback_seconds{callback=_drain_logs}"]
+    assert summary["count"] == 1
+    assert app._after_pending == 0
+
+
+def test_gui_heatmap_builds_only_visible_cells(mock_app):
+    """The heatmap creates cells for visible zones only and recycles them on scroll."""
+    app, _ = mock_app
+    system = UniParkSystem(zones=[ParkingZone(f"Z{i}", 10, 5) for i in range(500)])
+    app.system, app.zones = system, system.zones
+    app.dashboard_mode = "heatmap"
+    app._zone_index = {zone.name: i for i, zone in enumerate(app.zones)}
+    app.summary_labels = {"waiting": MagicMock()}
+
+    item_ids = itertools.count(1)
+    canvas = MagicMock()
+    canvas.create_rectangle.side_effect = lambda *a, **k: next(item_ids)
+    canvas.create_text.side_effect = lambda *a, **k: next(item_ids)
+    canvas.winfo_width.return_value = 4 * app.CELL_W
+    canvas.winfo_height.return_value = 4 * app.CELL_H
+    canvas.canvasy.return_value = 0
+    app.heatmap = canvas
+
+    app._relayout_heatmap()
+    assert sorted(app._cells) == list(range(20))  # 5 righe (una parziale) x 4 colonne
+    assert canvas.create_rectangle.call_count == 20
+
+    # Scorrendo le celle vengono riutilizzate, non ricreate
+    canvas.canvasy.return_value = 100 * app.CELL_H
+    app._render_visible()
+    assert sorted(app._cells) == list(range(400, 420))
+    assert canvas.create_rectangle.call_count == 20
+
+    # Le zone non visibili non toccano il canvas; quelle visibili solo se cambiate
+    canvas.itemconfigure.reset_mock()
+    app.zones[0].park()
+    app.update_widgets_once([app.zones[0]])
+    canvas.itemconfigure.assert_not_called()
+    app.zones[405].park()
+    app.update_widgets_once([app.zones[405]])
+    assert canvas.itemconfigure.call_count == 1  # Solo il testo (stessa fascia)
+    app.summary_labels["waiting"].config.assert_called_with(text="0")
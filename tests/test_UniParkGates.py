@@ -0,0 +1,91 @@
+# Unit Test Suite per i varchi d'ingresso UniParkGates.
+import os
+import sys
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkGates import GateNetwork, GateSimulator, sweep_arrival_rates  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def test_network_layout_and_lane_assignment():
+    system = UniParkSystem(zones=[ParkingZone("G1", 10, 10), ParkingZone("G2", 10, 10)])
+    network = GateNetwork(
+        system, {"G1": ((2, 6.0), (1, 3.0)), "G2": ((1, 12.0),)}, queue_limit=2
+    )
+    assert list(network.zone_start) == [0, 3, 4]
+    assert list(network.gate_start) == [0, 2, 3, 4]
+    assert list(network.lane_gate) == [0, 0, 1, 2]
+    assert network.capacity_per_minute(0) == 15.0
+
+    # Quattro auto insieme a G1: le prime tre occupano le corsie libere, la quarta attende
+    # la corsia che si libera prima (10 secondi per auto)
+    assert [network.arrive(0, 0.0) for _ in range(4)] == [
+        (0, 10.0),
+        (1, 10.0),
+        (2, 20.0),
+        (0, 20.0),
+    ]
+    assert network.arrive(1, 0.0) == (3, 5.0)
+    network.arrive(1, 0.0)
+    # Coda della corsia al limite: l'auto rinuncia
+    assert network.arrive(1, 0.0) is None
+    network.complete(0)
+    stats = network.gate_stats(60.0)
+    assert stats[0]["served"] == 1 and stats[0]["max_queue"] == 2
+    assert stats[0]["mean_wait"] == 10.0 / 3
+
+
+def test_simulator_conserves_cars():
+    def run(seed):
+        zones = [ParkingZone("S1", 20, 12), ParkingZone("S2", 5, 5)]
+        network = GateNetwork(zones, ((1, 6.0),), queue_limit=10)
+        simulator = GateSimulator(
+            network, arrival_rate={"S1": 4.0, "S2": 8.0}, dwell_mean=600.0, seed=seed
+        )
+        simulator.run(7200.0)
+        return zones, simulator, simulator.report()
+
+    zones, simulator, report = run(7)
+    for index, (zone, stats, initial) in enumerate(zip(zones, report["zones"], (8, 0))):
+        assert stats["offered"] == stats["passed"] + stats["balked"] + stats["at_gates"]
+        # Ogni auto presente all'avvio o passata dal varco è uscita, è parcheggiata o è in
+        # coda nella zona
+        assert (
+            initial + stats["passed"]
+            == simulator.departed[index] + zone.occupied_slots + zone.waiting
+        )
+        assert stats["throughput"] <= stats["gate_capacity"] + 1e-9
+        assert 0 <= zone.free_slots <= zone.capacity
+    # S2 riceve più auto di quante il suo varco possa servire: coda al limite e rinunce
+    assert report["zones"][1]["balked"] > 0
+    assert report["gates"][1]["utilization"] > 0.95
+    assert run(7)[2] == report
+
+
+def test_sweep_finds_gate_collapse():
+    result = sweep_arrival_rates(
+        lambda: [ParkingZone("B1", 1000, 1000)],
+        ((2, 3.0),),  # Due corsie da 3 auto al minuto: 6 auto al minuto in tutto
+        [2.0, 4.0, 8.0, 12.0],
+        duration=3600.0,
+        seed=1,
+        dwell_mean=600.0,
+    )
+    rows = result["rows"]
+    assert rows[0]["ratio"] > 0.95 and rows[1]["ratio"] > 0.95
+    assert result["collapse_rate"] == 8.0
+    assert all(row["throughput"] <= 6.0 + 1e-9 for row in rows)
+    assert rows[-1]["mean_wait"] > rows[0]["mean_wait"]
+
+
+def test_initially_occupied_slots_depart():
+    zone = ParkingZone("O1", 10, 0)
+    simulator = GateSimulator(
+        GateNetwork([zone]), arrival_rate=0.0, dwell_mean=600.0, seed=3
+    )
+    simulator.run(4 * 3600.0)
+    assert simulator.departed[0] == 10
+    assert zone.free_slots == 10
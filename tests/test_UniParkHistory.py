@@ -0,0 +1,72 @@
+# Unit Test Suite per lo storico UniParkHistory.
+import os
+import sys
+import time
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, SimulationEngine, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkHistory import HistoryStore, ZoneHistory  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def test_minute_rollup_min_max_mean():
+    history = ZoneHistory()
+    for second in range(120):
+        history.record(float(second), second % 60, 60 - second % 60, 0)
+
+    rows = history.query(0, 119, resolution="minute")
+    assert rows["time"] == [0.0, 60.0]
+    assert rows["occupied_min"] == [0, 0]
+    assert rows["occupied_max"] == [59, 59]
+    assert rows["occupied_mean"] == [29.5, 29.5]
+
+    raw = history.query(10, 12, resolution="raw")
+    assert raw["occupied_max"] == [10, 11, 12]
+
+
+def test_value_at_uses_last_raw_sample_before_instant():
+    history = ZoneHistory()
+    for second in range(120):
+        history.record(float(second), second, 120 - second, 0)
+    # Tra due campioni vale il precedente, non la media del minuto
+    assert history.value_at(50.5) == {"occupied": 50.0, "free": 70.0, "waiting": 0.0}
+    assert history.value_at(50.0)["occupied"] == 50.0
+    assert history.value_at(-1.0) is None
+
+
+def test_retention_keeps_memory_bounded():
+    history = ZoneHistory(raw_retention=1000, minute_retention=100, hour_retention=50)
+    for minute in range(60 * 24 * 10):  # Dieci giorni, un campione al minuto
+        history.record(minute * 60.0, minute % 50, 50 - minute % 50, minute % 3)
+    assert len(history.raw.time) <= 1250
+    assert len(history.minute.time) <= 125
+    assert len(history.hour.time) <= 62
+    # Una query su un intervallo non più coperto dai livelli fini ricade sull'orario
+    start = history.hour.time[0]
+    rows = history.query(start, start + 10 * 3600)
+    assert len(rows["time"]) == 11
+
+
+def test_range_query_over_months_is_fast():
+    history = ZoneHistory()
+    for sample in range(24 * 120):  # Quattro mesi, un campione all'ora
+        history.record(sample * 3600.0, sample % 80, 80 - sample % 80, 0)
+    start = time.perf_counter()
+    rows = history.query(0, 24 * 120 * 3600.0)
+    assert time.perf_counter() - start < 0.05
+    assert len(rows["time"]) == 24 * 120
+    assert history.value_at(9 * 3600.0)["occupied"] == 9
+
+
+def test_store_samples_system():
+    system = UniParkSystem(zones=[ParkingZone("H1", 10, 5), ParkingZone("H2", 4, 0)])
+    store = HistoryStore()
+    engine = SimulationEngine(system.zones, seed=2)
+    for step in range(30):
+        engine.run(10)
+        store.sample(system, step * 10.0)
+    rows = store.query("H2", 0, 300)
+    assert len(rows["time"]) == 30
+    assert all(0 <= value <= 4 for value in rows["occupied_max"])
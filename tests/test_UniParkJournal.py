@@ -0,0 +1,168 @@
+# Unit Test Suite per la persistenza UniParkJournal.
+import os
+import sys
+import threading
+import time
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, SimulationEngine, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+import UniParkJournal  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkJournal import RECORD, EventJournal  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def make_system():
+    return UniParkSystem(zones=[ParkingZone("J1", 20, 10), ParkingZone("J2", 5, 5)])
+
+
+def state(system):
+    return [(z.zone_id, z.name, z.free_slots, z.waiting) for z in system.zones]
+
+
+def test_journal_restores_snapshot_and_tail(tmp_path):
+    system = make_system()
+    journal = EventJournal(tmp_path, system, snapshot_every=50)
+    engine = SimulationEngine(system.zones, seed=4)
+    for _ in range(20):
+        engine.run(30)
+        journal.checkpoint_if_due()
+    # Eventi successivi all'ultimo snapshot: vanno recuperati dalla coda del journal
+    system.zones[0].park()
+    system.zones[1].unpark()
+    journal.close()
+
+    # Riavvio: sistema vuoto, tutto lo stato arriva da snapshot + journal
+    restored = UniParkSystem(zones=[])
+    reopened = EventJournal(tmp_path, restored)
+    assert state(restored) == state(system)
+    assert restored.get_totals() == system.get_totals()
+    assert 0 < reopened.replayed < 50
+    reopened.close()
+
+
+def test_journal_tracks_zones_added_at_runtime(tmp_path):
+    system = make_system()
+    journal = EventJournal(tmp_path, system)
+    extra = system.add_zone(ParkingZone("J3", 8, 8))
+    journal.track(extra)
+    extra.park_many(10)
+    system.zones[0].unpark_many(3)
+    journal.close()
+
+    restored = UniParkSystem(zones=[])
+    EventJournal(tmp_path, restored).close()
+    assert state(restored) == state(system)
+
+
+def test_journal_ignores_truncated_record(tmp_path):
+    system = make_system()
+    journal = EventJournal(tmp_path, system)
+    system.zones[0].park()
+    journal.close()
+    with open(tmp_path / "journal.bin", "ab") as handle:
+        handle.write(b"\x00" * (RECORD.size // 2))
+
+    restored = UniParkSystem(zones=[])
+    EventJournal(tmp_path, restored).close()
+    assert state(restored) == state(system)
+
+
+def test_journal_appends_after_truncated_record(tmp_path):
+    system = make_system()
+    journal = EventJournal(tmp_path, system)
+    system.zones[0].park()
+    journal.close()
+    # Crash durante la scrittura: mezzo record in coda al journal
+    with open(tmp_path / "journal.bin", "ab") as handle:
+        handle.write(b"\x01" * (RECORD.size // 2))
+
+    restored = UniParkSystem(zones=[])
+    reopened = EventJournal(tmp_path, restored)
+    restored.zones[0].park()
+    restored.zones[1].park_many(2)
+    reopened.close()
+    assert os.path.getsize(tmp_path / "journal.bin") % RECORD.size == 0
+
+    again = UniParkSystem(zones=[])
+    EventJournal(tmp_path, again).close()
+    assert state(again) == state(restored)
+
+
+def test_journal_fsync_interval_and_automatic_snapshots(tmp_path):
+    system = make_system()
+    journal = EventJournal(tmp_path, system, fsync_interval=0.05, snapshot_every=100)
+    zone = system.zones[0]
+    for _ in range(20):
+        zone.park()
+        zone.unpark()
+    time.sleep(0.06)
+    zone.park()  # Scaduto l'intervallo: il buffer va su disco senza attendere flush_bytes
+    assert os.path.getsize(tmp_path / "journal.bin") == 41 * RECORD.size
+
+    for _ in range(60):
+        zone.unpark()
+        zone.park()
+    deadline = time.monotonic() + 5
+    while journal.events_since_snapshot >= 100 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert journal.events_since_snapshot < 100  # Snapshot eseguito in background
+    journal.close()
+
+    restored = UniParkSystem(zones=[])
+    reopened = EventJournal(tmp_path, restored)
+    assert state(restored) == state(system)
+    assert reopened.replayed < 100
+    reopened.close()
+
+
+def test_background_and_explicit_snapshots_do_not_overlap(tmp_path, monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", errors.append)
+    dump = UniParkJournal.json.dump
+    active = [0, 0]  # Snapshot in scrittura ora, massimo osservato
+
+    def slow_dump(data, handle):
+        # Allarga la finestra tra la scrittura del file temporaneo e il rename
+        active[0] += 1
+        active[1] = max(active)
+        time.sleep(0.005)
+        dump(data, handle)
+        active[0] -= 1
+
+    monkeypatch.setattr(UniParkJournal.json, "dump", slow_dump)
+    system = make_system()
+    journal = EventJournal(tmp_path, system, snapshot_every=5)
+    zone = system.zones[0]
+
+    def writer():
+        # Eventi continui: gli snapshot in background ripartono appena terminati
+        for _ in range(200):
+            zone.park()
+            zone.unpark()
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while thread.is_alive():
+        journal.checkpoint_if_due()  # Snapshot esplicito in concorrenza
+    thread.join()
+    journal.close()
+    assert not errors
+    assert active[1] == 1
+
+    restored = UniParkSystem(zones=[])
+    EventJournal(tmp_path, restored).close()
+    assert state(restored) == state(system)
+
+
+def test_journal_overhead_per_event(tmp_path):
+    zone = ParkingZone("Fast", 1_000_000, 1_000_000)
+    journal = EventJournal(tmp_path, UniParkSystem(zones=[zone]))
+    start = time.perf_counter()
+    for _ in range(20_000):
+        zone.park()
+    elapsed = time.perf_counter() - start
+    journal.close()
+    assert elapsed / 20_000 < 50e-6
@@ -0,0 +1,104 @@
+# Unit Test Suite per le prenotazioni UniParkReservations.
+import os
+import sys
+import time
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkReservations import (  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+    ACTIVE,
+    EXPIRED,
+    ReservationBook,
+)
+
+HOUR = 3600.0
+
+
+def make_book(capacity=3, free=3):
+    now = [0.0]
+    system = UniParkSystem(zones={"c": ParkingZone("Zona C", capacity, free)})
+    book = ReservationBook(system, origin=0.0, clock=lambda: now[0])
+    return system.get_zone("c"), book, now
+
+
+def test_book_respects_capacity_per_window():
+    _, book, _ = make_book(capacity=2)
+    assert book.book("c", 10 * HOUR, 12 * HOUR)
+    assert book.book("Zona C", 11 * HOUR, 13 * HOUR)
+    assert book.available("c", 10 * HOUR, 12 * HOUR) == 0
+    assert book.book("c", 11.5 * HOUR, 12.5 * HOUR) is None
+    # Finestra che non si sovrappone al picco
+    assert book.available("c", 8 * HOUR, 10 * HOUR) == 2
+    assert book.available("c", 12 * HOUR, 14 * HOUR) == 1
+
+
+def test_hold_blocks_park_until_check_in():
+    zone, book, now = make_book(capacity=3, free=1)
+    booking = book.book("c", HOUR, 2 * HOUR, holder="staff")
+    assert zone.reserved_slots == 0
+
+    now[0] = HOUR
+    book.advance()
+    assert booking.status == ACTIVE
+    assert zone.reserved_slots == 1
+    assert not zone.park()  # L'unico posto libero è trattenuto
+    assert zone.waiting == 1
+
+    assert book.check_in(booking.booking_id) is True
+    assert zone.reserved_slots == 0 and zone.free_slots == 0
+    assert book.check_in(booking.booking_id) is None
+
+
+def test_park_activates_started_holds_without_advance():
+    zone, book, now = make_book(capacity=3, free=1)
+    booking = book.book("c", HOUR, 2 * HOUR)
+    assert zone.park_many(0) == (0, 0) and zone.reserved_slots == 0
+    # Nessuna chiamata a advance(): la prenotazione iniziata viene attivata da park()
+    now[0] = HOUR + 60.0
+    assert not zone.park()
+    assert booking.status == ACTIVE and zone.reserved_slots == 1
+    assert zone.free_slots == 1 and zone.waiting == 1
+
+
+def test_unpark_covers_hold_before_queue():
+    zone, book, now = make_book(capacity=2, free=0)
+    zone.park()  # In coda
+    booking = book.book("c", 0.0, HOUR)
+    assert zone.reserved_slots == 1
+    zone.unpark()
+    # Il posto liberato va alla prenotazione, non all'auto in coda
+    assert zone.free_slots == 1 and zone.waiting == 1
+    assert book.check_in(booking.booking_id) is True
+    now[0] = 2 * HOUR
+    book.advance()
+    assert zone.unpark_many(1) == (1, 0)
+
+
+def test_cancel_and_expiry_release_holds():
+    zone, book, now = make_book(capacity=2)
+    first = book.book("c", 0.0, HOUR)
+    second = book.book("c", 0.0, HOUR)
+    assert zone.reserved_slots == 2
+    assert book.cancel(first.booking_id)
+    assert not book.cancel(first.booking_id)
+    assert zone.reserved_slots == 1
+    now[0] = HOUR
+    book.advance()
+    assert second.status == EXPIRED
+    assert zone.reserved_slots == 0
+    assert book.available("c", 0.0, HOUR) == 1  # Solo la cancellazione libera gli slot
+
+
+def test_queries_stay_fast_with_many_bookings():
+    system = UniParkSystem(zones={"c": ParkingZone("Zona C", 100_000, 100_000)})
+    book = ReservationBook(system, origin=0.0, clock=lambda: 0.0)
+    for i in range(20_000):
+        start = (i % 500) * 900.0 + HOUR
+        book.book("c", start, start + 2 * HOUR)
+    start = time.perf_counter()
+    for _ in range(1000):
+        book.available("c", 10 * HOUR, 12 * HOUR)
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,106 @@
+# Unit Test Suite per il servizio di ingestione UniParkServer.
+import asyncio
+import os
+import sys
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkServer import IngestionServer, benchmark_localhost  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def make_system():
+    return UniParkSystem(
+        zones={"a": ParkingZone("A", 10, 10), "b": ParkingZone("B", 3, 0)}
+    )
+
+
+def test_tcp_events_applied_in_batches():
+    system = make_system()
+
+    async def scenario():
+        server = await IngestionServer(system).start()
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"P a 4\nP a\nU a 2\nP b 2\nX a\nP zz\nSYNC\n")
+        await writer.drain()
+        assert await reader.readline() == b"OK\n"
+        writer.close()
+        await server.close()
+        return server.stats
+
+    stats = asyncio.run(scenario())
+    assert system.get_zone("a").free_slots == 7
+    assert system.get_zone("b").waiting == 2
+    assert stats["events"] == 9
+    assert stats["errors"] == 2
+
+
+def test_invalid_counts_and_ids_are_protocol_errors():
+    system = make_system()
+
+    async def scenario():
+        server = await IngestionServer(system).start()
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        # Conteggi negativi, nulli o eccessivi e id non UTF-8 vengono scartati
+        writer.write(b"P a -5\nU a 0\nP a 99999999\nP \xff\xfe 1\nP a 2\nSYNC\n")
+        await writer.drain()
+        # La connessione resta attiva dopo le righe non valide
+        assert await reader.readline() == b"OK\n"
+        writer.close()
+        await server.close()
+        return server.stats
+
+    stats = asyncio.run(scenario())
+    assert system.get_zone("a").free_slots == 8
+    assert stats["events"] == 2
+    assert stats["errors"] == 4
+
+
+def test_udp_datagrams():
+    system = make_system()
+
+    async def scenario():
+        server = await IngestionServer(system, udp_port=0).start()
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=(server.host, server.udp_port)
+        )
+        transport.sendto(b"P a 3\nU a\n")
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if server.stats["events"] == 4:
+                break
+        transport.close()
+        await server.close()
+
+    asyncio.run(scenario())
+    assert system.get_zone("a").free_slots == 8
+
+
+def test_backpressure_and_load_generator():
+    system = make_system()
+    result = asyncio.run(
+        benchmark_localhost(system, clients=4, events_per_client=2_000, chunk=500)
+    )
+    assert result["events"] == 8_000
+    assert result["server"]["events"] == 8_000
+    assert result["rate"] > 0
+    totals = system.get_totals()
+    assert 0 <= totals["free_slots"] <= totals["capacity"]
+
+    paused_system = make_system()
+
+    async def scenario():
+        server = await IngestionServer(paused_system, max_pending=10).start()
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"P a\n" * 100 + b"SYNC\n")
+        await writer.drain()
+        await reader.readline()
+        writer.close()
+        await server.close()
+        return server.stats
+
+    stats = asyncio.run(scenario())
+    assert stats["paused"] >= 1
+    assert paused_system.get_zone("a").waiting == 90
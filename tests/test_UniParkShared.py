@@ -0,0 +1,98 @@
+# Unit Test Suite per il backend a memoria condivisa UniParkShared.
+import multiprocessing
+import os
+import sys
+import uuid
+
+import pytest
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkShared import FREE, WAITING, SharedZoneTable, share_system  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+@pytest.fixture(name="producer")
+def fixture_producer():
+    source = UniParkSystem(
+        zones={"a": ParkingZone("Zona A", 10, 2), "b": ParkingZone("Zona B", 5, 5)}
+    )
+    system = share_system(source, f"unipark-test-{uuid.uuid4().hex[:8]}")
+    yield system
+    system.shared_table.close()
+    system.shared_table.unlink()
+
+
+def _child_reader(name, queue):
+    reader = UniParkSystem.attach_shared(name)
+    queue.put([zone.get_status_dict() for zone in reader.zones])
+    reader.shared_table.close()
+
+
+def test_shared_zone_semantics(producer):
+    zone = producer.get_zone("a")
+    assert zone.park_many(4) == (2, 2)
+    assert zone.free_slots == 0 and zone.waiting == 2
+    assert zone.unpark() is True
+    assert producer.get_totals()["waiting"] == 1
+
+
+def test_reader_sees_live_counters(producer):
+    reader = UniParkSystem.attach_shared(producer.shared_table.name)
+    assert [z.zone_id for z in reader.zones] == ["a", "b"]
+    assert reader.get_zone_by_name("Zona B").free_slots == 5
+    # L'attach non deve sovrascrivere lo stato del produttore
+    assert producer.get_zone("a").free_slots == 2
+
+    producer.get_zone("b").park()
+    assert reader.get_zone("b").get_status_dict()["free_slots"] == 4
+
+    # Lo snapshot del lettore legge il blocco, non la propria copia locale
+    snapshot = reader.snapshot()
+    assert snapshot.free_slots[snapshot.position("b")] == 4
+
+    view = reader.shared_table.view()
+    assert view[1, FREE] == 4 and view[0, WAITING] == 0
+    view.release()
+    reader.shared_table.close()
+
+
+def test_reader_totals_and_routing_follow_the_block(producer):
+    reader = UniParkSystem.attach_shared(producer.shared_table.name)
+    assert reader.best_zone() is reader.get_zone("b")
+    # Scritture del produttore: il lettore non riceve notifiche locali
+    producer.get_zone("b").park_many(5)
+    producer.get_zone("a").unpark_many(2)
+    assert reader.get_totals() == producer.get_totals()
+    assert reader.get_totals()["free_slots"] == 4
+    assert reader.best_zone() is reader.get_zone("a")
+    zone, admitted = reader.park_best("b")
+    assert zone is reader.get_zone("a") and admitted
+    reader.shared_table.close()
+
+
+def test_long_names_truncated_on_character_boundary():
+    name = "x" * 63 + "è"  # 65 byte in UTF-8: il secondo byte di "è" non entra
+    table = SharedZoneTable.create(
+        f"unipark-test-{uuid.uuid4().hex[:8]}", [ParkingZone(name, 1, 1)]
+    )
+    try:
+        assert table.zone_label(0) == ("0", "x" * 63)
+    finally:
+        table.close()
+        table.unlink()
+
+
+def test_reader_in_other_process(producer):
+    producer.get_zone("a").park_many(5)
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    child = ctx.Process(target=_child_reader, args=(producer.shared_table.name, queue))
+    child.start()
+    statuses = queue.get(timeout=30)
+    child.join(timeout=30)
+    assert statuses[0]["free_slots"] == 0
+    assert statuses[0]["waiting"] == 3
+    assert statuses[1]["name"] == "Zona B"
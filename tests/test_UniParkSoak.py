@@ -0,0 +1,88 @@
+# Unit Test Suite per la prova di resistenza concorrente UniParkSoak.
+import os
+import subprocess
+import sys
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone, UniParkSystem  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkSoak import OPERATIONS, InvariantChecker, run_soak  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+class LeakyZone(ParkingZone):  # pylint: disable=too-few-public-methods
+    # Zona difettosa: ogni 50 park() un'auto viene "persa" senza aggiornare i contatori
+    calls = 0
+
+    def park(self, vehicle_id=None):
+        LeakyZone.calls += 1
+        if LeakyZone.calls % 50 == 0:
+            return True
+        return super().park(vehicle_id)
+
+
+def test_thread_soak_keeps_invariants():
+    system = UniParkSystem(zones=[ParkingZone(f"T{i}", 5, 2) for i in range(4)])
+    report = run_soak(system, threads=4, ops=5000, seed=1)
+    assert report["violations"] == 0, report["reports"]
+    assert report["operations"] == 20_000
+    assert report["checks"] >= 2
+    latency = report["latency"]
+    assert sum(latency[name]["count"] for name in OPERATIONS) == 20_000
+    assert 0 < latency["all"]["p50"] <= latency["all"]["p99"] <= latency["all"]["p999"]
+    assert report["throughput"] > 0
+
+
+def test_checker_reports_violations():
+    system = UniParkSystem(zones=[ParkingZone("V1", 4, 4), ParkingZone("V2", 4, 0)])
+    checker = InvariantChecker(system)
+    checker.check()
+    assert checker.violations == 0
+
+    system.get_zone_by_name("V1").restore_state(6, 0)  # Più posti liberi della capacità
+    system.get_zone_by_name("V2").restore_state(2, 1)  # Coda con posti liberi
+    checker.check()
+    assert checker.violations == 2
+    assert "V1: free_slots=6" in checker.reports[0]
+
+    checker.check_conservation([0, 4], [1, 0], [0, 0])
+    assert any("auto presenti" in message for message in checker.reports)
+
+
+def test_soak_detects_lost_cars():
+    system = UniParkSystem(zones=[LeakyZone(f"L{i}", 20, 10) for i in range(2)])
+    report = run_soak(system, threads=2, ops=2000, seed=2)
+    assert report["violations"] > 0
+    assert any("auto presenti" in message for message in report["reports"])
+
+
+def test_process_soak_on_shared_memory():
+    system = UniParkSystem(zones=[ParkingZone(f"P{i}", 10, 5) for i in range(4)])
+    report = run_soak(system, processes=2, ops=3000, seed=3)
+    assert report["mode"] == "processes"
+    assert report["violations"] == 0, report["reports"]
+    assert report["operations"] == 6000
+
+
+def test_process_soak_with_more_processes_than_zones():
+    system = UniParkSystem(zones=[ParkingZone(f"Q{i}", 10, 5) for i in range(2)])
+    report = run_soak(system, processes=3, ops=1000, seed=4)
+    assert report["workers"] == 2
+    assert report["violations"] == 0, report["reports"]
+    assert report["operations"] == 2000
+
+
+def test_process_soak_cli_exits_cleanly():
+    # Il resource tracker non deve segnalare errori alla distruzione del blocco condiviso
+    result = subprocess.run(
+        [sys.executable, "-m", "UniPark", "soak", "--zones", "4", "--processes", "2"]
+        + ["--ops", "1000"],
+        cwd=os.path.join(os.path.dirname(__file__), "../src"),
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Traceback" not in result.stderr
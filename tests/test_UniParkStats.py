@@ -0,0 +1,67 @@
+# Unit Test Suite per la strumentazione UniParkStats.
+import os
+import sys
+import threading
+
+# Collegamento alla cartella src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+# pylint: disable=import-error, wrong-import-position
+from UniPark import ParkingZone  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+from UniParkStats import Histogram, Instrumentation  # type: ignore # pylint: disable=import-error, wrong-import-position # isort: skip
+
+
+def test_histogram_buckets_and_percentiles():
+    hist = Histogram(bounds=(1, 2, 4, 8))
+    for value in (0.5, 1.5, 3, 3, 100):
+        hist.observe(value)
+    assert hist.counts == [1, 1, 2, 0, 1]
+    assert hist.percentile(50) == 4
+    assert hist.percentile(100) == float("inf")
+    assert hist.summary()["count"] == 5
+
+
+def test_zone_instrumentation_is_reversible():
+    stats = Instrumentation()
+    zone = ParkingZone("Strumentata", 10, 5)
+    original_lock = zone.lock
+
+    stats.instrument_zone(zone)
+    threads = [
+        threading.Thread(target=lambda: [zone.park() for _ in range(50)])
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    zone.unpark()
+
+    data = stats.stats()["histograms"]
+    assert data["zone_call_seconds{method=park,zone=Strumentata}"]["count"] == 200
+    assert data["zone_call_seconds{method=unpark,zone=Strumentata}"]["count"] == 1
+    assert data["zone_lock_wait_seconds{zone=Strumentata}"]["count"] == 201
+    assert zone.free_slots == 0 and zone.waiting == 194
+
+    stats.uninstrument_zone(zone)
+    assert zone.lock is original_lock
+    assert "park" not in vars(zone)
+
+
+def test_prometheus_export(tmp_path):
+    stats = Instrumentation()
+    stats.histogram("ui_callback_seconds", bounds=(0.01, 0.1), callback="draw").observe(
+        0.05
+    )
+    stats.set_gauge("ui_after_pending", 3)
+    path = tmp_path / "metrics.prom"
+    stats.export(path)
+    text = path.read_text()
+    assert 'unipark_ui_callback_seconds_bucket{callback="draw",le="0.01"} 0' in text
+    assert 'unipark_ui_callback_seconds_bucket{callback="draw",le="+Inf"} 1' in text
+    assert "unipark_ui_after_pending 3" in text
+    stats.export(tmp_path / "metrics.txt", fmt="text")
+    assert (
+        "ui_callback_seconds{callback=draw}: count=1"
+        in (tmp_path / "metrics.txt").read_text()
+    )